@@ -1,40 +1,139 @@
 import os
 import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm  # Bibliothèque pour afficher la barre de progression
 
+from corpus_crawler import list_files
+from inventaire_fichiers import hash_fichier
+from depot_contenu import ContentStore
+
 # Répertoire de départ et de destination
 source_directory = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\leo_salvador"
 destination_directory = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\leo_salvador_extension_tri"
 
+# Nombre de copies simultanées
+copy_workers = 8
+
+# Mode lien physique : pas de duplication des octets (même volume NTFS requis, sinon copie classique)
+use_hardlinks = False
+
+# Si taille identique mais date différente : comparer le contenu (hash) avant de recopier
+verify_hash_on_mtime_mismatch = True
+
+# Dépôt adressé par contenu : chaque contenu distinct n'est stocké qu'une fois (blobs),
+# les dossiers d'extension pointent vers les blobs par liens physiques
+use_content_store = False
+content_store_directory = destination_directory + "_depot"
+
 # Créer le répertoire de destination s'il n'existe pas
 os.makedirs(destination_directory, exist_ok=True)
 
+
+def plan_destinations(records):
+    """
+    Associe chaque fichier source (FileRecord) à son chemin de destination DEST/EXT/nom.
+    Collisions de noms dans un même dossier d'extension : le premier chemin source (ordre trié)
+    garde le nom d'origine, les suivants sont suffixés par un hash court de leur chemin relatif,
+    de sorte que le résultat est identique d'une exécution à l'autre.
+    """
+    plan = []
+    used = set()
+    for record in sorted(records, key=lambda r: r.path.lower()):
+        file_path = record.path
+        file_name = os.path.basename(file_path)
+        file_extension = os.path.splitext(file_name)[-1].lower().strip('.')  # Récupérer l'extension
+        if not file_extension:  # Vérifier que l'extension existe
+            continue
+        ext_directory = os.path.join(destination_directory, file_extension.upper())
+        target = os.path.join(ext_directory, file_name)
+        if target.lower() in used:
+            relative = os.path.relpath(file_path, source_directory).lower()
+            suffix = hashlib.sha1(relative.encode("utf-8")).hexdigest()[:8]
+            stem, ext = os.path.splitext(file_name)
+            target = os.path.join(ext_directory, f"{stem}~{suffix}{ext}")
+        used.add(target.lower())
+        plan.append((record, target))
+    return plan
+
+
+def is_up_to_date(src, dst):
+    """
+    True si la destination correspond déjà à la source (même fichier, ou même taille + date, ou même hash).
+    """
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src)
+    if os.path.samestat(src_stat, dst_stat):
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if int(src_stat.st_mtime) == int(dst_stat.st_mtime):
+        return True
+    if verify_hash_on_mtime_mismatch and hash_fichier(src) == hash_fichier(dst):
+        # Réaligner la date pour que le prochain passage se contente de taille + date
+        os.utime(dst, (src_stat.st_atime, src_stat.st_mtime))
+        return True
+    return False
+
+
+def sync_file(record, dst, content_store=None):
+    """
+    Copie (ou lie) un fichier si nécessaire. Retourne "copie", "lien" ou "inchangé".
+    Avec un dépôt de contenu, la destination est liée au blob unique de ce contenu.
+    """
+    src = record.path
+    link = use_hardlinks
+    if content_store is not None:
+        digest = content_store.add(record)
+        if digest is None:
+            raise OSError(f"Lecture impossible : {src}")
+        src = content_store.blob_path(digest, record.ext)
+        link = True
+    if is_up_to_date(src, dst):
+        return "inchangé"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if link:
+        try:
+            os.link(src, dst)
+            return "lien"
+        except OSError:
+            pass  # Volume différent ou lien non supporté : copie classique
+    shutil.copy2(src, dst)  # copy2 conserve la date : base de la comparaison incrémentale
+    return "copie"
+
+
 # Étape 1 : Évaluation du nombre de fichiers à traiter
-all_files = []
-for root, _, files in os.walk(source_directory):
-    for file in files:
-        all_files.append(os.path.join(root, file))
+all_files = list_files(source_directory)
 
 total_files = len(all_files)
 print(f"Nombre total de fichiers détectés à dupliquer et trier : {total_files}")
 
-# Étape 2 : Traitement des fichiers avec barre de progression
-copied_files = 0  # Compteur de fichiers copiés
-
-for file_path in tqdm(all_files, desc="Duplication et tri des fichiers", unit="fichier"):
-    file_name = os.path.basename(file_path)
-    file_extension = os.path.splitext(file_name)[-1].lower().strip('.')  # Récupérer l'extension
-
-    if file_extension:  # Vérifier que l'extension existe
-        ext_directory = os.path.join(destination_directory, file_extension.upper())
+# Étape 2 : Traitement des fichiers en parallèle avec barre de progression
+copy_plan = plan_destinations(all_files)
+counts = {"copie": 0, "lien": 0, "inchangé": 0, "erreur": 0}
+content_store = ContentStore(content_store_directory) if use_content_store else None
 
-        # Créer le dossier pour l'extension s'il n'existe pas
-        os.makedirs(ext_directory, exist_ok=True)
+with ThreadPoolExecutor(max_workers=copy_workers) as pool:
+    futures = {pool.submit(sync_file, rec, dst, content_store): rec.path for rec, dst in copy_plan}
+    for future in tqdm(as_completed(futures), total=len(futures), desc="Duplication et tri des fichiers", unit="fichier"):
+        try:
+            counts[future.result()] += 1
+        except Exception as e:
+            counts["erreur"] += 1
+            print(f"Erreur avec {futures[future]} : {e}")
 
-        # Copier le fichier dans le dossier correspondant
-        shutil.copy(file_path, os.path.join(ext_directory, file_name))
-        copied_files += 1
+if content_store is not None:
+    content_store.prune(rec.path for rec in all_files)
+    print(f"Dépôt de contenu : taux de duplication {content_store.duplication_ratio():.2f}")
+    content_store.close()
 
 # Étape 3 : Affichage du résumé
+processed_files = counts["copie"] + counts["lien"] + counts["inchangé"]
 print(f"\nDuplication et tri des fichiers terminés.")
-print(f"Nombre total de fichiers dupliqués et triés : {copied_files} / {total_files}")
\ No newline at end of file
+print(f"Nombre total de fichiers dupliqués et triés : {processed_files} / {total_files}")
+print(f"  copiés : {counts['copie']} | liés : {counts['lien']} | déjà à jour : {counts['inchangé']} | erreurs : {counts['erreur']}")
@@ -1,35 +1,64 @@
 import os
-import pefile
 import csv
+from concurrent.futures import ProcessPoolExecutor
 
-# Répertoire contenant les DLLs
+from corpus_crawler import list_files
+from pe_lecteur import read_pe_info, dotnet_mode, effective_machine
+
+# Répertoire contenant les DLLs (parcours récursif)
 directory = r"D:\aveva_install\AVEVA_extensions_tri\DLL"  # Remplace avec ton répertoire
 output_csv = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\dll_classification.csv"
 
-# Liste toutes les DLLs dans le répertoire
-dll_files = [f for f in os.listdir(directory) if f.endswith(".dll")]
-
-# Création du fichier CSV et écriture de l'en-tête
-with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Nom de la DLL", "Type"])
-
-    # Analyse des DLLs et écriture des résultats dans le CSV
-    for dll in dll_files:
-        dll_path = os.path.join(directory, dll)
-        try:
-            pe = pefile.PE(dll_path)
-            if hasattr(pe.OPTIONAL_HEADER, 'DATA_DIRECTORY') and pe.OPTIONAL_HEADER.DATA_DIRECTORY[14].VirtualAddress != 0:
-                dll_type = "DLL .NET"
-            else:
-                dll_type = "DLL NATIVE (C/C++)"
-            
-            # Affichage et écriture dans le CSV
-            print(f"{dll} -> {dll_type}")
-            writer.writerow([dll, dll_type])
-        
-        except Exception as e:
-            print(f"Erreur avec {dll}: {e}")
-            writer.writerow([dll, f"Erreur: {e}"])
-
-print(f"\n Analyse terminée. Résultats enregistrés dans : {output_csv}")
\ No newline at end of file
+# Colonnes supplémentaires : machine, PE32/PE32+, mode .NET (IL only / Mixte), chemin complet
+include_extra_columns = True
+
+# Nombre de processus d'analyse (None = nombre de cœurs)
+max_workers = None
+
+
+def classify_dll(dll_path):
+    """
+    Classe une DLL en lisant uniquement ses en-têtes (DOS, PE, optional, CLR).
+    Retourne (type, machine, format, mode .NET) ; type = "Erreur: ..." si illisible.
+    """
+    try:
+        info = read_pe_info(dll_path)
+    except Exception as e:
+        return f"Erreur: {e}", "", "", ""
+    dll_type = "DLL .NET" if info.is_dotnet else "DLL NATIVE (C/C++)"
+    return dll_type, effective_machine(info), info.pe_format, dotnet_mode(info)
+
+
+def main():
+    # Liste toutes les DLLs sous le répertoire
+    dll_paths = [rec.path for rec in list_files(directory, ["*.dll"])]
+
+    header = ["Nom de la DLL", "Type"]
+    if include_extra_columns:
+        header += ["Machine", "Format PE", "Mode .NET", "Chemin complet DLL"]
+
+    # Création du fichier CSV et écriture de l'en-tête
+    with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+
+        # Analyse des DLLs en parallèle (ordre conservé) et écriture des résultats dans le CSV
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(classify_dll, dll_paths, chunksize=64)
+            for dll_path, (dll_type, machine, pe_format, mode) in zip(dll_paths, results):
+                dll = os.path.basename(dll_path)
+                if dll_type.startswith("Erreur"):
+                    print(f"Erreur avec {dll}: {dll_type[len('Erreur: '):]}")
+                else:
+                    print(f"{dll} -> {dll_type}")
+
+                row = [dll, dll_type]
+                if include_extra_columns:
+                    row += [machine, pe_format, mode, dll_path]
+                writer.writerow(row)
+
+    print(f"\n Analyse terminée. Résultats enregistrés dans : {output_csv}")
+
+
+if __name__ == "__main__":
+    main()
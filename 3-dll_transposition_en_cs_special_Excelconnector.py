@@ -1,5 +1,6 @@
 import os
-import subprocess
+
+from ilspy_pool import plan_output_dirs, build_jobs, decompile_all, summarize
 
 # Chemin vers ILSpyCmd (modifie selon ton installation)
 ilspy_path = r"C:\Users\Nicolas JF Martin\.dotnet\tools\ilspycmd.exe"
@@ -14,8 +15,14 @@ output_dir = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL dec
 transposition_dir = os.path.join(output_dir, "transposition_dll")
 os.makedirs(transposition_dir, exist_ok=True)
 
-# Fichier log pour les DLL en echec
-log_file_path = os.path.join(output_dir, "log.txt")
+# Journal JSONL des decompilations (une ligne par DLL : statut, code retour, tentatives, duree, stderr)
+log_file_path = os.path.join(output_dir, "log_decompilation.jsonl")
+
+# Decompilations simultanees, delai maximal par DLL (base + par Mo) et nombre de reprises
+ilspy_workers = 4
+ilspy_timeout = 300
+ilspy_timeout_per_mb = 60
+ilspy_retries = 1
 
 # Verification de la presence de ILSpyCmd
 if not os.path.exists(ilspy_path):
@@ -30,33 +37,22 @@ if not dll_files:
     print("Erreur: Aucune DLL trouvee dans le dossier.")
     exit()
 
-# Ouvrir le fichier log
-with open(log_file_path, "w", encoding="utf-8") as log_file:
-    log_file.write("DLL en echec de decompilation:\n\n")
-
-    # Boucle sur chaque DLL pour la decompiler
-    for idx, dll_file in enumerate(dll_files, start=1):
-        dll_path = os.path.join(dll_folder, dll_file)
-        dll_name = os.path.splitext(dll_file)[0]
-
-        # Creation d’un sous-dossier pour chaque DLL
-        dll_output_dir = os.path.join(transposition_dir, dll_name)
-        os.makedirs(dll_output_dir, exist_ok=True)
-
-        # Commande pour generer les fichiers .cs
-        cmd = [ilspy_path, dll_path, "-p", "-o", dll_output_dir]  # "-p" pour projet, "-o" pour dossier de sortie
-
-        # Afficher l'avancement
-        print(f"[INFO] ({idx}/{len(dll_files)}) Traitement de {dll_file}...")
-
-        # Executer la commande
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        # Verifier le resultat
-        if result.returncode == 0:
-            print(f"[OK] {dll_file} traite avec succes. Resultats dans: {dll_output_dir}")
-        else:
-            print(f"[ERREUR] Echec de la decompilation de {dll_file}.")
-            log_file.write(f"{dll_file}\n")  # Ajouter au fichier log
-
-print(f"[COMPLET] Tous les fichiers DLL ont ete traites. Verifie {log_file_path} pour les erreurs.")
\ No newline at end of file
+# Un sous-dossier par DLL, les plus grosses DLL lancees en premier
+output_dirs = plan_output_dirs([os.path.join(dll_folder, f) for f in dll_files], transposition_dir)
+jobs = build_jobs(output_dirs)
+
+# Decompilation en parallele ("-p" pour projet, "-o" pour dossier de sortie)
+results = []
+for idx, result in enumerate(decompile_all(ilspy_path, jobs, workers=ilspy_workers, timeout=ilspy_timeout,
+                                           timeout_per_mb=ilspy_timeout_per_mb, retries=ilspy_retries,
+                                           log_path=log_file_path), start=1):
+    dll_file = os.path.basename(result.dll_path)
+    results.append(result)
+    if result.status == "ok":
+        print(f"[OK] ({idx}/{len(jobs)}) {dll_file} traite avec succes en {result.duration:.1f} s. Resultats dans: {result.output_dir}")
+    else:
+        print(f"[ERREUR] ({idx}/{len(jobs)}) Echec de la decompilation de {dll_file} ({result.status}, {result.attempts} tentative(s)).")
+
+counts = summarize(results)
+print("[COMPLET] Tous les fichiers DLL ont ete traites : " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+print(f"Verifie {log_file_path} pour les erreurs.")
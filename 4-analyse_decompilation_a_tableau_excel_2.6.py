@@ -1,17 +1,48 @@
 import os
-import json
-import csv
-import re
 import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import xml.etree.ElementTree as ET
 from tqdm import tqdm  # Barre de progression
 
+from lexer_csharp import scan_csharp, is_pmlnet_callable
+from ecrivains_flux import JsonlWriter, JsonArrayWriter, CsvStreamWriter, RowSink, SqliteDatasetWriter
+
 # Dossier contenant les fichiers après décompilation
 decompilation_folder = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\transposition_dll"
 
 # Dossier de sortie général
 output_root_folder = os.path.join(decompilation_folder, "analyse_decompilation")
-os.makedirs(output_root_folder, exist_ok=True)  # Création du dossier principal
+
+# Mode de sortie :
+#   "repertoires" : un JSON + un CSV par répertoire décompilé (arborescence recopiée sous analyse_decompilation)
+#   "dataset"     : une seule base SQLite, partitionnée par DLL, le répertoire étant une colonne
+output_mode = "repertoires"
+dataset_db = os.path.join(output_root_folder, "decompilation_analysis.sqlite")
+
+# Format JSON (mode "repertoires") : "jsonl" (une ligne par résultat) ou "json" (tableau indenté, format historique)
+json_output_format = "json"
+# Forcer l'écriture sur disque toutes les N lignes (0 = laisser le système gérer les tampons)
+flush_every_rows = 0
+
+# Nombre de processus d'analyse des .cs (None = nombre de cœurs, 1 = analyse séquentielle dans ce processus)
+max_workers = None
+# Fichiers confiés à un processus à la fois
+files_per_chunk = 32
+# Lots soumis en avance au plus (None = 2 par processus) : les résultats en attente restent bornés en mémoire
+max_pending_chunks = None
+
+# Colonnes des fichiers CSV (ordre historique : celui d'une ligne "méthode")
+output_columns = [
+    "Index_beta", "Pair_Impair_beta", "Niveau_beta", "Index-Niveau_beta", "Repertoire", "Fichier_Source",
+    "Extension", "Namespace", "Classe", "Methode", "Public/Private", "Modificateur", "Paramètres",
+    "PMLNetCallable", "Propriete", "Evenement"
+]
+# En-tête des CSV par répertoire : None = clés de la première ligne du répertoire (format historique ; un
+# répertoire sans méthode n'a alors pas de colonne "Paramètres"), output_columns = colonnes fixes
+csv_header_columns = None
+# Mode "dataset" : DLL (premier dossier, sans le suffixe "~hash" des homonymes) et répertoire complet en tête
+dataset_columns = ["DLL", "Dossier"] + output_columns
 
 # Fonction pour tronquer un chemin trop long et le remplacer par un hash
 def truncate_path(path, max_length=100):
@@ -21,140 +52,192 @@ def truncate_path(path, max_length=100):
         path = path[:max_length - 11] + "_" + hash_part
     return path
 
-# Expressions régulières pour extraire les informations des fichiers .cs
-regex_namespace = re.compile(r'namespace\s+([\w.]+)')
-regex_class = re.compile(r'class\s+([\w]+)')
-regex_pmlnet = re.compile(r'\[PMLNetCallable\]')  # Détecte si une ligne contient PMLNetCallable
-regex_method = re.compile(r'(\[PMLNetCallable\])?\s*(public|private)?\s*([\w<>\[\]]+)\s+([\w]+)\((.*?)\)')
-regex_property = re.compile(r'(public|private)?\s*([\w<>[\]]+)\s+([\w]+)\s*{.*?get;.*?set;.*?}')
-regex_variable = re.compile(r'(public|private)?\s*([\w<>[\]]+)\s+([\w]+);')
-regex_event = re.compile(r'public\s+event\s+([\w<>[\]]+)\s+([\w]+);')
-
-# Récupération de la liste des fichiers à analyser par répertoire
-all_files_by_directory = {}
-
-for root, _, files in os.walk(decompilation_folder):
-    if files:
-        relative_path = os.path.relpath(root, decompilation_folder)
-        truncated_relative_path = truncate_path(relative_path)  # Tronquer si trop long
-        output_folder = os.path.join(output_root_folder, truncated_relative_path)  # Dossier spécifique pour ce répertoire
-        os.makedirs(output_folder, exist_ok=True)  # Création du dossier de sortie s'il n'existe pas
-        all_files_by_directory[root] = {"files": [os.path.join(root, file) for file in files], "output_folder": output_folder}
-
-print(f"📂 Nombre total de répertoires analysés : {len(all_files_by_directory)}")
-
-# Parcours des répertoires et analyse des fichiers
-for directory, data in tqdm(all_files_by_directory.items(), desc="🔍 Analyse des répertoires", unit="dir"):
-    files = data["files"]
-    output_folder = data["output_folder"]
-    
-    data_list = []
-    unreadable_files = []
-    index_beta = 1  # Indexation alternative
-
-    for file_path in tqdm(files, desc=f"📄 Analyse des fichiers sous {directory}", unit="file"):
-        file = os.path.basename(file_path)
-        file_extension = os.path.splitext(file)[1]
-        relative_path = os.path.relpath(os.path.dirname(file_path), decompilation_folder)
-        truncated_relative_path = truncate_path(relative_path)  # Tronquer si trop long
-
-        # Définition des indexations et niveaux
-        niveau_beta = len(relative_path.split(os.sep))
-        pair_impair_beta = "Pair" if index_beta % 2 == 0 else "Impair"
-        index_niveau_beta = f"{index_beta}-{niveau_beta}"
-
-        try:
-            # Analyser les fichiers C# (.cs)
-            if file.endswith(".cs"):
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.readlines()
-
-                full_text = "".join(content)
-
-                namespaces = regex_namespace.findall(full_text) or ["N/A"]
-                classes = regex_class.findall(full_text) or ["N/A"]
-                methods = regex_method.findall(full_text)
-                properties = regex_property.findall(full_text)
-                variables = regex_variable.findall(full_text)
-                events = regex_event.findall(full_text)
-
-                # Ajouter chaque méthode ligne par ligne
-                for method in methods:
-                    data_list.append({
-                        "Index_beta": index_beta,
-                        "Pair_Impair_beta": pair_impair_beta,
-                        "Niveau_beta": niveau_beta,
-                        "Index-Niveau_beta": index_niveau_beta,
-                        "Repertoire": truncated_relative_path,
-                        "Fichier_Source": file,
-                        "Extension": file_extension,
-                        "Namespace": ", ".join(namespaces),
-                        "Classe": ", ".join(classes),
-                        "Methode": method[3],
-                        "Public/Private": method[1] or "N/A",
-                        "Modificateur": method[2],
-                        "Paramètres": method[4],
-                        "PMLNetCallable": "Oui" if method[0] else "Non",
-                        "Propriete": "N/A",
-                        "Evenement": "N/A"
-                    })
-
-                # Ajouter chaque propriété ligne par ligne
-                for prop in properties:
-                    data_list.append({
-                        "Index_beta": index_beta,
-                        "Pair_Impair_beta": pair_impair_beta,
-                        "Niveau_beta": niveau_beta,
-                        "Index-Niveau_beta": index_niveau_beta,
-                        "Repertoire": truncated_relative_path,
-                        "Fichier_Source": file,
-                        "Extension": file_extension,
-                        "Namespace": ", ".join(namespaces),
-                        "Classe": ", ".join(classes),
-                        "Methode": "N/A",
-                        "Public/Private": prop[0] or "N/A",
-                        "Modificateur": prop[1],
-                        "Propriete": prop[2],
-                        "Evenement": "N/A",
-                        "PMLNetCallable": "Non"
-                    })
-
-                # Ajouter chaque variable
-                for var in variables:
-                    data_list.append({
-                        "Index_beta": index_beta,
-                        "Pair_Impair_beta": pair_impair_beta,
-                        "Niveau_beta": niveau_beta,
-                        "Index-Niveau_beta": index_niveau_beta,
-                        "Repertoire": truncated_relative_path,
-                        "Fichier_Source": file,
-                        "Extension": file_extension,
-                        "Namespace": ", ".join(namespaces),
-                        "Classe": ", ".join(classes),
-                        "Methode": "N/A",
-                        "Public/Private": var[0] or "N/A",
-                        "Modificateur": var[1],
-                        "Propriete": var[2],
-                        "Evenement": "N/A",
-                        "PMLNetCallable": "Non"
-                    })
-
-            index_beta += 1  # Incrémentation de l'index beta
-
-        except Exception:
-            unreadable_files.append(file_path)
-
-    # Sauvegarde en JSON et CSV pour ce répertoire
-    if data_list:
-        output_json = os.path.join(output_folder, "decompilation_analysis.json")
-        output_csv = os.path.join(output_folder, "decompilation_analysis.csv")
-
-        with open(output_json, "w", encoding="utf-8") as f:
-            json.dump(data_list, f, indent=4, ensure_ascii=False)
-
-        with open(output_csv, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=data_list[0].keys())
-            writer.writeheader()
-            writer.writerows(data_list)
-
-print("\n✅ Analyse terminée. Les fichiers JSON et CSV sont générés par répertoire.")
\ No newline at end of file
+# Les fichiers .cs sont analysés en une passe par lexer_csharp.scan_csharp (commentaires et chaînes ignorés,
+# chaque membre rattaché à son namespace et à sa classe réels)
+def analyse_file(file_path):
+    """
+    Lignes (sans les colonnes d'indexation) d'un fichier : méthodes et constructeurs, propriétés, champs,
+    puis événements. [] pour un fichier non .cs, None si le fichier est illisible.
+    Exécutée dans les processus d'analyse : l'indexation reste faite dans l'ordre par le processus principal.
+    """
+    if not file_path.endswith(".cs"):
+        return []
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            members = scan_csharp(f.read())
+    except Exception:
+        return None
+
+    rows = []
+    # Chaque méthode (et constructeur) ligne par ligne
+    for member in members:
+        if member.kind in ("method", "constructor"):
+            rows.append({
+                "Namespace": member.namespace or "N/A",
+                "Classe": member.type_name or "N/A",
+                "Methode": member.name,
+                "Public/Private": member.access or "N/A",
+                "Modificateur": member.type,
+                "Paramètres": member.params,
+                "PMLNetCallable": "Oui" if is_pmlnet_callable(member) else "Non",
+                "Propriete": "N/A",
+                "Evenement": "N/A"
+            })
+
+    # Chaque propriété, puis chaque variable (champ), ligne par ligne
+    for kind in ("property", "field"):
+        for member in members:
+            if member.kind == kind:
+                rows.append({
+                    "Namespace": member.namespace or "N/A",
+                    "Classe": member.type_name or "N/A",
+                    "Methode": "N/A",
+                    "Public/Private": member.access or "N/A",
+                    "Modificateur": member.type,
+                    "Propriete": member.name,
+                    "Evenement": "N/A",
+                    "PMLNetCallable": "Oui" if is_pmlnet_callable(member) else "Non"
+                })
+
+    # Chaque événement
+    for member in members:
+        if member.kind == "event":
+            rows.append({
+                "Namespace": member.namespace or "N/A",
+                "Classe": member.type_name or "N/A",
+                "Methode": "N/A",
+                "Public/Private": member.access or "N/A",
+                "Modificateur": member.type,
+                "Propriete": "N/A",
+                "Evenement": member.name,
+                "PMLNetCallable": "Oui" if is_pmlnet_callable(member) else "Non"
+            })
+    return rows
+
+
+def analyse_chunk(file_paths):
+    """
+    Lot de fichiers analysé dans un même processus (un seul aller-retour par lot).
+    """
+    return [analyse_file(file_path) for file_path in file_paths]
+
+
+def analyse_files(pool, file_paths, chunksize, max_pending):
+    """
+    Résultats de analyse_file dans l'ordre de file_paths. Au plus `max_pending` lots sont en cours à la fois :
+    un lot n'est soumis qu'une fois le plus ancien consommé (pool.map soumettrait tout le corpus d'emblée).
+    """
+    pending = deque()
+    for start in range(0, len(file_paths), chunksize):
+        pending.append(pool.submit(analyse_chunk, file_paths[start:start + chunksize]))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def main():
+    os.makedirs(output_root_folder, exist_ok=True)  # Création du dossier principal
+
+    # Récupération de la liste des fichiers à analyser par répertoire
+    all_files_by_directory = {}
+
+    for root, dirs, files in os.walk(decompilation_folder):
+        # Ne pas réanalyser les résultats d'une exécution précédente
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != output_root_folder]
+        if files:
+            relative_path = os.path.relpath(root, decompilation_folder)
+            truncated_relative_path = truncate_path(relative_path)  # Tronquer si trop long
+            output_folder = os.path.join(output_root_folder, truncated_relative_path)  # Dossier spécifique pour ce répertoire
+            if output_mode == "repertoires":
+                os.makedirs(output_folder, exist_ok=True)  # Création du dossier de sortie s'il n'existe pas
+            all_files_by_directory[root] = {"files": [os.path.join(root, file) for file in files], "output_folder": output_folder}
+
+    print(f"📂 Nombre total de répertoires analysés : {len(all_files_by_directory)}")
+
+    dataset_writer = SqliteDatasetWriter(dataset_db, dataset_columns, "DLL") if output_mode == "dataset" else None
+
+    # Analyse des fichiers (en parallèle si max_workers != 1), résultats relus dans l'ordre des répertoires
+    all_files = [file_path for data in all_files_by_directory.values() for file_path in data["files"]]
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 else None
+    if pool is not None:
+        max_pending = max_pending_chunks or 2 * (max_workers or os.cpu_count() or 1)
+        file_results = analyse_files(pool, all_files, files_per_chunk, max_pending)
+    else:
+        file_results = map(analyse_file, all_files)
+
+    try:
+        # Parcours des répertoires : indexation et écriture des lignes
+        for directory, data in tqdm(all_files_by_directory.items(), desc="🔍 Analyse des répertoires", unit="dir"):
+            files = data["files"]
+            output_folder = data["output_folder"]
+
+            # Chaque ligne est écrite dès qu'elle est produite (JSON + CSV ou base commune), sans tout garder en mémoire
+            directory_columns = {}
+            if dataset_writer is not None:
+                relative_directory = os.path.relpath(directory, decompilation_folder)
+                directory_columns = {
+                    "DLL": "" if relative_directory == "." else relative_directory.split(os.sep)[0].split("~")[0],
+                    "Dossier": relative_directory,
+                }
+                data_sink = dataset_writer
+            else:
+                if json_output_format == "jsonl":
+                    json_writer = JsonlWriter(os.path.join(output_folder, "decompilation_analysis.jsonl"), flush_every_rows)
+                else:
+                    json_writer = JsonArrayWriter(os.path.join(output_folder, "decompilation_analysis.json"), flush_every_rows)
+                csv_writer = CsvStreamWriter(os.path.join(output_folder, "decompilation_analysis.csv"),
+                                             csv_header_columns, flush_every_rows)
+                data_sink = RowSink(json_writer, csv_writer)
+            unreadable_files = []
+            index_beta = 1  # Indexation alternative
+
+            for file_path in tqdm(files, desc=f"📄 Analyse des fichiers sous {directory}", unit="file"):
+                rows = next(file_results)
+                if rows is None:
+                    # Fichier illisible : pas de ligne, index non incrémenté
+                    unreadable_files.append(file_path)
+                    continue
+
+                file = os.path.basename(file_path)
+                file_extension = os.path.splitext(file)[1]
+                relative_path = os.path.relpath(os.path.dirname(file_path), decompilation_folder)
+                truncated_relative_path = truncate_path(relative_path)  # Tronquer si trop long
+
+                # Définition des indexations et niveaux
+                niveau_beta = len(relative_path.split(os.sep))
+                pair_impair_beta = "Pair" if index_beta % 2 == 0 else "Impair"
+                index_niveau_beta = f"{index_beta}-{niveau_beta}"
+
+                file_columns = {
+                    **directory_columns,
+                    "Index_beta": index_beta,
+                    "Pair_Impair_beta": pair_impair_beta,
+                    "Niveau_beta": niveau_beta,
+                    "Index-Niveau_beta": index_niveau_beta,
+                    "Repertoire": truncated_relative_path,
+                    "Fichier_Source": file,
+                    "Extension": file_extension,
+                }
+                for row in rows:
+                    data_sink.write({**file_columns, **row})
+
+                index_beta += 1  # Incrémentation de l'index beta
+
+            # Fermeture des fichiers JSON et CSV de ce répertoire (créés à la première ligne écrite)
+            if dataset_writer is None:
+                data_sink.close()
+    finally:
+        if pool is not None:
+            # Lots encore en file abandonnés si la boucle s'arrête en cours (erreur, Ctrl+C)
+            pool.shutdown(cancel_futures=True)
+
+    if dataset_writer is not None:
+        dataset_writer.close()
+        print(f"\n✅ Analyse terminée. {dataset_writer.count} lignes enregistrées dans : {dataset_db}")
+    else:
+        print("\n✅ Analyse terminée. Les fichiers JSON et CSV sont générés par répertoire.")
+
+
+if __name__ == "__main__":
+    main()
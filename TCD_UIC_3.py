@@ -1,12 +1,15 @@
 import os
 import re
-import glob
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill
 from openpyxl.utils import get_column_letter
 
+from corpus_crawler import crawl, plan_roots, records_under
+from inventaire_fichiers import FileInventory
+
 # =========================
 # CONFIG UTILISATEUR
 # =========================
@@ -20,6 +23,14 @@ OUTPUT_FOLDER = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUD
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 OUTPUT_FILE = os.path.join(OUTPUT_FOLDER, "TCD_Synthese_UIC_3.xlsx")
 
+# Cache d'inventaire persistant : seuls les XML / UIC nouveaux ou modifiés sont re-parsés
+USE_INVENTORY_CACHE = True
+INVENTORY_DB = os.path.join(OUTPUT_FOLDER, "inventaire_tcd_uic.sqlite")
+
+# Noms d'étapes du cache (à incrémenter si l'extraction correspondante change)
+STAGE_XML_UIC = "xml_uic_refs_v1"
+STAGE_UIC_ENRICHED = "uic_enriched_v1"
+
 # =========================
 # ETAPE 0 : Fonctions utilitaires
 # =========================
@@ -73,42 +84,79 @@ def extract_extended_content(content: str):
 def count_leading_spaces(line: str) -> int:
     return len(line) - len(line.lstrip())
 
+# =========================
+# ETAPE 0a : Découverte des fichiers (une seule traversée par ROOT_PATH)
+# =========================
+DISCOVERY_EXTENSIONS = (".xml", ".pmlcmd", ".uic")
+
+def discover_root_files(root_path: str, visited=None) -> dict:
+    """
+    Parcourt root_path une seule fois et range les fichiers par extension :
+    { '.xml': [FileRecord, ...], '.pmlcmd': [...], '.uic': [...] }
+    `visited` (partagé entre roots) évite de relire un répertoire atteint via une jonction.
+    Chaque liste est triée par chemin (ordre reproductible).
+    """
+    buckets = {ext: [] for ext in DISCOVERY_EXTENSIONS}
+    for rec in crawl(root_path, DISCOVERY_EXTENSIONS, visited=visited):
+        buckets[rec.ext.lower()].append(rec)
+    for records in buckets.values():
+        records.sort(key=lambda r: r.path)
+    return buckets
+
 # =========================
 # ETAPE 0bis : Index XML -> UIC (par ROOT_PATH)
 # =========================
 # On repère les références aux .uic dans les .xml : Path="xxx.uic"
 UIC_IN_XML_RE = re.compile(r'Path\s*=\s*"([^"]+\.uic)"', re.IGNORECASE)
 
-def build_xml_uic_index(root_path: str) -> dict:
+def extract_xml_uic_refs(record, inventory=None) -> set:
     """
-    Retourne un dict: { 'nom_uic.ext' (lower) : set([xml_basename1, xml_basename2, ...]) }
+    Noms (lower) des .uic référencés dans un XML, via le cache d'inventaire si disponible.
     """
-    mapping = {}
-    xml_files = glob.glob(os.path.join(root_path, "**", "*.xml"), recursive=True)
-    for xf in xml_files:
+    if inventory is not None:
+        cached = inventory.lookup(record, STAGE_XML_UIC)
+        if cached is not None:
+            return set(cached)
+    txt = safe_read_text(record.path)
+    hits = set(os.path.basename(m).lower() for m in UIC_IN_XML_RE.findall(txt))
+    if inventory is not None:
+        inventory.store(record, STAGE_XML_UIC, sorted(hits))
+    return hits
+
+def read_xml_uic_refs(xml_records, inventory=None) -> dict:
+    """
+    Lit chaque XML une seule fois : { chemin_xml : set(noms_uic_lower) }
+    """
+    refs = {}
+    for rec in xml_records:
         try:
-            txt = safe_read_text(xf)
+            refs[rec.path] = extract_xml_uic_refs(rec, inventory)
         except Exception:
             continue
-        hits = set(os.path.basename(m).lower() for m in UIC_IN_XML_RE.findall(txt))
+    return refs
+
+def build_xml_uic_index(xml_records, xml_refs: dict) -> dict:
+    """
+    Retourne un dict: { 'nom_uic.ext' (lower) : set([xml_basename1, xml_basename2, ...]) }
+    """
+    mapping = {}
+    for rec in xml_records:
+        hits = xml_refs.get(rec.path)
         if not hits:
             continue
-        xml_name = os.path.basename(xf)
+        xml_name = os.path.basename(rec.path)
         for u in hits:
             mapping.setdefault(u, set()).add(xml_name)
     return mapping
 
 # =========================
-# ETAPE 0ter : Lecture de tous les .pmlcmd des 2 roots
+# ETAPE 0ter : Lecture des .pmlcmd découverts
 # =========================
-def read_all_pmlcmds(root_paths):
+def read_all_pmlcmds(pmlcmd_records):
     """
     Retourne une liste [(fullpath, basename, dirpath, content_lower), ...]
     """
-    files = []
-    for rp in root_paths:
-        files.extend(glob.glob(os.path.join(rp, "**", "*.pmlcmd"), recursive=True))
-    files = sorted(set(files))
+    files = sorted(set(rec.path for rec in pmlcmd_records))
     out = []
     for fp in tqdm(files, desc="Indexation PMLCMD"):
         try:
@@ -257,6 +305,19 @@ def enrich_dataframe_for_uic(df: pd.DataFrame) -> pd.DataFrame:
     df["Namespace_of_Filename"] = get_namespace_value(df)
     return df
 
+def load_enriched_uic(record, inventory=None) -> pd.DataFrame:
+    """
+    Extraction + enrichissement d'un UIC, en réutilisant le résultat en cache si le fichier n'a pas changé.
+    """
+    if inventory is not None:
+        cached = inventory.lookup(record, STAGE_UIC_ENRICHED)
+        if cached is not None:
+            return pd.DataFrame(cached)
+    df_enriched = enrich_dataframe_for_uic(parse_uic_to_dataframe(record.path))
+    if inventory is not None:
+        inventory.store(record, STAGE_UIC_ENRICHED, df_enriched.to_dict(orient="list"))
+    return df_enriched
+
 # =========================
 # ETAPE 3 : Fusion / colonnes / écriture
 # =========================
@@ -361,38 +422,84 @@ def write_synthesis_excel(df_final: pd.DataFrame, output_file: str):
 # PIPELINE GLOBAL
 # =========================
 def main():
-    # 0) Index XML -> UIC (path1 / path2)
-    print("Indexation des XML (Path 1)...")
-    xml_index_1 = build_xml_uic_index(ROOT_PATHS[0])
-    print(f"  {len(xml_index_1)} clés UIC référencées dans des XML du Path 1")
-
-    print("Indexation des XML (Path 2)...")
-    xml_index_2 = build_xml_uic_index(ROOT_PATHS[1])
-    print(f"  {len(xml_index_2)} clés UIC référencées dans des XML du Path 2")
-
-    # 0bis) Charger tous les .pmlcmd (contenu en minuscules)
-    pml_list = read_all_pmlcmds(ROOT_PATHS)  # [(full, base, dir, text_lower), ...]
-    print(f"{len(pml_list)} fichiers PMLCMD indexés.")
-
-    # 1) Lister tous les .uic sous les deux root paths
-    uic_files = []
-    for rp in ROOT_PATHS:
-        uic_files.extend(glob.glob(os.path.join(rp, "**", "*.uic"), recursive=True))
-    uic_files = sorted(set(uic_files))
-
-    if not uic_files:
-        print("Aucun fichier UIC trouvé dans les répertoires fournis.")
-        return
+    inventory = FileInventory(INVENTORY_DB) if USE_INVENTORY_CACHE else None
+    try:
+        run_pipeline(inventory)
+    finally:
+        if inventory is not None:
+            print(f"Cache inventaire : {inventory.hits} fichiers réutilisés, {inventory.misses} re-parsés.")
+            inventory.close()
+
+def run_pipeline(inventory=None):
+    # Racines canonicalisées : un root en double ou inclus dans un autre n'est pas reparcouru,
+    # ses fichiers sont repris depuis la racine englobante
+    plans = plan_roots(ROOT_PATHS)
+    for plan in plans:
+        if plan.parent is not None:
+            print(f"[INFO] {plan.path} est inclus dans {plan.parent} : sous-arbre non reparcouru.")
+    walked = {plan.path: i for i, plan in enumerate(plans) if plan.parent is None}
+
+    with ThreadPoolExecutor(max_workers=2 * len(walked)) as pool:
+        # 0) Une seule traversée par root (chacune parallélisée par le crawler), les roots l'un après l'autre
+        #    dans l'ordre de ROOT_PATHS : un répertoire atteint par plusieurs roots (jonction) revient toujours
+        #    au premier. Dès qu'un root est listé, la lecture de ses XML (refs UIC) et de ses .pmlcmd démarre
+        #    en tâche de fond pendant la découverte des roots suivants
+        visited_dirs = set()
+        buckets_by_root = {}
+        refs_futures = {}
+        pml_futures = []
+        uic_by_path = {}
+        for path, i in walked.items():
+            buckets = discover_root_files(path, visited_dirs)
+            buckets_by_root[i] = buckets
+            print(f"Path {i + 1} : {len(buckets['.xml'])} XML, {len(buckets['.pmlcmd'])} PMLCMD, "
+                  f"{len(buckets['.uic'])} UIC détectés.")
+            refs_futures[i] = pool.submit(read_xml_uic_refs, buckets[".xml"], inventory)
+            pml_futures.append(pool.submit(read_all_pmlcmds, buckets[".pmlcmd"]))
+            for rec in buckets[".uic"]:
+                uic_by_path.setdefault(rec.path, rec)
+
+        # 1) Liste dédupliquée de tous les .uic sous les root paths
+        uic_files = [uic_by_path[p] for p in sorted(uic_by_path)]
+
+        if not uic_files:
+            print("Aucun fichier UIC trouvé dans les répertoires fournis.")
+            return
+
+        print(f"{len(uic_files)} fichiers UIC détectés.")
+        parsed_uics = []
+
+        # 2) Pour chaque UIC : extraction -> enrichissement (pendant que XML / PMLCMD sont indexés)
+        for rec in tqdm(uic_files, desc="Traitement UIC (sans intermédiaires)"):
+            try:
+                parsed_uics.append((rec.path, load_enriched_uic(rec, inventory)))
+            except Exception as e:
+                print(f"[AVERTISSEMENT] Échec fichier: {rec.path} -> {e}")
+
+        # 0bis) Index XML -> UIC (path1 / path2)
+        def xml_index_for(i):
+            plan = plans[i]
+            if plan.parent is None:
+                return build_xml_uic_index(buckets_by_root[i][".xml"], refs_futures[i].result())
+            j = walked[plan.parent]
+            return build_xml_uic_index(records_under(buckets_by_root[j][".xml"], plan), refs_futures[j].result())
+
+        xml_index_1 = xml_index_for(0)
+        print(f"  {len(xml_index_1)} clés UIC référencées dans des XML du Path 1")
+        xml_index_2 = xml_index_for(1)
+        print(f"  {len(xml_index_2)} clés UIC référencées dans des XML du Path 2")
+
+        # 0ter) Tous les .pmlcmd (contenu en minuscules), dédupliqués entre roots
+        pml_by_path = {}
+        for fut in pml_futures:
+            for item in fut.result():
+                pml_by_path.setdefault(item[0], item)
+        pml_list = [pml_by_path[p] for p in sorted(pml_by_path)]  # [(full, base, dir, text_lower), ...]
+        print(f"{len(pml_list)} fichiers PMLCMD indexés.")
 
-    print(f"{len(uic_files)} fichiers UIC détectés.")
     all_enriched = []
-
-    # 2) Pour chaque UIC : extraction -> enrichissement -> collecte (mémoire)
-    for file_path in tqdm(uic_files, desc="Traitement UIC (sans intermédiaires)"):
+    for file_path, df_enriched in parsed_uics:
         try:
-            df_raw = parse_uic_to_dataframe(file_path)
-            df_enriched = enrich_dataframe_for_uic(df_raw)
-
             # Ajout des 2 colonnes XML (Path 1 / Path 2) constantes par fichier
             uic_key = os.path.basename(file_path).lower()
             xmls_1 = " | ".join(sorted(xml_index_1.get(uic_key, [])))
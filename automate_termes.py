@@ -0,0 +1,92 @@
+from collections import deque
+
+# =========================
+# Recherche simultanée de nombreux termes (automate d'Aho-Corasick)
+# =========================
+# L'automate est construit une fois à partir de tous les termes ; chaque ligne est ensuite parcourue une seule fois,
+# caractère par caractère, quel que soit le nombre de termes (liste_dll.txt peut en contenir des milliers).
+# Sémantique identique à `term.lower() in line.lower()` pour chaque terme.
+
+
+class TermAutomaton:
+    """
+    Automate insensible à la casse sur une liste de termes. Les doublons sont conservés :
+    chaque position de la liste d'origine est rapportée (mêmes lignes de résultat qu'une boucle sur la liste).
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.goto = [{}]     # transitions de chaque état
+        self.fail = [0]      # lien d'échec (plus long suffixe propre qui est aussi un préfixe)
+        self.output = [()]   # indices des termes reconnus en arrivant dans l'état (liens d'échec compris)
+        self.always = []     # termes vides : présents dans toute ligne
+
+        for index, term in enumerate(self.terms):
+            pattern = term.lower()
+            if not pattern:
+                self.always.append(index)
+                continue
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += (index,)
+
+        # Liens d'échec en largeur : les sorties d'un état incluent celles de son lien d'échec
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, text_lower):
+        """
+        Indices (triés, dans l'ordre de la liste des termes) des termes présents dans un texte déjà en minuscules.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set(self.always)
+        state = 0
+        for ch in text_lower:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return sorted(found)
+
+    def contains_any(self, text_lower):
+        """
+        Vrai dès qu'un terme est trouvé dans un texte déjà en minuscules (arrêt à la première occurrence).
+        """
+        if self.always:
+            return True
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for ch in text_lower:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                return True
+        return False
+
+    def matching_terms(self, line):
+        """
+        Termes présents dans une ligne (insensible à la casse), dans l'ordre de la liste.
+        """
+        return [self.terms[i] for i in self.search(line.lower())]
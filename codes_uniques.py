@@ -0,0 +1,77 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Codes uniques hiérarchiques ("DLL00001", "NS0001"...) stables d'une exécution à l'autre
+# =========================
+# Chaque valeur distincte d'un niveau (DLL, namespace, fichier .cs, signature) reçoit un numéro conservé dans un
+# dictionnaire SQLite : l'ajout de nouvelles DLL ne décale pas les codes existants, les nouvelles valeurs prennent
+# les numéros suivants dans leur ordre d'apparition. Sans dictionnaire : numérotation de pd.factorize (1, 2, 3...).
+
+
+class CodeDictionary:
+    """
+    Dictionnaire persistant (SQLite) : (niveau, valeur) -> numéro.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS codes (
+                level TEXT NOT NULL,
+                value TEXT NOT NULL,
+                code  INTEGER NOT NULL,
+                PRIMARY KEY (level, value)
+            )
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def assign(self, level, values):
+        """
+        Numéros des valeurs (dans l'ordre donné) ; les valeurs inconnues sont ajoutées à la suite du niveau.
+        """
+        known = dict(self.conn.execute("SELECT value, code FROM codes WHERE level = ?", (level,)))
+        next_code = max(known.values(), default=0) + 1
+        new_rows = []
+        codes = []
+        for value in values:
+            code = known.get(value)
+            if code is None:
+                code = known[value] = next_code
+                next_code += 1
+                new_rows.append((level, value, code))
+            codes.append(code)
+        self.conn.executemany("INSERT INTO codes (level, value, code) VALUES (?, ?, ?)", new_rows)
+        self.conn.commit()
+        return codes
+
+
+def encode_column(series, prefix, digits, dictionary=None, level=None):
+    """
+    Colonne de codes "<prefix><numéro sur `digits` chiffres>" : chaque valeur distincte est numérotée et formatée
+    une seule fois, puis redistribuée aux lignes par les codes de pd.factorize. Valeur vide (NaN) -> numéro 0.
+    """
+    row_codes, uniques = pd.factorize(series)
+    if dictionary is not None:
+        numbers = dictionary.assign(level or prefix, [str(value) for value in uniques])
+    else:
+        numbers = range(1, len(uniques) + 1)
+    # Dernière entrée : numéro 0 pour les valeurs manquantes (code -1 de factorize)
+    labels = np.array([f"{prefix}{number:0{digits}d}" for number in numbers] + [f"{prefix}{0:0{digits}d}"],
+                      dtype=object)
+    return pd.Series(labels[row_codes], index=series.index)
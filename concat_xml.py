@@ -1,5 +1,6 @@
 import os
-import glob
+
+from corpus_crawler import crawl
 
 # =========================
 # CONFIG
@@ -45,10 +46,9 @@ def read_text_keep_indentation(file_path):
 def gather_xml_files(root_paths):
     """
     Récupère la liste dédupliquée de tous les .xml sous les chemins fournis.
+    Les racines en double / imbriquées et les boucles de liens sont écartées par le crawler.
     """
-    files = []
-    for rp in root_paths:
-        files.extend(glob.glob(os.path.join(rp, "**", "*.xml"), recursive=True))
+    files = [rec.path for rec in crawl(root_paths, ["*.xml"])]
     # déduplication
     files = list(set(files))
     if SORT_RESULTS:
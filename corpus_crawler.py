@@ -0,0 +1,231 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# =========================
+# Crawler commun des corpus (PML, C#, XML, UIC, DLL...)
+# =========================
+# Un enregistrement par fichier découvert
+FileRecord = namedtuple("FileRecord", ["path", "root", "ext", "size", "mtime"])
+
+# Plan d'une racine : `parent` = racine englobante si celle-ci est élaguée (imbriquée / doublon), sinon None
+RootPlan = namedtuple("RootPlan", ["path", "key", "parent"])
+
+# Nombre de threads par défaut : le parcours est dominé par les I/O (disques réseau)
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def normaliser_extensions(extensions):
+    """
+    Convertit une liste de motifs ("*.pmlfrm", ".cs", "dll", "", "*") en un set d'extensions
+    en minuscules, utilisable en recherche O(1).
+      - ""  -> fichiers sans extension
+      - "*" -> toute extension non vide
+    None signifie "tous les fichiers".
+    """
+    if extensions is None:
+        return None
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    exts = set()
+    for pattern in extensions:
+        pattern = pattern.strip().lower()
+        if pattern in ("", "*"):
+            exts.add(pattern)
+            continue
+        if pattern.startswith("*"):
+            pattern = pattern[1:]
+        if not pattern.startswith("."):
+            pattern = "." + pattern
+        exts.add(pattern)
+    return exts
+
+
+def classer_extension(filename, exts):
+    """
+    Retourne l'extension du fichier (casse d'origine) si elle est retenue par `exts`, sinon None.
+    """
+    ext = os.path.splitext(filename)[1]
+    if exts is None:
+        return ext
+    if ext:
+        if ext.lower() in exts or "*" in exts:
+            return ext
+    elif "" in exts:
+        return ""
+    return None
+
+
+# =========================
+# Planification des racines
+# =========================
+def canonical_path(path):
+    """
+    Clé canonique d'un chemin : absolu, liens symboliques / jonctions résolus,
+    séparateurs normalisés et casse ignorée (comparaison type Windows).
+    """
+    key = os.path.normcase(os.path.realpath(os.path.abspath(path))).casefold()
+    stripped = key.rstrip("\\/")
+    # Conserver le séparateur des racines de volume ("c:\\", "/")
+    if not stripped or stripped.endswith(":"):
+        return key
+    return stripped
+
+
+def is_under(key, parent_key):
+    """
+    True si la clé canonique `key` est égale à `parent_key` ou située sous celle-ci.
+    """
+    if key == parent_key:
+        return True
+    prefix = parent_key if parent_key.endswith(("\\", "/")) else parent_key + os.sep
+    return key.startswith(prefix)
+
+
+def plan_roots(roots):
+    """
+    Canonicalise les racines et marque celles qui sont des doublons ou imbriquées dans une autre
+    (ex: "C:\\Program Files (x86)\\AVEVA" contient "...\\AVEVA\\Everything3D2.10").
+    Retourne un RootPlan par racine, dans l'ordre d'entrée.
+    """
+    if isinstance(roots, str):
+        roots = [roots]
+    keyed = [(path, canonical_path(path)) for path in roots]
+    kept = []
+    plans = {}
+    # Les racines les plus courtes d'abord : un englobant est toujours traité avant ses sous-racines
+    for idx in sorted(range(len(keyed)), key=lambda i: (len(keyed[i][1]), i)):
+        path, key = keyed[idx]
+        parent = next((kept_path for kept_path, kept_key in kept if is_under(key, kept_key)), None)
+        if parent is None:
+            kept.append((path, key))
+        plans[idx] = RootPlan(path, key, parent)
+    return [plans[i] for i in range(len(keyed))]
+
+
+def records_under(records, plan):
+    """
+    Filtre, parmi les enregistrements de la racine englobante, ceux qui appartiennent à la racine
+    élaguée `plan` (évite de reparcourir le sous-arbre).
+    """
+    parent_key = canonical_path(plan.parent)
+    relative = plan.key[len(parent_key):].lstrip("\\/")
+    if not relative:
+        return list(records)
+    out = []
+    for rec in records:
+        try:
+            rel = os.path.normcase(os.path.relpath(rec.path, plan.parent)).casefold()
+        except ValueError:
+            continue
+        if is_under(rel, relative):
+            out.append(rec)
+    return out
+
+
+def _directory_identity(path):
+    """
+    Identité physique d'un répertoire (périphérique, inode) pour détecter les boucles de liens /
+    jonctions ; repli sur le chemin canonique si le système ne fournit pas d'inode.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_ino:
+        return (st.st_dev, st.st_ino)
+    return canonical_path(path)
+
+
+# =========================
+# Parcours
+# =========================
+def _scan_directory(directory, root, exts, follow_links=False):
+    """
+    Lit un seul répertoire avec os.scandir.
+    Retourne (enregistrements, [(sous-répertoire, identité), ...]).
+    Les erreurs d'accès sont ignorées, comme os.walk.
+    """
+    records = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=follow_links):
+                        identity = _directory_identity(entry.path)
+                        if identity is not None:
+                            subdirs.append((entry.path, identity))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                ext = classer_extension(entry.name, exts)
+                if ext is None:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                records.append(FileRecord(entry.path, root, ext, st.st_size, st.st_mtime))
+    except OSError:
+        pass
+    return records, subdirs
+
+
+def crawl(roots, extensions=None, workers=DEFAULT_WORKERS, follow_links=False, visited=None):
+    """
+    Parcourt récursivement les racines en parallèle (un répertoire = une tâche) et produit
+    au fil de l'eau des FileRecord(path, root, ext, size, mtime).
+
+    `extensions` accepte les mêmes motifs que les scripts ("*.pmlfrm", "", "*"...).
+    Les racines en double ou imbriquées sont élaguées (plan_roots) et chaque répertoire physique
+    n'est lu qu'une fois, même atteint par un lien symbolique ou une jonction.
+    `visited` permet de partager les répertoires déjà lus entre plusieurs appels.
+    L'ordre de sortie dépend de l'achèvement des tâches : trier en aval si besoin.
+    """
+    roots = [plan.path for plan in plan_roots(roots) if plan.parent is None]
+    exts = normaliser_extensions(extensions)
+
+    if visited is None:
+        visited = set()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {}
+        for root in roots:
+            identity = _directory_identity(root)
+            if identity is None or identity in visited:
+                continue
+            visited.add(identity)
+            pending[pool.submit(_scan_directory, root, root, exts, follow_links)] = root
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    root = pending.pop(future)
+                    records, subdirs = future.result()
+                    for subdir, identity in subdirs:
+                        if identity in visited:
+                            continue
+                        visited.add(identity)
+                        pending[pool.submit(_scan_directory, subdir, root, exts, follow_links)] = root
+                    yield from records
+        finally:
+            # Arrêt anticipé du consommateur : on abandonne les répertoires non encore lus
+            for future in pending:
+                future.cancel()
+
+
+def stat_record(path, root=""):
+    """
+    Construit un FileRecord pour un chemin isolé (fichier obtenu hors crawler).
+    """
+    st = os.stat(path)
+    return FileRecord(path, root, os.path.splitext(path)[1], st.st_size, st.st_mtime)
+
+
+def list_files(roots, extensions=None, workers=DEFAULT_WORKERS, follow_links=False):
+    """
+    Variante non streamée : liste des FileRecord triée par chemin (ordre reproductible).
+    """
+    return sorted(crawl(roots, extensions, workers, follow_links), key=lambda r: r.path)
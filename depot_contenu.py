@@ -0,0 +1,113 @@
+import os
+import shutil
+import threading
+from collections import defaultdict
+
+from inventaire_fichiers import FileInventory
+
+# =========================
+# Dépôt adressé par contenu (dédoublonnage des DLL / PML / XML dupliqués)
+# =========================
+# DEPOT/blobs/ab/abcdef....ext  : une seule copie par contenu
+# DEPOT/depot.sqlite            : inventaire (hash) + manifeste chemin d'origine -> blob
+
+
+class ContentStore(FileInventory):
+    """
+    Dépôt de blobs indexés par hash SHA-256, avec un manifeste des chemins d'origine.
+    Hérite de FileInventory : un fichier inchangé (taille + mtime) n'est jamais rehashé.
+    """
+
+    def __init__(self, store_root, use_hardlinks=False):
+        self.store_root = store_root
+        self.blob_root = os.path.join(store_root, "blobs")
+        self.use_hardlinks = use_hardlinks
+        os.makedirs(self.blob_root, exist_ok=True)
+        super().__init__(os.path.join(store_root, "depot.sqlite"))
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS manifest (
+                    path TEXT PRIMARY KEY,
+                    root TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    ext  TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS manifest_hash ON manifest (hash);
+            """)
+
+    def blob_path(self, digest, ext=""):
+        """
+        Chemin du blob correspondant à un hash (sous-dossier = 2 premiers caractères).
+        """
+        return os.path.join(self.blob_root, digest[:2], digest + ext.lower())
+
+    def add(self, record, materialize=True):
+        """
+        Enregistre un fichier (FileRecord du crawler) dans le manifeste et retourne son hash.
+        Avec `materialize`, le contenu est aussi déposé dans blobs/ s'il n'y est pas déjà
+        (copie ; lien physique vers la source si use_hardlinks, au risque de suivre ses modifications). Retourne None si le fichier est illisible.
+        """
+        digest = self.current_hash(record)
+        if digest is None:
+            return None
+        if materialize:
+            blob = self.blob_path(digest, record.ext)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                tmp = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    if self.use_hardlinks:
+                        try:
+                            os.link(record.path, tmp)
+                        except OSError:
+                            shutil.copy2(record.path, tmp)
+                    else:
+                        shutil.copy2(record.path, tmp)
+                    os.replace(tmp, blob)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO manifest (path, root, hash, ext) VALUES (?, ?, ?, ?)",
+                (record.path, record.root, digest, record.ext.lower()),
+            )
+            self._maybe_commit()
+        return digest
+
+    def groups(self, paths=None):
+        """
+        Regroupe les chemins du manifeste par contenu : { hash : [chemin, ...] } (chemins triés).
+        `paths` restreint le résultat aux chemins fournis (ex: ceux du parcours courant).
+        """
+        wanted = set(paths) if paths is not None else None
+        out = defaultdict(list)
+        with self.lock:
+            rows = self.conn.execute("SELECT path, hash FROM manifest").fetchall()
+        for path, digest in rows:
+            if wanted is None or path in wanted:
+                out[digest].append(path)
+        for digest in out:
+            out[digest].sort(key=str.lower)
+        return dict(out)
+
+    def duplication_ratio(self, paths=None):
+        """
+        Nombre de chemins / nombre de contenus uniques (1.0 = aucun doublon).
+        """
+        grouped = self.groups(paths)
+        if not grouped:
+            return 1.0
+        return sum(len(v) for v in grouped.values()) / len(grouped)
+
+    def prune(self, seen_paths):
+        seen = set(seen_paths)
+        removed = super().prune(seen)
+        with self.lock:
+            stale = [p for (p,) in self.conn.execute("SELECT path FROM manifest") if p not in seen]
+            for i in range(0, len(stale), 500):
+                chunk = stale[i:i + 500]
+                self.conn.execute(f"DELETE FROM manifest WHERE path IN ({','.join('?' * len(chunk))})", chunk)
+            self.conn.commit()
+        return removed
+
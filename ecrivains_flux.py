@@ -0,0 +1,199 @@
+import os
+import csv
+import json
+import sqlite3
+
+# =========================
+# Écriture des résultats au fil de l'eau (JSONL / JSON / CSV), mémoire bornée
+# =========================
+# Chaque ligne est écrite dès qu'elle est produite ; les fichiers ne sont créés qu'à la première ligne
+# (un répertoire sans résultat ne produit pas de fichier, comme auparavant).
+
+
+class _LazyFile:
+    """
+    Fichier ouvert à la première écriture, avec flush optionnel toutes les `flush_every` lignes.
+    """
+
+    def __init__(self, path, flush_every=0, newline=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.newline = newline
+        self.file = None
+        self.count = 0
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8", newline=self.newline)
+
+    def _written(self):
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class JsonlWriter(_LazyFile):
+    """
+    Une ligne JSON par résultat.
+    """
+
+    def write(self, row):
+        if self.file is None:
+            self._open()
+        self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._written()
+
+
+class JsonArrayWriter(_LazyFile):
+    """
+    Tableau JSON indenté, octet pour octet identique à json.dump(liste, indent=4, ensure_ascii=False).
+    """
+
+    def write(self, row):
+        if self.file is None:
+            self._open()
+            self.file.write("[\n")
+        else:
+            self.file.write(",\n")
+        text = json.dumps(row, indent=4, ensure_ascii=False)
+        self.file.write("\n".join("    " + line for line in text.split("\n")))
+        self._written()
+
+    def close(self):
+        if self.file is not None:
+            self.file.write("\n]")
+        super().close()
+
+
+class CsvStreamWriter(_LazyFile):
+    """
+    CSV à colonnes fixes (en-tête écrit avec la première ligne) ; colonne absente d'une ligne -> vide.
+    fieldnames=None : colonnes prises sur la première ligne (comme DictWriter(fieldnames=data_list[0].keys())),
+    les clés absentes de celle-ci étant ignorées dans les lignes suivantes.
+    """
+
+    def __init__(self, path, fieldnames=None, flush_every=0):
+        super().__init__(path, flush_every, newline="")
+        self.fieldnames = None if fieldnames is None else list(fieldnames)
+        self.writer = None
+
+    def write(self, row):
+        if self.file is None:
+            self._open()
+            if self.fieldnames is None:
+                self.fieldnames = list(row)
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, restval="", extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerow(row)
+        self._written()
+
+
+class RowSink:
+    """
+    Diffuse chaque ligne vers plusieurs écrivains (ex: JSONL + CSV) et compte les lignes écrites.
+    """
+
+    def __init__(self, *writers):
+        self.writers = [w for w in writers if w is not None]
+        self.count = 0
+
+    def write(self, row):
+        for writer in self.writers:
+            writer.write(row)
+        self.count += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+class SqliteDatasetWriter:
+    """
+    Jeu de données unique : une table SQLite à colonnes fixes, partitionnée par `partition_column` (la DLL).
+    Insertions par lots ; la table est reconstruite à chaque exécution. Lecture en une requête, ex. :
+        pd.read_sql_query('SELECT * FROM analyse', sqlite3.connect(db_path))
+    """
+
+    def __init__(self, db_path, columns, partition_column, table="analyse", batch_size=5000):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.batch = []
+        self.count = 0
+        quoted = ", ".join(f'"{c}"' for c in self.columns)
+        self.insert_sql = f'INSERT INTO "{table}" ({quoted}) VALUES ({", ".join("?" * len(self.columns))})'
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(f"""
+            DROP TABLE IF EXISTS "{table}";
+            CREATE TABLE "{table}" ({quoted});
+            CREATE INDEX "{table}_partition" ON "{table}" ("{partition_column}");
+        """)
+
+    def write(self, row):
+        self.batch.append(tuple(row.get(c, "") for c in self.columns))
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self.batch:
+            self.conn.executemany(self.insert_sql, self.batch)
+            self.conn.commit()
+            self.batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self._flush()
+            self.conn.close()
+            self.conn = None
+
+
+def write_excel_stream(df, path, sheet_name="Sheet1", autofilter=True, width_padding=2):
+    """
+    Écrit un DataFrame en .xlsx en une seule passe, classeur openpyxl en mode write_only (mémoire constante) :
+    largeurs de colonnes calculées avant l'écriture à partir des longueurs de chaînes (vectorisé, en-tête compris),
+    filtre automatique posé dans la même passe. Remplace to_excel + load_workbook + ajustement cellule par cellule.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+
+    # En mode write_only, largeurs et filtre doivent être posés avant la première ligne
+    for i, column in enumerate(df.columns, 1):
+        values = df[column]
+        lengths = values.astype(str).str.len().where(values.notna(), 0)
+        longest = int(lengths.max()) if len(values) else 0
+        ws.column_dimensions[get_column_letter(i)].width = max(len(str(column)), longest) + width_padding
+    if autofilter and len(df.columns):
+        ws.auto_filter.ref = f"A1:{get_column_letter(len(df.columns))}{len(df) + 1}"
+
+    ws.append([str(column) for column in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        # NaN -> cellule vide, comme to_excel
+        ws.append([None if isinstance(value, float) and value != value else value for value in row])
+    wb.save(path)
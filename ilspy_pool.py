@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import hashlib
+import shutil
+import signal
+import sqlite3
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# =========================
+# Décompilation ILSpy en parallèle (N processus ilspycmd, délai maximal et reprises par DLL)
+# =========================
+# Les plus grosses DLL partent en premier pour ne pas finir le lot sur une longue décompilation isolée.
+# Chaque résultat est écrit dans un journal JSONL (une ligne par DLL) au lieu du log.txt texte.
+
+DEFAULT_WORKERS = max(1, min(8, (os.cpu_count() or 2) // 2))
+DEFAULT_TIMEOUT = 300        # secondes, pour une DLL de taille nulle
+DEFAULT_TIMEOUT_PER_MB = 60  # secondes supplémentaires par Mo de DLL
+DEFAULT_RETRIES = 1          # nouvelles tentatives après un échec ou un dépassement de délai
+
+DecompileJob = namedtuple("DecompileJob", ["dll_path", "output_dir", "size"])
+
+DecompileResult = namedtuple("DecompileResult", [
+    "dll_path",
+    "output_dir",
+    "status",      # "ok", "echec" (code retour != 0), "timeout", "erreur" (lancement impossible)
+    "returncode",
+    "attempts",
+    "duration",    # secondes, toutes tentatives confondues
+    "message",     # fin de stderr / description de l'erreur
+])
+
+
+def plan_output_dirs(dll_paths, output_root):
+    """
+    Associe à chaque DLL un dossier de sortie output_root/<nom sans extension>.
+    Deux DLL de même nom (dossiers différents) ne partagent jamais un dossier : le premier chemin
+    (ordre trié) garde le nom, les suivants sont suffixés par un hash court de leur chemin.
+    """
+    planned = {}
+    used = set()
+    for dll_path in sorted(dll_paths, key=str.lower):
+        short_name = os.path.splitext(os.path.basename(dll_path))[0]
+        if short_name.lower() in used:
+            suffix = hashlib.sha1(os.path.normcase(dll_path).encode("utf-8")).hexdigest()[:8]
+            short_name = f"{short_name}~{suffix}"
+        used.add(short_name.lower())
+        planned[dll_path] = os.path.join(output_root, short_name)
+    return planned
+
+
+def build_jobs(output_dirs):
+    """
+    { chemin DLL : dossier de sortie } -> [DecompileJob], du plus gros au plus petit fichier.
+    """
+    jobs = []
+    for dll_path, output_dir in output_dirs.items():
+        try:
+            size = os.path.getsize(dll_path)
+        except OSError:
+            size = 0
+        jobs.append(DecompileJob(dll_path, output_dir, size))
+    jobs.sort(key=lambda j: (-j.size, j.dll_path.lower()))
+    return jobs
+
+
+def _kill_tree(proc):
+    """
+    Arrête ilspycmd et ses processus enfants (le shim dotnet tool lance un second processus).
+    """
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+
+def _run_once(cmd, timeout):
+    """
+    Lance une commande avec délai maximal : retourne (code retour ou None si timeout, stderr).
+    """
+    kwargs = {"start_new_session": True} if os.name != "nt" else {}
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, errors="replace", **kwargs)
+    try:
+        _, stderr = proc.communicate(timeout=timeout)
+        return proc.returncode, stderr or ""
+    except subprocess.TimeoutExpired:
+        _kill_tree(proc)
+        proc.communicate()
+        return None, ""
+
+
+def decompile_one(ilspy_path, job, timeout=DEFAULT_TIMEOUT, timeout_per_mb=DEFAULT_TIMEOUT_PER_MB,
+                  retries=DEFAULT_RETRIES, extra_args=(), clean_output=False):
+    """
+    Décompile une DLL en projet (-p) avec reprises. Retourne un DecompileResult.
+    `clean_output` remplace le dossier de sortie (ILSpy ne supprime pas les .cs d'une version précédente) :
+    la décompilation se fait dans un dossier temporaire voisin, renommé à la place de l'ancien seulement
+    en cas de succès. Un échec laisse la sortie précédente intacte, jamais un dossier partiel.
+    """
+    work_dir = job.output_dir + ".en_cours" if clean_output else job.output_dir
+    if clean_output and os.path.isdir(work_dir):
+        shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir, exist_ok=True)
+    cmd = [ilspy_path, job.dll_path, "-p", "-o", work_dir, *extra_args]
+    limit = timeout + timeout_per_mb * job.size / (1024 * 1024)
+    start = time.perf_counter()
+    status, returncode, message = "echec", None, ""
+    attempts = 0
+    for attempts in range(1, retries + 2):
+        try:
+            returncode, stderr = _run_once(cmd, limit)
+        except OSError as e:
+            status, message = "erreur", str(e)
+            break  # exécutable absent / non lançable : inutile de réessayer
+        if returncode is None:
+            status, message = "timeout", f"Délai dépassé ({limit:.0f} s)"
+            continue
+        if returncode == 0:
+            status, message = "ok", ""
+            break
+        status, message = "echec", stderr.strip()[-500:]
+    if clean_output:
+        try:
+            if status == "ok":
+                if os.path.isdir(job.output_dir):
+                    shutil.rmtree(job.output_dir)
+                os.rename(work_dir, job.output_dir)
+            else:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        except OSError as e:
+            status, message = "erreur", f"Remplacement de {job.output_dir} impossible : {e}"
+    return DecompileResult(job.dll_path, job.output_dir, status, returncode, attempts,
+                           round(time.perf_counter() - start, 3), message)
+
+
+def decompile_all(ilspy_path, jobs, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT,
+                  timeout_per_mb=DEFAULT_TIMEOUT_PER_MB, retries=DEFAULT_RETRIES, log_path=None, extra_args=(),
+                  clean_output=False):
+    """
+    Décompile les DLL en parallèle et produit les DecompileResult au fil de l'eau (ordre d'achèvement).
+    Avec `log_path`, chaque résultat est ajouté au journal JSONL.
+    """
+    log_file = open(log_path, "w", encoding="utf-8") if log_path else None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(decompile_one, ilspy_path, job, timeout, timeout_per_mb, retries, extra_args,
+                            clean_output): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                result = future.result()
+                if log_file:
+                    entry = dict(result._asdict(), size=job.size, dll=os.path.basename(job.dll_path))
+                    log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    log_file.flush()
+                yield result
+    finally:
+        if log_file:
+            log_file.close()
+
+
+def summarize(results):
+    """
+    Compte des statuts : { "ok": n, "echec": n, ... }
+    """
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return counts
+
+
+def ilspy_version(ilspy_path):
+    """
+    Version d'ilspycmd (sortie de --version), à défaut une empreinte taille + date de l'exécutable.
+    Sert de clé de cache : changer de décompilateur invalide les sorties existantes.
+    """
+    try:
+        result = subprocess.run([ilspy_path, "--version"], capture_output=True, text=True, timeout=60)
+        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        if result.returncode == 0 and lines:
+            return " | ".join(lines)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        st = os.stat(ilspy_path)
+        return f"{os.path.basename(ilspy_path)}:{st.st_size}:{int(st.st_mtime)}"
+    except OSError:
+        return "inconnue"
+
+
+class DecompileCache:
+    """
+    Cache persistant (SQLite) : hash du contenu de la DLL + version d'ilspycmd -> dossier déjà décompilé.
+    Une DLL inchangée, ou identique à une DLL déjà décompilée ailleurs, n'est pas redécompilée.
+    """
+
+    def __init__(self, db_path, tool_version):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.tool_version = tool_version
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS decompiled (
+                hash         TEXT NOT NULL,
+                tool_version TEXT NOT NULL,
+                output_dir   TEXT NOT NULL,
+                PRIMARY KEY (hash, tool_version)
+            )
+        """)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def get(self, digest):
+        """
+        Dossier de sortie existant pour ce contenu, ou None (jamais décompilé, autre version, dossier supprimé).
+        """
+        row = self.conn.execute(
+            "SELECT output_dir FROM decompiled WHERE hash = ? AND tool_version = ?", (digest, self.tool_version)
+        ).fetchone()
+        if row and os.path.isdir(row[0]) and any(os.scandir(row[0])):
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, digest, output_dir):
+        """
+        Enregistre une décompilation réussie. Les entrées qui pointaient vers ce dossier
+        (ancienne version de la DLL, écrasée) sont retirées.
+        """
+        self.conn.execute("DELETE FROM decompiled WHERE output_dir = ?", (output_dir,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO decompiled (hash, tool_version, output_dir) VALUES (?, ?, ?)",
+            (digest, self.tool_version, output_dir),
+        )
+        self.conn.commit()
+
+    def forget(self, output_dir):
+        """
+        Retire les entrées qui pointent vers ce dossier, avant qu'il ne soit redécompilé : un arrêt en cours
+        de route ne laisse jamais une entrée associer un ancien contenu à une sortie remplacée.
+        """
+        self.conn.execute("DELETE FROM decompiled WHERE output_dir = ?", (output_dir,))
+        self.conn.commit()
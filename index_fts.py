@@ -0,0 +1,187 @@
+import os
+import re
+import sqlite3
+from collections import namedtuple
+
+from corpus_crawler import crawl
+from concat_xml import read_text_keep_indentation
+
+# =========================
+# Base de recherche plein texte (SQLite FTS5) : PML, C# décompilé, UIC, XML
+# =========================
+# Chaque ligne non vide des sources est chargée une fois dans une table FTS5 (tokenizer "trigram" :
+# recherche de sous-chaîne servie par l'index). L'index porte la ligne en minuscules (str.lower()) : le pliage
+# de casse de SQLite ne couvre que l'ASCII, "É" ne serait pas trouvé par "é". Tables de métadonnées : fichiers
+# (corpus, racine, extension, taille, date) ; le numéro de ligne est porté par le rowid de la ligne.
+# Mise à jour incrémentale : seuls les fichiers nouveaux ou modifiés sont relus, les disparus sont retirés.
+
+# Corpus indexables : nom -> motifs d'extensions (corpus_crawler)
+CORPUS_EXTENSIONS = {
+    "pml": ["*.pmlfrm", "*.pmlobj", "*.pmlcmd", "*.pmlfnc", "*.pmlmac", "*.mac", ""],
+    "cs": ["*.cs"],
+    "uic": ["*.uic"],
+    "xml": ["*.xml"],
+}
+# Corpus lus avec détection d'encodage (UTF-16, cp1252...) comme concat_xml ; les autres en UTF-8 permissif
+MULTI_ENCODING_CORPORA = {"uic", "xml"}
+
+# rowid d'une ligne = file_id << LINE_BITS | numéro de ligne
+LINE_BITS = 24
+LINE_MASK = (1 << LINE_BITS) - 1
+
+# Le trigram n'indexe que les termes d'au moins 3 caractères ; en deçà, parcours (instr) de la table
+TRIGRAM_MIN_LENGTH = 3
+
+# Version du schéma (PRAGMA user_version) : une base d'une autre version est reconstruite
+INDEX_VERSION = 2
+
+NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+
+# Ligne trouvée : fichier, racine d'indexation, extension, corpus, numéro de ligne, texte
+Hit = namedtuple("Hit", ["path", "root", "ext", "corpus", "line", "text"])
+
+
+def read_lines(path, corpus):
+    """
+    Lignes d'un fichier source (sans fin de ligne), découpées comme readlines() en mode texte.
+    """
+    if corpus in MULTI_ENCODING_CORPORA:
+        text = read_text_keep_indentation(path)
+    else:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    lines = NEWLINE_RE.split(text)
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+class CodeSearchIndex:
+    """
+    Base FTS5 multi-corpus. `corpora` : { "pml": [racines], "cs": [racines], ... } (voir CORPUS_EXTENSIONS).
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS lines;
+                DROP TABLE IF EXISTS files;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id     INTEGER PRIMARY KEY,
+                path   TEXT NOT NULL UNIQUE,
+                root   TEXT NOT NULL,
+                ext    TEXT NOT NULL,
+                corpus TEXT NOT NULL,
+                size   INTEGER NOT NULL,
+                mtime  REAL NOT NULL,
+                line_count INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_corpus ON files (corpus);
+            CREATE VIRTUAL TABLE IF NOT EXISTS lines USING fts5(text UNINDEXED, text_lower, tokenize = "trigram");
+        """)
+        self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    # --- Construction ---
+    def update(self, corpora):
+        """
+        Met la base à jour. Retourne { corpus : (fichiers indexés, fichiers retirés) }.
+        """
+        stats = {}
+        for corpus, roots in corpora.items():
+            if isinstance(roots, str):
+                roots = [roots]
+            known = {path: (file_id, size, mtime, root) for file_id, path, size, mtime, root in self.conn.execute(
+                "SELECT id, path, size, mtime, root FROM files WHERE corpus = ?", (corpus,))}
+            seen = set()
+            scanned = 0
+            for rec in crawl(roots, CORPUS_EXTENSIONS[corpus]):
+                seen.add(rec.path)
+                entry = known.get(rec.path)
+                if entry and entry[1:3] == (rec.size, rec.mtime):
+                    if entry[3] != rec.root:
+                        # Fichier inchangé atteint depuis une autre racine (racines imbriquées reconfigurées)
+                        self.conn.execute("UPDATE files SET root = ? WHERE id = ?", (rec.root, entry[0]))
+                    continue
+                try:
+                    lines = read_lines(rec.path, corpus)
+                except OSError:
+                    continue
+                if entry:
+                    self._forget(entry[0])
+                # Une ligne au-delà de LINE_MASK ne serait pas adressable : fichier tronqué à cette limite
+                lines = lines[:LINE_MASK]
+                file_id = self.conn.execute(
+                    "INSERT INTO files (path, root, ext, corpus, size, mtime, line_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (rec.path, rec.root, rec.ext, corpus, rec.size, rec.mtime, len(lines))).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO lines (rowid, text, text_lower) VALUES (?, ?, ?)",
+                    (((file_id << LINE_BITS) | number, text, text.lower())
+                     for number, text in enumerate(lines, start=1) if text.strip()))
+                scanned += 1
+                if scanned % 500 == 0:
+                    self.conn.commit()
+
+            root_set = set(roots)
+            removed = [file_id for file_id, path, root in self.conn.execute(
+                "SELECT id, path, root FROM files WHERE corpus = ?", (corpus,))
+                if path not in seen and root in root_set]
+            for file_id in removed:
+                self._forget(file_id)
+            self.conn.commit()
+            stats[corpus] = (scanned, len(removed))
+        return stats
+
+    def _forget(self, file_id):
+        self.conn.execute("DELETE FROM lines WHERE rowid BETWEEN ? AND ?",
+                          (file_id << LINE_BITS, (file_id << LINE_BITS) | LINE_MASK))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    # --- Requêtes ---
+    def search(self, term, corpora=None, roots=None):
+        """
+        Lignes contenant `term` (sous-chaîne, insensible à la casse), triées par fichier puis ligne.
+        Équivalent indexé de `term.lower() in line.lower()` sur tout le corpus (Unicode compris : la
+        colonne indexée est déjà en minuscules). `roots` restreint aux racines configurées (telles que
+        passées à update) : une racine retirée de la configuration reste dans la base sans apparaître dans
+        les résultats.
+        """
+        term_lower = term.lower()
+        if len(term_lower) >= TRIGRAM_MIN_LENGTH:
+            where, param = "lines MATCH ?", '"' + term_lower.replace('"', '""') + '"'
+        else:
+            where, param = "instr(lines.text_lower, ?) > 0", term_lower
+        sql = (f"SELECT f.path, f.root, f.ext, f.corpus, lines.rowid & {LINE_MASK}, lines.text "
+               f"FROM lines JOIN files f ON f.id = lines.rowid >> {LINE_BITS} WHERE {where}")
+        params = [param]
+        if corpora:
+            sql += f" AND f.corpus IN ({','.join('?' * len(corpora))})"
+            params += list(corpora)
+        if roots is not None:
+            roots = [roots] if isinstance(roots, str) else list(roots)
+            sql += f" AND f.root IN ({','.join('?' * len(roots))})"
+            params += roots
+        hits = [Hit(*row) for row in self.conn.execute(sql + " ORDER BY f.path, lines.rowid", params)]
+        # Contrôle final avec la règle Python
+        return [hit for hit in hits if term_lower in hit.text.lower()]
+
+    def search_terms(self, terms, corpora=None, roots=None):
+        """
+        { terme : [Hit] } pour plusieurs termes.
+        """
+        return {term: self.search(term, corpora, roots) for term in terms}
@@ -0,0 +1,356 @@
+import os
+import re
+import sqlite3
+from collections import namedtuple
+
+from corpus_crawler import crawl, normaliser_extensions, classer_extension
+from automate_termes import TermAutomaton
+
+# =========================
+# Index inversé persistant des sources PML (.pmlfrm, .pmlobj, .pmlcmd, .pmlfnc, .pmlmac, sans extension)
+# =========================
+# Le PML est découpé en mots une seule fois : postings mot -> (fichier, ligne, préfixe "!!", "$!"...).
+# Mot exact, début de mot (plage de mots triés), préfixe "!!" et mots exclus sont résolus sur les postings ;
+# un fragment est cherché dans le vocabulaire. Un terme qui ne se ramène pas à un mot (expression régulière,
+# ponctuation seule...) est évalué en une passe sur les lignes indexées, sans relire les fichiers. Le script
+# applique ensuite ses propres règles aux lignes candidates : résultats identiques au parcours complet des
+# fichiers. Mise à jour incrémentale : seuls les fichiers nouveaux ou modifiés sont relus.
+# Les requêtes sont restreintes aux racines et extensions configurées : une racine retirée de la configuration
+# reste dans la base (réutilisable si elle revient) sans jamais apparaître dans les résultats.
+
+# Mot PML précédé de son éventuel préfixe ($*, $!!, $!, !!, !, .) ; "_" fait partie du mot
+TOKEN_RE = re.compile(r"(\$\*|\$!!|\$!|!!|!|\.)?(\w+)")
+WORD_RE = re.compile(r"\w+")
+
+# Version du schéma (PRAGMA user_version) : une base d'une autre version est reconstruite
+INDEX_VERSION = 2
+# Préfixes de mot précédés de "!!" sur la ligne (voir TOKEN_RE)
+EXCLAM_SIGILS = ("!!", "$!!")
+
+# Ligne candidate : fichier, racine de recherche, extension, numéro de ligne, texte (sans fin de ligne)
+IndexedLine = namedtuple("IndexedLine", ["path", "root", "ext", "line", "text"])
+
+
+def is_indexed_line(line):
+    """
+    Lignes retenues par les scripts de recherche PML : ni vides, ni commentaires "--".
+    """
+    line_clean = line.strip()
+    return bool(line_clean) and not line_clean.startswith("-")
+
+
+def tokenize_line(line):
+    """
+    Itère sur (mot en minuscules, préfixe) d'une ligne PML. Les mots sont les suites maximales de \\w ;
+    le préfixe est le plus long de TOKEN_RE qui termine les caractères non-mot précédents.
+    """
+    for m in TOKEN_RE.finditer(line):
+        word = m.group(2)
+        sigil = m.group(1) or ("_" if word.startswith("_") else "")
+        yield word.lower(), sigil
+
+
+def _longest_word(term):
+    """
+    Plus long fragment alphanumérique d'un terme : toute occurrence du terme le contient dans un seul mot.
+    """
+    words = WORD_RE.findall(term.lower())
+    return max(words, key=len) if words else ""
+
+
+def _prefix_bounds(prefix):
+    """
+    Bornes [prefix, borne) de la plage des mots triés commençant par `prefix`.
+    """
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def partial_patterns(term, start_only=False, underscore_prefix=False):
+    """
+    Expressions (motif, littéral) appliquées par le script de recherche à un terme partiel : terme suivi de \\w*,
+    en début de mot si `start_only` (sauf termes !!/_), puis variante _terme si `underscore_prefix`.
+    Le littéral est le texte en minuscules cherché, None si le motif est une expression régulière.
+    """
+    term_lower = term.lower()
+    literal = term_lower if re.escape(term_lower) == term_lower else None
+    if term.startswith(("!!", "_")):
+        patterns = [(rf"{re.escape(term_lower)}\w*", term_lower)]
+    else:
+        patterns = [(rf"\b{term_lower}\w*" if start_only else rf"{term_lower}\w*", literal)]
+    if underscore_prefix:
+        patterns.append((rf"_{term_lower}\w*", None if literal is None else "_" + literal))
+    return patterns
+
+
+class PmlIndex:
+    """
+    Index SQLite : fichiers, lignes retenues et postings. Les requêtes retournent des IndexedLine triées
+    par chemin puis numéro de ligne.
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS postings;
+                DROP TABLE IF EXISTS lines;
+                DROP TABLE IF EXISTS files;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id    INTEGER PRIMARY KEY,
+                path  TEXT NOT NULL UNIQUE,
+                root  TEXT NOT NULL,
+                ext   TEXT NOT NULL,
+                size  INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lines (
+                file_id INTEGER NOT NULL,
+                line    INTEGER NOT NULL,
+                text    TEXT NOT NULL,
+                PRIMARY KEY (file_id, line)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings (
+                token   TEXT NOT NULL,
+                file_id INTEGER NOT NULL,
+                line    INTEGER NOT NULL,
+                sigil   TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS postings_token ON postings (token);
+            CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+        """)
+        self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self._vocabulary = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    # --- Construction ---
+    def update(self, roots, extensions):
+        """
+        Met l'index à jour depuis les racines de recherche. Retourne (fichiers analysés, fichiers retirés).
+        """
+        if isinstance(roots, str):
+            roots = [roots]
+        known = {path: (file_id, size, mtime, root) for file_id, path, size, mtime, root
+                 in self.conn.execute("SELECT id, path, size, mtime, root FROM files")}
+        seen = set()
+        scanned = 0
+        for rec in crawl(roots, extensions):
+            seen.add(rec.path)
+            entry = known.get(rec.path)
+            if entry and entry[1:3] == (rec.size, rec.mtime):
+                if entry[3] != rec.root:
+                    # Fichier inchangé atteint depuis une autre racine (racines imbriquées reconfigurées)
+                    self.conn.execute("UPDATE files SET root = ? WHERE id = ?", (rec.root, entry[0]))
+                continue
+            try:
+                with open(rec.path, "r", encoding="utf-8", errors="ignore") as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+            if entry:
+                self._forget(entry[0])
+            file_id = self.conn.execute(
+                "INSERT INTO files (path, root, ext, size, mtime) VALUES (?, ?, ?, ?, ?)",
+                (rec.path, rec.root, rec.ext, rec.size, rec.mtime)).lastrowid
+            kept, postings = [], []
+            for line_number, line in enumerate(lines, start=1):
+                if not is_indexed_line(line):
+                    continue
+                kept.append((file_id, line_number, line.rstrip("\n\r")))
+                postings.extend((token, file_id, line_number, sigil) for token, sigil in tokenize_line(line))
+            self.conn.executemany("INSERT INTO lines VALUES (?, ?, ?)", kept)
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+            scanned += 1
+            if scanned % 500 == 0:
+                self.conn.commit()
+
+        # Fichiers disparus des racines indexées
+        root_set = set(roots)
+        removed = [(path, file_id) for file_id, path, root in self.conn.execute("SELECT id, path, root FROM files")
+                   if path not in seen and root in root_set]
+        for _, file_id in removed:
+            self._forget(file_id)
+        self.conn.commit()
+        self._vocabulary = None
+        return scanned, len(removed)
+
+    def _forget(self, file_id):
+        self.conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM lines WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    # --- Requêtes élémentaires : ensembles de (file_id, ligne) ---
+    def _keys(self, sql, params):
+        return set(self.conn.execute(sql, params))
+
+    def lines_with_word(self, word):
+        """
+        Lignes contenant exactement ce mot (insensible à la casse).
+        """
+        return self._keys("SELECT file_id, line FROM postings WHERE token = ?", (word.lower(),))
+
+    def tokens_with_fragments(self, fragments):
+        """
+        Mots du vocabulaire dont l'un des `fragments` est une sous-chaîne : une seule passe d'un automate
+        construit sur tous les fragments.
+        """
+        automaton = TermAutomaton(fragments)
+        return [token for token in self._tokens() if automaton.contains_any(token)]
+
+    def _tokens(self):
+        if self._vocabulary is None:
+            self._vocabulary = [row[0] for row in self.conn.execute("SELECT DISTINCT token FROM postings")]
+        return self._vocabulary
+
+    def lines_with_tokens(self, tokens):
+        keys = set()
+        tokens = list(tokens)
+        for i in range(0, len(tokens), 500):
+            batch = tokens[i:i + 500]
+            keys |= self._keys(f"SELECT file_id, line FROM postings WHERE token IN ({','.join('?' * len(batch))})",
+                               batch)
+        return keys
+
+    def lines_with_fragments(self, fragments):
+        """
+        Lignes contenant un mot dont l'un des `fragments` est une sous-chaîne.
+        """
+        return self.lines_with_tokens(self.tokens_with_fragments(fragments))
+
+    def lines_with_prefix(self, prefix, sigils=None, head="", exclude=()):
+        """
+        Lignes contenant un mot commençant par `prefix` (plage de l'index des mots), précédé de l'un des `sigils`
+        si précisés. Le mot trouvé (`head` + mot) est écarté s'il figure dans `exclude` (mots en majuscules).
+        """
+        keys = set()
+        for token, sigil, file_id, line in self.conn.execute(
+                "SELECT token, sigil, file_id, line FROM postings WHERE token >= ? AND token < ?",
+                _prefix_bounds(prefix)):
+            if (sigils is None or sigil in sigils) and (head + token).upper() not in exclude:
+                keys.add((file_id, line))
+        return keys
+
+    def lines_matching(self, predicates):
+        """
+        Lignes indexées dont le texte vérifie l'un des `predicates` (texte, texte en minuscules) : une seule
+        passe sur la table des lignes, sans relire les fichiers.
+        """
+        keys = set()
+        for file_id, line, text in self.conn.execute("SELECT file_id, line, text FROM lines"):
+            text_lower = text.lower()
+            if any(predicate(text, text_lower) for predicate in predicates):
+                keys.add((file_id, line))
+        return keys
+
+    # --- Moteur de requête ---
+    def candidates(self, exact=(), partial=(), substrings=(), roots=None, extensions=None,
+                   start_only=False, underscore_prefix=False, exclude=()):
+        """
+        Lignes pouvant contenir au moins un terme :
+          - exact      : terme en mot entier ((^|\\W)terme($|\\W)), préfixe "_" compris s'il fait partie du terme
+          - partial    : motifs de partial_patterns (début de mot si `start_only`, variante _terme si
+                         `underscore_prefix`) dont au moins un mot trouvé n'est pas dans `exclude` (en majuscules)
+          - substrings : simple sous-chaîne (termes de liste_dll.txt)
+        Exactes pour les termes partiels (hors lignes à mots non ASCII) et les mots ; sur-ensemble pour un terme exact ou une sous-chaîne contenant
+        de la ponctuation (lignes dont un mot contient son plus long fragment) : la vérification finale reste
+        celle du script. `roots` / `extensions` restreignent la requête aux fichiers de la configuration courante.
+        """
+        exclude = {word.upper() for word in exclude}
+        keys = set()
+        fragments = []
+        predicates = []
+        partial_postings = False
+        for term in exact:
+            word = term.lower()
+            if WORD_RE.fullmatch(word):
+                keys |= self.lines_with_word(word)
+            elif _longest_word(word):
+                fragments.append(_longest_word(word))
+            else:
+                regex = re.compile(rf"(?<!\w){re.escape(word)}(?!\w)")
+                predicates.append(lambda text, text_lower, regex=regex: regex.search(text_lower) is not None)
+        for term in partial:
+            for pattern, literal in partial_patterns(term, start_only, underscore_prefix):
+                bounded = pattern.startswith("\\b")
+                if literal and WORD_RE.fullmatch(literal):
+                    partial_postings = True
+                    if bounded:
+                        keys |= self.lines_with_prefix(literal, exclude=exclude)
+                    else:
+                        # Une occurrence par mot : le mot trouvé va de la première occurrence à la fin du mot
+                        keys |= self.lines_with_tokens(
+                            token for token in self.tokens_with_fragments([literal])
+                            if token[token.find(literal):].upper() not in exclude)
+                elif literal and literal.startswith("!!") and WORD_RE.fullmatch(literal[2:]):
+                    partial_postings = True
+                    keys |= self.lines_with_prefix(literal[2:], EXCLAM_SIGILS, "!!", exclude)
+                else:
+                    regex = re.compile(pattern, re.IGNORECASE)
+                    predicates.append(lambda text, text_lower, regex=regex: any(
+                        match.upper() not in exclude for match in regex.findall(text)))
+        for term in substrings:
+            word = _longest_word(term)
+            if word:
+                fragments.append(word)
+            else:
+                predicates.append(lambda text, text_lower, term=term.lower(): term in text_lower)
+        if partial_postings:
+            # re.IGNORECASE fait correspondre "ı", "İ" ou "ſ" à i ou s, ce que les mots en minuscules ne montrent
+            # pas : les lignes à mots non ASCII restent candidates, le script tranche
+            keys |= self.lines_with_tokens(token for token in self._tokens() if not token.isascii())
+        if fragments:
+            keys |= self.lines_with_fragments(fragments)
+        if predicates:
+            keys |= self.lines_matching(predicates)
+        return self.fetch(keys, roots, extensions)
+
+    def _indexed_files(self, roots=None, extensions=None):
+        """
+        { file_id : (chemin, racine, extension) } des fichiers indexés sous les racines `roots`
+        (telles que passées à update) et d'une extension retenue par `extensions` ; None = sans restriction.
+        """
+        if isinstance(roots, str):
+            roots = [roots]
+        root_set = None if roots is None else set(roots)
+        exts = normaliser_extensions(extensions)
+        return {file_id: (path, root, ext) for file_id, path, root, ext
+                in self.conn.execute("SELECT id, path, root, ext FROM files")
+                if (root_set is None or root in root_set)
+                and (exts is None or classer_extension(path, exts) is not None)}
+
+    def fetch(self, keys, roots=None, extensions=None):
+        """
+        IndexedLine des clés (file_id, ligne), triées par chemin puis numéro de ligne.
+        Les fichiers hors de `roots` / `extensions` (racine retirée de la configuration...) sont écartés.
+        """
+        files = self._indexed_files(roots, extensions)
+        by_file = {}
+        for file_id, line in keys:
+            if file_id in files:
+                by_file.setdefault(file_id, []).append(line)
+        result = []
+        for file_id in sorted(by_file, key=lambda i: files[i][0]):
+            path, root, ext = files[file_id]
+            wanted = set(by_file[file_id])
+            result.extend(IndexedLine(path, root, ext, line, text) for line, text in self.conn.execute(
+                "SELECT line, text FROM lines WHERE file_id = ? ORDER BY line", (file_id,)) if line in wanted)
+        return result
+
+    def files(self, ext=None, roots=None):
+        """
+        (chemin, racine, extension) des fichiers indexés, triés par chemin, filtrés par extension et racines si précisées.
+        """
+        return sorted(self._indexed_files(roots, None if ext is None else [ext]).values())
@@ -0,0 +1,170 @@
+import os
+import sqlite3
+from collections import namedtuple, defaultdict
+
+from corpus_crawler import crawl
+from lexer_csharp import scan_csharp, is_pmlnet_callable
+
+# =========================
+# Index persistant des symboles C# (arbres décompilés par ILSpy)
+# =========================
+# Nom complet (Namespace.Type.Membre) -> DLL, fichier, ligne, genre, visibilité, [PMLNetCallable]
+# Mise à jour incrémentale : seuls les .cs nouveaux ou modifiés (taille / date) sont réanalysés.
+# Disposition attendue : <racine de décompilation>/<DLL>/.../<Type>.cs
+
+Symbol = namedtuple("Symbol", [
+    "fqn",        # "Aveva.Core.Foo.Bar" (types imbriqués séparés par des points)
+    "name",
+    "kind",       # "class", "method", "property"... (voir lexer_csharp.Member)
+    "dll",        # premier dossier sous la racine de décompilation
+    "path",       # chemin complet du .cs
+    "line",
+    "namespace",
+    "type_name",  # type englobant ("" pour un type de premier niveau)
+    "access",
+    "pmlnet",     # True si [PMLNetCallable]
+    "signature",
+])
+
+
+def member_fqn(member):
+    return ".".join(part for part in (member.namespace, member.type_name, member.name) if part)
+
+
+class SymbolIndex:
+    """
+    Index SQLite des symboles, chargé en dictionnaires à la première requête (recherche par hachage).
+    Les clés de recherche ignorent la casse (les noms viennent souvent du PML, insensible à la casse).
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path  TEXT PRIMARY KEY,
+                size  INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS symbols (
+                fqn       TEXT NOT NULL,
+                name      TEXT NOT NULL,
+                kind      TEXT NOT NULL,
+                dll       TEXT NOT NULL,
+                path      TEXT NOT NULL,
+                line      INTEGER NOT NULL,
+                namespace TEXT NOT NULL,
+                type_name TEXT NOT NULL,
+                access    TEXT NOT NULL,
+                pmlnet    INTEGER NOT NULL,
+                signature TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path);
+        """)
+        self._maps = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    # --- Construction ---
+    def update(self, decompile_root):
+        """
+        Met l'index à jour depuis un arbre décompilé. Retourne (fichiers analysés, fichiers retirés).
+        """
+        known = {path: (size, mtime) for path, size, mtime in self.conn.execute("SELECT path, size, mtime FROM files")}
+        root_prefix = os.path.normcase(os.path.abspath(decompile_root)) + os.sep
+        seen = set()
+        scanned = 0
+        for rec in crawl(decompile_root, ["*.cs"]):
+            seen.add(rec.path)
+            if known.get(rec.path) == (rec.size, rec.mtime):
+                continue
+            try:
+                with open(rec.path, "r", encoding="utf-8", errors="ignore") as f:
+                    members = scan_csharp(f.read())
+            except OSError:
+                continue
+            relative = os.path.relpath(rec.path, decompile_root)
+            # Dossier "<DLL>~<hash>" : homonyme décompilé à part (ilspy_pool.plan_output_dirs)
+            dll = relative.split(os.sep)[0].split("~")[0] if os.sep in relative else ""
+            self.conn.execute("DELETE FROM symbols WHERE path = ?", (rec.path,))
+            self.conn.executemany(
+                "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(member_fqn(m), m.name, m.kind, dll, rec.path, m.line, m.namespace, m.type_name, m.access,
+                  int(is_pmlnet_callable(m)), m.signature) for m in members],
+            )
+            self.conn.execute("INSERT OR REPLACE INTO files (path, size, mtime) VALUES (?, ?, ?)",
+                              (rec.path, rec.size, rec.mtime))
+            scanned += 1
+            if scanned % 500 == 0:
+                self.conn.commit()
+
+        # Fichiers disparus de cette racine
+        removed = [p for p in known
+                   if p not in seen and os.path.normcase(os.path.abspath(p)).startswith(root_prefix)]
+        for path in removed:
+            self.conn.execute("DELETE FROM symbols WHERE path = ?", (path,))
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        self.conn.commit()
+        self._maps = None
+        return scanned, len(removed)
+
+    # --- Requêtes ---
+    def _load(self):
+        if self._maps is None:
+            by_fqn, by_name, by_path = defaultdict(list), defaultdict(list), defaultdict(list)
+            for row in self.conn.execute("SELECT * FROM symbols ORDER BY path, line"):
+                symbol = Symbol(*row[:9], bool(row[9]), row[10])
+                by_fqn[symbol.fqn.lower()].append(symbol)
+                by_name[symbol.name.lower()].append(symbol)
+                by_path[os.path.normcase(symbol.path)].append(symbol)
+            self._maps = (by_fqn, by_name, by_path)
+        return self._maps
+
+    def lookup(self, fqn):
+        """
+        Symboles de ce nom complet (plusieurs en cas de surcharges ou de DLL multiples).
+        """
+        return list(self._load()[0].get(fqn.lower(), []))
+
+    def find(self, name, kind=None, dll=None):
+        """
+        Symboles portant ce nom court ("Foo", "GetName"), filtrables par genre ("class", ...) ou par DLL.
+        """
+        symbols = self._load()[1].get(name.lower(), [])
+        kinds = {kind} if isinstance(kind, str) else set(kind or ())
+        return [s for s in symbols
+                if (not kinds or s.kind in kinds) and (dll is None or s.dll.lower() == dll.lower())]
+
+    def in_file(self, path):
+        """
+        Symboles déclarés dans un fichier .cs, dans l'ordre des lignes.
+        """
+        return list(self._load()[2].get(os.path.normcase(path), []))
+
+    def file_location(self, path):
+        """
+        (DLL, namespace) d'un fichier .cs d'après son premier type déclaré, ou None s'il n'est pas indexé.
+        """
+        symbols = self.in_file(path)
+        if not symbols:
+            return None
+        first = next((s for s in symbols if not s.type_name), symbols[0])
+        return first.dll, first.namespace
+
+    def pmlnet_callables(self):
+        """
+        Tous les symboles marqués [PMLNetCallable], triés par DLL, fichier et ligne.
+        """
+        rows = self.conn.execute("SELECT * FROM symbols WHERE pmlnet = 1 ORDER BY dll, path, line").fetchall()
+        return [Symbol(*row[:9], bool(row[9]), row[10]) for row in rows]
@@ -0,0 +1,161 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+# =========================
+# Inventaire persistant des fichiers (SQLite)
+# =========================
+# Table files   : un enregistrement par chemin (taille, mtime, hash du contenu)
+# Table results : résultats d'extraction par fichier et par "étape" (ex: signature d'une requête PML)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+COMMIT_EVERY = 500
+
+
+def hash_fichier(path):
+    """
+    Hash SHA-256 du contenu du fichier, lu par blocs.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def signature(*parts):
+    """
+    Signature stable d'une configuration (listes de termes, options...) servant de nom d'étape :
+    changer la requête invalide automatiquement les résultats en cache.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FileInventory:
+    """
+    Inventaire clé = chemin, avec taille / mtime / hash, et cache des résultats par étape.
+    Un fichier est considéré inchangé si taille et mtime sont identiques, ou à défaut si son hash l'est.
+    Utilisable depuis plusieurs threads (accès SQLite sérialisés par un verrou).
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path  TEXT PRIMARY KEY,
+                size  INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                hash  TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                path    TEXT NOT NULL,
+                stage   TEXT NOT NULL,
+                hash    TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (path, stage)
+            );
+        """)
+        self._pending = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.conn.commit()
+            self._pending = 0
+
+    def current_hash(self, record):
+        """
+        Hash du fichier décrit par `record` (FileRecord du crawler) : réutilise le hash stocké
+        si taille et mtime n'ont pas bougé, sinon relit le contenu et met l'inventaire à jour.
+        Retourne None si le fichier est illisible.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime, hash FROM files WHERE path = ?", (record.path,)
+            ).fetchone()
+        if row and row[0] == record.size and row[1] == record.mtime:
+            return row[2]
+        # Lecture du contenu hors verrou : les autres threads continuent pendant le hash
+        try:
+            digest = hash_fichier(record.path)
+        except OSError:
+            return None
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, hash) VALUES (?, ?, ?, ?)",
+                (record.path, record.size, record.mtime, digest),
+            )
+            self._maybe_commit()
+        return digest
+
+    def lookup(self, record, stage):
+        """
+        Retourne le résultat en cache (objet JSON) pour ce fichier et cette étape, ou None
+        si le fichier est nouveau / modifié ou si l'étape n'a jamais été calculée.
+        """
+        digest = self.current_hash(record)
+        if digest is None:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT hash, payload FROM results WHERE path = ? AND stage = ?", (record.path, stage)
+            ).fetchone()
+            if row and row[0] == digest:
+                self.hits += 1
+            else:
+                self.misses += 1
+                return None
+        return json.loads(row[1])
+
+    def store(self, record, stage, payload):
+        """
+        Enregistre le résultat d'extraction (sérialisable en JSON) de ce fichier pour cette étape.
+        """
+        digest = self.current_hash(record)
+        if digest is None:
+            return
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (path, stage, hash, payload) VALUES (?, ?, ?, ?)",
+                (record.path, stage, digest, data),
+            )
+            self._maybe_commit()
+
+    def prune(self, seen_paths):
+        """
+        Supprime de l'inventaire les fichiers qui n'existent plus (absents du dernier parcours).
+        """
+        seen = set(seen_paths)
+        with self.lock:
+            stale = [p for (p,) in self.conn.execute("SELECT path FROM files") if p not in seen]
+            for i in range(0, len(stale), 500):
+                chunk = stale[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                self.conn.execute(f"DELETE FROM files WHERE path IN ({marks})", chunk)
+                self.conn.execute(f"DELETE FROM results WHERE path IN ({marks})", chunk)
+            self.conn.commit()
+        return len(stale)
@@ -0,0 +1,87 @@
+import os
+import json
+
+# =========================
+# Journal de reprise (JSONL en ajout seul) pour les traitements longs
+# =========================
+# Une ligne par tâche terminée : {"run": signature, "key": clé, "data": résultat}
+# Après un arrêt (plantage, redémarrage, fichier Excel verrouillé...), une nouvelle exécution
+# relit le journal et ne refait que les tâches absentes.
+
+
+class JobJournal:
+    """
+    Journal des tâches terminées d'un lot. `run_signature` identifie la configuration du lot :
+    les entrées écrites avec une autre configuration sont ignorées (et retirées du fichier).
+    """
+
+    def __init__(self, path, run_signature, resume=True):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.run_signature = run_signature
+        self.entries = {}
+        stale = False
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        stale = True  # dernière ligne tronquée par un arrêt brutal
+                        continue
+                    if entry.get("run") == run_signature:
+                        self.entries[entry["key"]] = entry["data"]
+                    else:
+                        stale = True
+        if not resume or stale:
+            self._rewrite()
+        self.restored = len(self.entries)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _rewrite(self):
+        """
+        Réécrit le journal avec les seules entrées valides (remplacement atomique).
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key, data in self.entries.items():
+                f.write(json.dumps({"run": self.run_signature, "key": key, "data": data}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        return self.entries.get(key, default)
+
+    def record(self, key, data):
+        """
+        Ajoute une tâche terminée ; la ligne est écrite sur disque immédiatement (flush + fsync).
+        """
+        self.entries[key] = data
+        self.file.write(json.dumps({"run": self.run_signature, "key": key, "data": data}, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        """
+        Lot terminé : le journal est fermé puis supprimé, la prochaine exécution repart de zéro.
+        """
+        self.close()
+        self.entries = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,419 @@
+import re
+from collections import namedtuple
+
+# =========================
+# Analyse lexicale C# en une seule passe (fichiers .cs décompilés)
+# =========================
+# Commentaires, chaînes, caractères et directives #... sont ignorés ; la profondeur des accolades
+# est suivie pour rattacher chaque membre à son namespace et à son type réels. Coût linéaire par fichier.
+
+Member = namedtuple("Member", [
+    "kind",        # "class", "struct", "interface", "enum", "record", "delegate",
+                   # "method", "constructor", "property", "field", "event"
+    "name",
+    "access",      # "public", "private", "protected internal"... ("" si non précisé)
+    "modifiers",   # autres modificateurs : ("static", "override", ...)
+    "type",        # type de retour / du champ / de la propriété ("" pour types et constructeurs)
+    "params",      # texte des paramètres, sans les parenthèses
+    "attributes",  # attributs tels qu'écrits, sans crochets : ("PMLNetCallable", "DllImport(\"x.dll\")")
+    "namespace",   # namespace englobant ("" si aucun)
+    "type_name",   # type englobant, types imbriqués séparés par des points ("" pour un type de premier niveau)
+    "line",        # ligne (1-based) du début de la déclaration, attributs compris
+    "signature",   # déclaration sans attributs, telle qu'écrite (jusqu'au corps / à l'initialisation)
+    "attribute_lines",  # ligne de chaque attribut de `attributes`
+])
+
+# Usage d'un attribut sur une déclaration : ("[PMLNetCallable]", "public void Foo(int a)", 42, "Aveva.X", "Bar", Member)
+AttributeUse = namedtuple("AttributeUse", ["attribute", "signature", "line", "namespace", "type_name", "member"])
+
+TOKEN_RE = re.compile(r'''
+    (?P<nl>\n)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<directive>\#[^\n]*)
+  | (?P<string>"""[\s\S]*?"""|\$?"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<ident>@?[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punct>==|!=|<=|>=|=>|.)
+''', re.VERBOSE | re.DOTALL)
+
+# Chaîne verbatim (@"..." / $@"..." / @$"...") : seuls les "" sont échappés
+VERBATIM_RE = re.compile(r'(?:@\$?|\$@)"(?:[^"]|"")*"')
+
+TYPE_KEYWORDS = {"class", "struct", "interface", "enum", "record"}
+ACCESS_KEYWORDS = {"public", "private", "protected", "internal"}
+MODIFIER_KEYWORDS = ACCESS_KEYWORDS | {
+    "static", "virtual", "override", "abstract", "sealed", "async", "extern", "unsafe", "new",
+    "readonly", "partial", "volatile", "const", "fixed", "required", "ref",
+}
+ACCESS_ORDER = ("private protected", "protected internal", "public", "private", "protected", "internal")
+GLOBAL_ATTRIBUTE_TARGETS = ("assembly:", "module:")
+NO_SPACE_BEFORE = {",", ".", ")", "]", ">", "?", "*", ";"}
+NO_SPACE_AFTER = {"(", "[", "<", ".", "!", "~"}
+
+
+def tokenize(text):
+    """
+    Itère sur les tokens significatifs : (genre, texte, ligne). genre = "ident", "number", "string", "punct".
+    Les opérateurs ==, !=, <=, >= et => forment un seul token : "operator ==" n'est pas coupé comme une initialisation.
+    """
+    line = 1
+    pos = 0
+    length = len(text)
+    while pos < length:
+        if text.startswith(('@"', '$@"', '@$"'), pos):
+            m = VERBATIM_RE.match(text, pos)
+            if m:
+                yield "string", m.group(), line
+                line += m.group().count("\n")
+                pos = m.end()
+                continue
+        m = TOKEN_RE.match(text, pos)
+        kind = m.lastgroup
+        value = m.group()
+        pos = m.end()
+        if kind == "nl":
+            line += 1
+        elif kind in ("ws", "directive"):
+            pass
+        elif kind == "comment":
+            line += value.count("\n")
+        else:
+            yield kind, value, line
+            if kind == "string":
+                line += value.count("\n")
+
+
+def _join(tokens):
+    """
+    Recompose un texte lisible à partir des tokens : "Dictionary<string, int>", "int a, ref string b".
+    """
+    out = []
+    prev = None
+    for _, value, _ in tokens:
+        if prev is not None:
+            if prev == ",":
+                if value not in (",", "]"):
+                    out.append(" ")
+            elif value in NO_SPACE_BEFORE or prev in NO_SPACE_AFTER:
+                pass
+            elif value in ("(", "[", "<") and ((prev[0].isalnum() or prev[0] in "_@")
+                                               and prev not in MODIFIER_KEYWORDS and prev != "operator"
+                                               or prev in (">", "]")):
+                pass
+            else:
+                out.append(" ")
+        out.append(value)
+        prev = value
+    return "".join(out)
+
+
+def _split_attributes(header):
+    """
+    Sépare les groupes d'attributs en tête de déclaration :
+    retourne ([texte d'attribut], [ligne de chaque attribut], tokens restants).
+    """
+    attributes = []
+    lines = []
+    i = 0
+    while i < len(header) and header[i][1] == "[":
+        depth = 0
+        start = i
+        for j in range(i, len(header)):
+            v = header[j][1]
+            if v in "[(":
+                depth += 1
+            elif v in "])":
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            return attributes, lines, header[start:]
+        # Plusieurs attributs dans un même groupe : [A, B(x, y)]
+        inner = header[start + 1:j]
+        part, depth = [], 0
+        for tok in inner + [("punct", ",", 0)]:
+            v = tok[1]
+            if v in "([":
+                depth += 1
+            elif v in ")]":
+                depth -= 1
+            if v == "," and depth == 0:
+                text = _join(part)
+                if text and not text.startswith(GLOBAL_ATTRIBUTE_TARGETS):
+                    attributes.append(text)
+                    lines.append(part[0][2])
+                part = []
+            else:
+                part.append(tok)
+        i = j + 1
+    return attributes, lines, header[i:]
+
+
+def attribute_name(attribute):
+    """
+    "Aveva.PMLNet.PMLNetCallableAttribute(x)" -> "PMLNetCallable"
+    """
+    name = attribute.split("(", 1)[0].strip()
+    if ":" in name:
+        name = name.split(":", 1)[1].strip()  # [return: X]
+    name = name.rsplit(".", 1)[-1]
+    return name[:-len("Attribute")] if name.endswith("Attribute") and name != "Attribute" else name
+
+
+def is_pmlnet_callable(member):
+    return any(attribute_name(a) == "PMLNetCallable" for a in member.attributes)
+
+
+def find_attributes(members, name="PMLNetCallable"):
+    """
+    Usages d'un attribut parmi les membres d'un fichier (scan_csharp), dans l'ordre du source.
+    Attributs empilés ou groupés, arguments et paramètres sur plusieurs lignes sont déjà résolus par le lexer :
+    la ligne est celle de l'attribut lui-même, le type englobant celui de la déclaration annotée.
+    """
+    uses = []
+    for member in members:
+        for attribute, line in zip(member.attributes, member.attribute_lines):
+            if attribute_name(attribute) == name:
+                uses.append(AttributeUse(f"[{attribute}]", member.signature, line, member.namespace,
+                                         member.type_name, member))
+    return uses
+
+
+def _modifiers(tokens):
+    """
+    Sépare les modificateurs en tête : retourne (accès, (autres modificateurs), tokens restants).
+    """
+    i = 0
+    mods = []
+    while i < len(tokens) and tokens[i][1] in MODIFIER_KEYWORDS:
+        # "ref" n'est un modificateur que devant "struct" / "readonly" ; ailleurs il fait partie du type de retour
+        if tokens[i][1] == "ref" and (i + 1 >= len(tokens) or tokens[i + 1][1] not in ("struct", "readonly", "partial")):
+            break
+        mods.append(tokens[i][1])
+        i += 1
+    access_words = [m for m in mods if m in ACCESS_KEYWORDS]
+    access = " ".join(access_words)
+    for canonical in ACCESS_ORDER:
+        if sorted(canonical.split()) == sorted(access_words):
+            access = canonical
+            break
+    return access, tuple(m for m in mods if m not in ACCESS_KEYWORDS), tokens[i:]
+
+
+def _qualified_name_end(tokens):
+    """
+    Dans "type Nom<T>" / "type IFoo.Bar", retourne (index de début du nom, nom) en partant de la fin.
+    """
+    end = len(tokens)
+    if end and tokens[end - 1][1] == ">":
+        depth = 0
+        for k in range(end - 1, -1, -1):
+            v = tokens[k][1]
+            if v == ">":
+                depth += 1
+            elif v == "<":
+                depth -= 1
+                if depth == 0:
+                    end = k
+                    break
+    start = end - 1
+    while start >= 2 and tokens[start - 1][1] == "." and tokens[start - 2][0] == "ident":
+        start -= 2
+    if start < 0 or tokens[start][0] != "ident":
+        return end, ""
+    return start, "".join(t[1] for t in tokens[start:end])
+
+
+def _find_params(tokens):
+    """
+    Index de la parenthèse ouvrante de la liste de paramètres (précédée d'un nom ou d'un ">"), ou -1.
+    Une parenthèse de tuple en type de retour, "(int, string) Foo(...)", est sautée.
+    """
+    depth = 0
+    after_operator = False
+    for k, (kind, value, _) in enumerate(tokens):
+        if value == "(" and depth == 0 and k > 0:
+            prev_kind, prev_value, _ = tokens[k - 1]
+            if (prev_kind == "ident" and prev_value not in MODIFIER_KEYWORDS) or prev_value == ">" or after_operator:
+                return k
+        if value == "operator" and depth == 0:
+            after_operator = True
+        if value in ("(", "["):
+            depth += 1
+        elif value in (")", "]"):
+            depth -= 1
+    return -1
+
+
+def _matching(tokens, open_index, open_char="(", close_char=")"):
+    depth = 0
+    for k in range(open_index, len(tokens)):
+        v = tokens[k][1]
+        if v == open_char:
+            depth += 1
+        elif v == close_char:
+            depth -= 1
+            if depth == 0:
+                return k
+    return len(tokens)
+
+
+def _cut_initializer(tokens):
+    """
+    Coupe la déclaration au premier "=" (ou "=>") de premier niveau : retourne (tokens, coupé ?).
+    """
+    depth = 0
+    for k, (_, value, _) in enumerate(tokens):
+        if value in ("(", "["):
+            depth += 1
+        elif value in (")", "]"):
+            depth -= 1
+        elif value in ("=", "=>") and depth == 0:
+            return tokens[:k], True
+    return tokens, False
+
+
+class _Scope:
+    __slots__ = ("kind", "name")
+
+    def __init__(self, kind, name=""):
+        self.kind = kind  # "namespace", "type", "enum", "other"
+        self.name = name
+
+
+def scan_csharp(text):
+    """
+    Analyse un fichier C# et retourne la liste des Member (types et membres) dans l'ordre du source.
+    """
+    members = []
+    scopes = []
+    file_namespace = ""
+    header = []
+
+    def current_namespace():
+        parts = [file_namespace] if file_namespace else []
+        parts += [s.name for s in scopes if s.kind == "namespace"]
+        return ".".join(parts)
+
+    def current_type():
+        return ".".join(s.name for s in scopes if s.kind in ("type", "enum"))
+
+    def in_declaration_scope():
+        return not scopes or scopes[-1].kind in ("namespace", "type")
+
+    def declare(tokens, terminator):
+        """
+        Interprète une déclaration complète (terminée par "{" ou ";"). Retourne la portée à ouvrir.
+        """
+        nonlocal file_namespace
+        if not tokens:
+            return _Scope("other")
+        attributes, attribute_lines, rest = _split_attributes(tokens)
+        line = tokens[0][2]
+        if not rest:
+            return _Scope("other")
+
+        def add(kind, name, type_text, params, sig):
+            members.append(Member(kind, name, access, mods, type_text, params, tuple(attributes), current_namespace(),
+                                  current_type(), line, sig, tuple(attribute_lines)))
+        values = [t[1] for t in rest]
+
+        if values[0] == "namespace":
+            name = "".join(values[1:])
+            if terminator == ";":
+                file_namespace = name  # namespace de portée fichier (C# 10)
+                return None
+            return _Scope("namespace", name)
+
+        access, mods, body = _modifiers(rest)
+        decl, has_initializer = _cut_initializer(body)
+        decl_values = [t[1] for t in decl]
+        sig_end = len(rest) - len(body) + len(decl)  # fin de la déclaration dans `rest`
+        paren = _find_params(decl)
+
+        # Déclaration de type : "class Foo", "record struct Foo(int X)"...
+        if decl and decl_values[0] in TYPE_KEYWORDS:
+            kind = decl_values[0]
+            name_index = 2 if kind == "record" and decl_values[1:2] in (["class"], ["struct"]) else 1
+            name = decl_values[name_index] if name_index < len(decl) else ""
+            add(kind, name, "", "", _join(rest))
+            if terminator == ";":
+                return None
+            return _Scope("enum" if kind == "enum" else "type", name)
+
+        if decl_values[:1] == ["delegate"] and paren > 0:
+            sig = decl[1:paren]
+            start, name = _qualified_name_end(sig)
+            params = _join(decl[paren + 1:_matching(decl, paren)])
+            add("delegate", name, _join(sig[:start]), params, _join(rest[:sig_end]))
+            return _Scope("other") if terminator == "{" else None
+
+        if not (scopes and scopes[-1].kind == "type"):
+            return _Scope("other")
+
+        if "event" in decl_values:
+            sig = decl[decl_values.index("event") + 1:]
+            start, name = _qualified_name_end(sig)
+            if name:
+                add("event", name, _join(sig[:start]), "", _join(rest[:sig_end]))
+            return _Scope("other") if terminator == "{" else None
+
+        if paren >= 0:
+            close = _matching(decl, paren)
+            start, name = _qualified_name_end(decl[:paren])
+            type_tokens = decl[:start]
+            if "operator" in decl_values[:paren]:
+                o = decl_values.index("operator")
+                name = "operator " + _join(decl[o + 1:paren])
+                type_tokens = decl[:o]
+                if type_tokens and type_tokens[-1][1] in ("implicit", "explicit"):
+                    name = f"{type_tokens[-1][1]} {name}"
+                    type_tokens = decl[o + 1:paren]
+                kind = "method"
+            elif start > 0 and decl[start - 1][1] == "~":
+                name = "~" + name
+                type_tokens = []
+                kind = "constructor"
+            else:
+                kind = "method" if type_tokens else "constructor"
+            add(kind, name, _join(type_tokens), _join(decl[paren + 1:close]),
+                _join(rest[:len(rest) - len(body) + close + 1]))
+            return _Scope("other") if terminator == "{" else None
+
+        # Indexeur : "int this[int i] { get; }"
+        if "this" in decl_values and decl_values[-1] == "]":
+            t = decl_values.index("this")
+            add("property", "this", _join(decl[:t]), _join(decl[t + 2:-1]), _join(rest[:sig_end]))
+            return _Scope("other") if terminator == "{" else None
+
+        # Champs multiples "int a, b;" : seul le premier nom est retenu
+        if "," in decl_values and "<" not in decl_values:
+            decl = decl[:decl_values.index(",")]
+        start, name = _qualified_name_end(decl)
+        if name and start > 0:
+            # Bloc { get; set; } ou "=>" : propriété ; sinon champ
+            arrow = has_initializer and body[len(decl)][1] == "=>"
+            kind = "property" if (terminator == "{" and not has_initializer) or arrow else "field"
+            add(kind, name, _join(decl[:start]), "", _join(rest[:sig_end]))
+        return _Scope("other") if terminator == "{" else None
+
+    for tok in tokenize(text):
+        value = tok[1]
+        if value == "{":
+            if in_declaration_scope():
+                scopes.append(declare(header, "{") or _Scope("other"))
+                header = []
+            else:
+                scopes.append(_Scope("other"))
+        elif value == "}":
+            if scopes:
+                scopes.pop()
+            header = []
+        elif in_declaration_scope():
+            if value == ";":
+                declare(header, ";")
+                header = []
+            else:
+                header.append(tok)
+    return members
@@ -1,9 +1,11 @@
 import os
 import pandas as pd
-import fnmatch
 import tqdm
 import re
 
+from corpus_crawler import list_files
+from prefiltre_octets import BytesPrefilter
+
 # 📂 Définition des chemins
 search_directory = r"C:\Program Files (x86)\AVEVA\Everything3D2.10"
 output_file = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\recherche_lignes_completes_mots_cles_container_pmlcontrol_3.xlsx"
@@ -11,21 +13,23 @@ output_file = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE
 # 🔍 Terme à rechercher (dans tout mot, insensible à la casse)
 search_terms = ["container", "pmlcontrol"]
 
+# ⚡ Préfiltre sur les octets : les fichiers sans aucun terme ne sont ni décodés ni découpés en lignes
+use_bytes_prefilter = True
+prefilter = BytesPrefilter(search_terms) if use_bytes_prefilter else None
+
 # 📋 Stockage des résultats
 results = []
 
 # 📂 Extensions de fichiers à scanner
 file_extensions = ["*.pmlfrm", "*.pmlobj", "*.pmlcmd", "*.pmlfnc", "*.mac", "*.pmlmac"]
 
-# 📂 Recherche récursive des fichiers
-pml_files = []
-for root, _, files in os.walk(search_directory):
-    for file in files:
-        if any(fnmatch.fnmatch(file.lower(), ext.lower()) for ext in file_extensions):
-            pml_files.append(os.path.join(root, file))
+# 📂 Recherche récursive des fichiers (crawler parallèle commun, triés par chemin : ordre d'export reproductible)
+pml_files = [rec.path for rec in list_files(search_directory, file_extensions)]
 
 # 📊 Analyse des fichiers avec barre de progression
 for file_path in tqdm.tqdm(pml_files, desc="🔎 Analyse des fichiers PML", unit="fichier"):
+    if prefilter is not None and not prefilter.may_contain(file_path):
+        continue
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
             lines = f.readlines()
@@ -48,6 +52,9 @@ for file_path in tqdm.tqdm(pml_files, desc="🔎 Analyse des fichiers PML", unit
     except Exception as e:
         print(f"⚠️ Erreur lors de l'analyse de {file_path} : {e}")
 
+if prefilter is not None:
+    print(f"⚡ Préfiltre : {prefilter.skipped} fichiers écartés sans décodage, {prefilter.kept} analysés.")
+
 # 📤 Exportation Excel
 if results:
     df = pd.DataFrame(results)
@@ -1,9 +1,11 @@
 import os
 import re
-import fnmatch
 import pandas as pd
 from tqdm import tqdm
 
+from corpus_crawler import list_files
+from index_symboles import SymbolIndex
+
 # === Paramètres ===
 search_directories = [
     r"C:\\Program Files (x86)\\AVEVA\\Everything3D2.10",
@@ -22,6 +24,12 @@ output_file = r"D:\\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\\FORMATION E3D ADMIN\\ETU
 
 excel_input = r"D:\\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\\FORMATION E3D ADMIN\\ETUDE AVEVA UIC ETC\\code_unique_dll_static_ILSpy.xlsx"
 
+# Source des entrées DLL/namespace/classe : index des symboles C# ; repli sur le classeur Excel (excel_input)
+# si l'arbre décompilé est absent ou ne contient aucun [PMLNetCallable]
+use_symbol_index = True
+decompile_root = r"D:\\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\\FORMATION E3D ADMIN\\DLL decompilation\\transposition_dll_all"
+symbol_index_db = os.path.join(decompile_root, "index_symboles.sqlite")
+
 
 def load_dll_scan(excel_path):
     df = pd.read_excel(excel_path)
@@ -30,6 +38,17 @@ def load_dll_scan(excel_path):
     return df
 
 
+def load_dll_scan_from_index(db_path, root):
+    """
+    Même format que load_dll_scan ("DLL/Namespace/Fichier.cs/signature"), lu depuis l'index des symboles.
+    """
+    with SymbolIndex(db_path) as symbol_index:
+        symbol_index.update(root)
+        paths = [f"{s.dll}/{s.namespace}/{os.path.basename(s.path)}/{s.signature}"
+                 for s in symbol_index.pmlnet_callables()]
+    return pd.DataFrame({"dll_path": paths})
+
+
 def scan_file_for_terms(file_path):
     results = []
     try:
@@ -45,17 +64,7 @@ def scan_file_for_terms(file_path):
 
 
 def get_files(directory):
-    all_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            file_path = os.path.join(root, file)
-            ext = os.path.splitext(file)[1]
-            if ext:
-                if any(fnmatch.fnmatch(file.lower(), pattern.lower()) for pattern in file_extensions if pattern):
-                    all_files.append(file_path)
-            elif "" in file_extensions:
-                all_files.append(file_path)
-    return all_files
+    return [rec.path for rec in list_files(directory, file_extensions)]
 
 
 def determine_extension(file):
@@ -139,7 +148,13 @@ def detect_imports(df_pml_scan):
 
 
 # === MAIN ===
-df_dll_scan = load_dll_scan(excel_input)
+df_dll_scan = None
+if use_symbol_index and os.path.isdir(decompile_root):
+    df_dll_scan = load_dll_scan_from_index(symbol_index_db, decompile_root)
+    print(f"🗂️ Index des symboles : {len(df_dll_scan)} entrée(s) [PMLNetCallable]")
+if df_dll_scan is None or df_dll_scan.empty:
+    print(f"📄 Entrées lues dans le classeur : {excel_input}")
+    df_dll_scan = load_dll_scan(excel_input)
 df_collect = pd.DataFrame(columns=[
     "Fichier", "Nom", "Dossier", "Extension",
     "DLL", "Namespace", "Class", "Visibility", "Variable"
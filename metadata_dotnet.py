@@ -0,0 +1,693 @@
+import struct
+from collections import defaultdict
+
+from pe_lecteur import open_image, parse_pe_headers, rva_to_offset, NotPEError
+
+# =========================
+# Lecture directe des métadonnées .NET (ECMA-335, partition II §24) sans décompilation
+# =========================
+# Permet de retrouver namespaces, types, signatures de méthodes et attributs [PMLNetCallable]
+# directement depuis la DLL (mmap), au lieu de passer par ilspycmd.
+
+
+class MetadataError(ValueError):
+    """Métadonnées .NET illisibles."""
+
+
+class NotDotNetError(MetadataError):
+    """Image PE sans répertoire CLR (DLL native) : rien à indexer."""
+
+
+# --- Identifiants des tables ---
+MODULE, TYPEREF, TYPEDEF, FIELDPTR, FIELD, METHODPTR, METHODDEF, PARAMPTR, PARAM = range(0x00, 0x09)
+INTERFACEIMPL, MEMBERREF, CONSTANT, CUSTOMATTRIBUTE, FIELDMARSHAL, DECLSECURITY = range(0x09, 0x0F)
+CLASSLAYOUT, FIELDLAYOUT, STANDALONESIG, EVENTMAP, EVENTPTR, EVENT = range(0x0F, 0x15)
+PROPERTYMAP, PROPERTYPTR, PROPERTY, METHODSEMANTICS, METHODIMPL, MODULEREF = range(0x15, 0x1B)
+TYPESPEC, IMPLMAP, FIELDRVA, ENCLOG, ENCMAP, ASSEMBLY = range(0x1B, 0x21)
+ASSEMBLYPROCESSOR, ASSEMBLYOS, ASSEMBLYREF, ASSEMBLYREFPROCESSOR, ASSEMBLYREFOS = range(0x21, 0x26)
+FILE, EXPORTEDTYPE, MANIFESTRESOURCE, NESTEDCLASS, GENERICPARAM, METHODSPEC = range(0x26, 0x2C)
+GENERICPARAMCONSTRAINT = 0x2C
+
+# --- Index codés : (bits de tag, tables possibles) ---
+CODED_INDEXES = {
+    "TypeDefOrRef": (2, [TYPEDEF, TYPEREF, TYPESPEC]),
+    "HasConstant": (2, [FIELD, PARAM, PROPERTY]),
+    "HasCustomAttribute": (5, [METHODDEF, FIELD, TYPEREF, TYPEDEF, PARAM, INTERFACEIMPL, MEMBERREF, MODULE,
+                               DECLSECURITY, PROPERTY, EVENT, STANDALONESIG, MODULEREF, TYPESPEC, ASSEMBLY,
+                               ASSEMBLYREF, FILE, EXPORTEDTYPE, MANIFESTRESOURCE, GENERICPARAM,
+                               GENERICPARAMCONSTRAINT, METHODSPEC]),
+    "HasFieldMarshal": (1, [FIELD, PARAM]),
+    "HasDeclSecurity": (2, [TYPEDEF, METHODDEF, ASSEMBLY]),
+    "MemberRefParent": (3, [TYPEDEF, TYPEREF, MODULEREF, METHODDEF, TYPESPEC]),
+    "HasSemantics": (1, [EVENT, PROPERTY]),
+    "MethodDefOrRef": (1, [METHODDEF, MEMBERREF]),
+    "MemberForwarded": (1, [FIELD, METHODDEF]),
+    "Implementation": (2, [FILE, ASSEMBLYREF, EXPORTEDTYPE]),
+    "CustomAttributeType": (3, [None, None, METHODDEF, MEMBERREF, None]),
+    "ResolutionScope": (2, [MODULE, MODULEREF, ASSEMBLYREF, TYPEREF]),
+    "TypeOrMethodDef": (1, [TYPEDEF, METHODDEF]),
+}
+
+# --- Schéma des tables : colonnes "u2"/"u4"/"str"/"guid"/"blob", ("idx", table) ou ("coded", nom) ---
+TABLE_SCHEMAS = {
+    MODULE: ["u2", "str", "guid", "guid", "guid"],
+    TYPEREF: [("coded", "ResolutionScope"), "str", "str"],
+    TYPEDEF: ["u4", "str", "str", ("coded", "TypeDefOrRef"), ("idx", FIELD), ("idx", METHODDEF)],
+    FIELDPTR: [("idx", FIELD)],
+    FIELD: ["u2", "str", "blob"],
+    METHODPTR: [("idx", METHODDEF)],
+    METHODDEF: ["u4", "u2", "u2", "str", "blob", ("idx", PARAM)],
+    PARAMPTR: [("idx", PARAM)],
+    PARAM: ["u2", "u2", "str"],
+    INTERFACEIMPL: [("idx", TYPEDEF), ("coded", "TypeDefOrRef")],
+    MEMBERREF: [("coded", "MemberRefParent"), "str", "blob"],
+    CONSTANT: ["u2", ("coded", "HasConstant"), "blob"],
+    CUSTOMATTRIBUTE: [("coded", "HasCustomAttribute"), ("coded", "CustomAttributeType"), "blob"],
+    FIELDMARSHAL: [("coded", "HasFieldMarshal"), "blob"],
+    DECLSECURITY: ["u2", ("coded", "HasDeclSecurity"), "blob"],
+    CLASSLAYOUT: ["u2", "u4", ("idx", TYPEDEF)],
+    FIELDLAYOUT: ["u4", ("idx", FIELD)],
+    STANDALONESIG: ["blob"],
+    EVENTMAP: [("idx", TYPEDEF), ("idx", EVENT)],
+    EVENTPTR: [("idx", EVENT)],
+    EVENT: ["u2", "str", ("coded", "TypeDefOrRef")],
+    PROPERTYMAP: [("idx", TYPEDEF), ("idx", PROPERTY)],
+    PROPERTYPTR: [("idx", PROPERTY)],
+    PROPERTY: ["u2", "str", "blob"],
+    METHODSEMANTICS: ["u2", ("idx", METHODDEF), ("coded", "HasSemantics")],
+    METHODIMPL: [("idx", TYPEDEF), ("coded", "MethodDefOrRef"), ("coded", "MethodDefOrRef")],
+    MODULEREF: ["str"],
+    TYPESPEC: ["blob"],
+    IMPLMAP: ["u2", ("coded", "MemberForwarded"), "str", ("idx", MODULEREF)],
+    FIELDRVA: ["u4", ("idx", FIELD)],
+    ENCLOG: ["u4", "u4"],
+    ENCMAP: ["u4"],
+    ASSEMBLY: ["u4", "u2", "u2", "u2", "u2", "u4", "blob", "str", "str"],
+    ASSEMBLYPROCESSOR: ["u4"],
+    ASSEMBLYOS: ["u4", "u4", "u4"],
+    ASSEMBLYREF: ["u2", "u2", "u2", "u2", "u4", "blob", "str", "str", "blob"],
+    ASSEMBLYREFPROCESSOR: ["u4", ("idx", ASSEMBLYREF)],
+    ASSEMBLYREFOS: ["u4", "u4", "u4", ("idx", ASSEMBLYREF)],
+    FILE: ["u4", "str", "blob"],
+    EXPORTEDTYPE: ["u4", "u4", "str", "str", ("coded", "Implementation")],
+    MANIFESTRESOURCE: ["u4", "u4", "str", ("coded", "Implementation")],
+    NESTEDCLASS: [("idx", TYPEDEF), ("idx", TYPEDEF)],
+    GENERICPARAM: ["u2", "u2", ("coded", "TypeOrMethodDef"), "str"],
+    METHODSPEC: [("coded", "MethodDefOrRef"), "blob"],
+    GENERICPARAMCONSTRAINT: [("idx", GENERICPARAM), ("coded", "TypeDefOrRef")],
+}
+
+# --- Types primitifs (ELEMENT_TYPE_*) et alias C# ---
+ELEMENT_TYPES = {
+    0x01: "void", 0x02: "bool", 0x03: "char", 0x04: "sbyte", 0x05: "byte", 0x06: "short", 0x07: "ushort",
+    0x08: "int", 0x09: "uint", 0x0A: "long", 0x0B: "ulong", 0x0C: "float", 0x0D: "double", 0x0E: "string",
+    0x16: "TypedReference", 0x18: "IntPtr", 0x19: "UIntPtr", 0x1C: "object",
+}
+CSHARP_ALIASES = {
+    "System.Void": "void", "System.Boolean": "bool", "System.Char": "char", "System.SByte": "sbyte",
+    "System.Byte": "byte", "System.Int16": "short", "System.UInt16": "ushort", "System.Int32": "int",
+    "System.UInt32": "uint", "System.Int64": "long", "System.UInt64": "ulong", "System.Single": "float",
+    "System.Double": "double", "System.String": "string", "System.Object": "object", "System.Decimal": "decimal",
+}
+
+# --- Flags utiles ---
+TYPE_VISIBILITY = {0: "internal", 1: "public", 2: "public", 3: "private", 4: "protected", 5: "internal",
+                   6: "private protected", 7: "protected internal"}
+MEMBER_ACCESS = {1: "private", 2: "private protected", 3: "internal", 4: "protected", 5: "protected internal",
+                 6: "public"}
+TD_INTERFACE, TD_ABSTRACT, TD_SEALED = 0x20, 0x80, 0x100
+MD_STATIC, MD_FINAL, MD_VIRTUAL, MD_NEWSLOT, MD_ABSTRACT, MD_PINVOKE = 0x10, 0x20, 0x40, 0x100, 0x400, 0x2000
+PARAM_OUT = 0x2
+SEM_SETTER, SEM_GETTER, SEM_ADDON = 0x1, 0x2, 0x8
+
+PMLNET_ATTRIBUTE_NAMES = {"PMLNetCallable", "PMLNetCallableAttribute"}
+PMLNET_ANNOTATION = "[PMLNetCallable]"
+
+
+def _decompress_uint(data, pos):
+    """
+    Entier non signé compressé (blobs et signatures) : retourne (valeur, nouvelle position).
+    """
+    b0 = data[pos]
+    if b0 & 0x80 == 0:
+        return b0, pos + 1
+    if b0 & 0xC0 == 0x80:
+        return ((b0 & 0x3F) << 8) | data[pos + 1], pos + 2
+    return ((b0 & 0x1F) << 24) | (data[pos + 1] << 16) | (data[pos + 2] << 8) | data[pos + 3], pos + 4
+
+
+def _decompress_int(data, pos):
+    """
+    Entier signé compressé (bornes inférieures des tableaux) : retourne (valeur, nouvelle position).
+    """
+    raw, new_pos = _decompress_uint(data, pos)
+    bits = {1: 7, 2: 14, 4: 29}[new_pos - pos]
+    value = raw >> 1
+    if raw & 1:
+        value -= 1 << (bits - 1)
+    return value, new_pos
+
+
+def _stream_headers(data, root):
+    """
+    En-têtes de flux de la racine des métadonnées (offset `root`) : { nom : (offset absolu, taille) }.
+    Chaque nom (terminé par \\0) est complété à un multiple de 4 octets compté depuis son propre début,
+    et non depuis le début du fichier : la racine n'est pas forcément alignée sur 4 dans l'image.
+    """
+    (signature,) = struct.unpack_from("<I", data, root)
+    if signature != 0x424A5342:  # "BSJB"
+        raise MetadataError("Signature des métadonnées absente")
+    (version_len,) = struct.unpack_from("<I", data, root + 12)
+    pos = root + 16 + version_len
+    _, n_streams = struct.unpack_from("<HH", data, pos)
+    pos += 4
+    streams = {}
+    for _ in range(n_streams):
+        offset, size = struct.unpack_from("<II", data, pos)
+        name_start = pos + 8
+        end = data.find(b"\0", name_start)
+        if end < 0:
+            raise MetadataError("En-tête de flux tronqué")
+        streams[bytes(data[name_start:end]).decode("ascii")] = (root + offset, size)
+        pos = name_start + ((end - name_start + 1 + 3) & ~3)
+    return streams
+
+
+def _strip_arity(name):
+    """
+    "List`1" -> "List"
+    """
+    tick = name.find("`")
+    return name[:tick] if tick >= 0 else name
+
+
+class MetadataReader:
+    """
+    Lecteur des tables #~ (ou #-) d'un assembly .NET déjà chargé en mémoire (bytes ou mmap).
+    Les lignes sont des tuples de valeurs brutes (offsets de heaps, index, index codés).
+    """
+
+    def __init__(self, data, pe_info=None):
+        self.data = data
+        info = pe_info or parse_pe_headers(data)
+        if not info.is_dotnet or not info.metadata_rva:
+            raise NotDotNetError("Pas de métadonnées .NET (DLL native)")
+        try:
+            root = rva_to_offset(info.sections, info.metadata_rva)
+        except NotPEError as e:
+            raise MetadataError(str(e))
+        self.root = root
+        self.streams = _stream_headers(data, root)
+        tables_stream = self.streams.get("#~") or self.streams.get("#-")
+        if tables_stream is None:
+            raise MetadataError("Flux #~ absent")
+        self.strings_start = self.streams.get("#Strings", (0, 0))[0]
+        self.blob_start = self.streams.get("#Blob", (0, 0))[0]
+        self._read_tables(tables_stream[0])
+        self._string_cache = {}
+
+    # --- Tables ---
+    def _read_tables(self, start):
+        data = self.data
+        heap_sizes = data[start + 6]
+        valid, = struct.unpack_from("<Q", data, start + 8)
+        pos = start + 24
+        self.row_counts = defaultdict(int)
+        for tid in range(64):
+            if valid >> tid & 1:
+                self.row_counts[tid], = struct.unpack_from("<I", data, pos)
+                pos += 4
+        if heap_sizes & 0x40:  # données supplémentaires (métadonnées non compressées)
+            pos += 4
+
+        str_size = 4 if heap_sizes & 0x01 else 2
+        guid_size = 4 if heap_sizes & 0x02 else 2
+        blob_size = 4 if heap_sizes & 0x04 else 2
+
+        def column_size(col):
+            if col == "u2":
+                return 2
+            if col == "u4":
+                return 4
+            if col == "str":
+                return str_size
+            if col == "guid":
+                return guid_size
+            if col == "blob":
+                return blob_size
+            kind, target = col
+            if kind == "idx":
+                return 2 if self.row_counts[target] < 0x10000 else 4
+            bits, tables = CODED_INDEXES[target]
+            max_rows = max(self.row_counts[t] for t in tables if t is not None)
+            return 2 if max_rows < (1 << (16 - bits)) else 4
+
+        self.tables = {}
+        for tid in range(64):
+            count = self.row_counts[tid] if valid >> tid & 1 else 0
+            if not count:
+                continue
+            if tid not in TABLE_SCHEMAS:
+                raise MetadataError(f"Table de métadonnées inconnue 0x{tid:02X}")
+            fmt = "<" + "".join("H" if column_size(c) == 2 else "I" for c in TABLE_SCHEMAS[tid])
+            row_size = struct.calcsize(fmt)
+            self.tables[tid] = [row for row in struct.iter_unpack(fmt, data[pos:pos + row_size * count])]
+            pos += row_size * count
+
+    def rows(self, tid):
+        return self.tables.get(tid, [])
+
+    def row(self, tid, rid):
+        """
+        Ligne `rid` (index 1-based, comme dans les tokens) de la table `tid`.
+        """
+        return self.tables[tid][rid - 1]
+
+    @staticmethod
+    def decode_coded(kind, value):
+        """
+        Index codé -> (table, rid). table vaut None pour un tag inutilisé.
+        """
+        bits, tables = CODED_INDEXES[kind]
+        tag = value & ((1 << bits) - 1)
+        return (tables[tag] if tag < len(tables) else None), value >> bits
+
+    # --- Heaps ---
+    def string(self, offset):
+        cached = self._string_cache.get(offset)
+        if cached is None:
+            start = self.strings_start + offset
+            end = self.data.find(b"\0", start)
+            cached = bytes(self.data[start:end]).decode("utf-8", errors="replace")
+            self._string_cache[offset] = cached
+        return cached
+
+    def blob(self, offset):
+        length, pos = _decompress_uint(self.data, self.blob_start + offset)
+        return bytes(self.data[pos:pos + length])
+
+    # --- Listes (TypeDef.MethodList, MethodDef.ParamList...) avec tables d'indirection éventuelles ---
+    def member_range(self, owner_tid, owner_rid, column, target_tid, ptr_tid=None):
+        """
+        rids de la table cible appartenant à la ligne `owner_rid` (colonne liste `column`).
+        """
+        owners = self.rows(owner_tid)
+        total = len(self.rows(ptr_tid)) if ptr_tid in self.tables else len(self.rows(target_tid))
+        start = owners[owner_rid - 1][column]
+        end = owners[owner_rid][column] if owner_rid < len(owners) else total + 1
+        rids = range(start, min(end, total + 1))
+        if ptr_tid in self.tables:
+            return [self.row(ptr_tid, r)[0] for r in rids]
+        return list(rids)
+
+
+class AssemblyModel:
+    """
+    Vue "C#" d'un assembly : noms de types, signatures rendues comme dans le code décompilé,
+    attributs personnalisés par élément.
+    """
+
+    def __init__(self, reader):
+        self.md = reader
+        md = reader
+        # Types imbriqués
+        self.enclosing = {nested: outer for nested, outer in md.rows(NESTEDCLASS)}
+        self.nested_of = defaultdict(list)
+        for nested, outer in md.rows(NESTEDCLASS):
+            self.nested_of[outer].append(nested)
+        # Paramètres génériques par propriétaire
+        self.generic_params = defaultdict(list)
+        for number, _, owner, name in md.rows(GENERICPARAM):
+            self.generic_params[md.decode_coded("TypeOrMethodDef", owner)].append((number, md.string(name)))
+        for key in self.generic_params:
+            self.generic_params[key] = [n for _, n in sorted(self.generic_params[key])]
+        # Membres par type
+        self.methods_of = {}
+        self.method_owner = {}
+        for rid in range(1, len(md.rows(TYPEDEF)) + 1):
+            methods = md.member_range(TYPEDEF, rid, 5, METHODDEF, METHODPTR)
+            self.methods_of[rid] = methods
+            for m in methods:
+                self.method_owner[m] = rid
+        self.properties_of = defaultdict(list)
+        for i, (parent, _) in enumerate(md.rows(PROPERTYMAP), start=1):
+            self.properties_of[parent] = md.member_range(PROPERTYMAP, i, 1, PROPERTY, PROPERTYPTR)
+        self.events_of = defaultdict(list)
+        for i, (parent, _) in enumerate(md.rows(EVENTMAP), start=1):
+            self.events_of[parent] = md.member_range(EVENTMAP, i, 1, EVENT, EVENTPTR)
+        self.semantics = defaultdict(dict)  # (table, rid) -> {sémantique: méthode}
+        for sem, method, assoc in md.rows(METHODSEMANTICS):
+            self.semantics[md.decode_coded("HasSemantics", assoc)][sem] = method
+        self.interfaces_of = defaultdict(list)
+        for cls, iface in md.rows(INTERFACEIMPL):
+            self.interfaces_of[cls].append(iface)
+        # Attributs personnalisés : (table, rid) -> [nom du type d'attribut]
+        self.attributes = defaultdict(list)
+        for parent, ctor, _ in md.rows(CUSTOMATTRIBUTE):
+            self.attributes[md.decode_coded("HasCustomAttribute", parent)].append(self._attribute_name(ctor))
+
+    # --- Noms de types ---
+    def _attribute_name(self, ctor):
+        md = self.md
+        tid, rid = md.decode_coded("CustomAttributeType", ctor)
+        if tid == METHODDEF:
+            return _strip_arity(md.string(md.row(TYPEDEF, self.method_owner.get(rid, 1))[1]))
+        if tid == MEMBERREF:
+            ptid, prid = md.decode_coded("MemberRefParent", md.row(MEMBERREF, rid)[0])
+            if ptid == TYPEREF:
+                return _strip_arity(md.string(md.row(TYPEREF, prid)[1]))
+            if ptid == TYPEDEF:
+                return _strip_arity(md.string(md.row(TYPEDEF, prid)[1]))
+        return ""
+
+    def full_name(self, tid, rid):
+        """
+        Nom complet "Namespace.Type" d'un TypeDef / TypeRef (sans arité générique).
+        """
+        row = self.md.row(tid, rid)  # TypeDef et TypeRef : (..., TypeName, TypeNamespace, ...)
+        ns = self.md.string(row[2])
+        name = _strip_arity(self.md.string(row[1]))
+        return f"{ns}.{name}" if ns else name
+
+    def type_name(self, tid, rid, generic_args=None):
+        """
+        Nom C# court d'un TypeDef / TypeRef / TypeSpec.
+        """
+        if tid == TYPESPEC:
+            return self.decode_type(self.md.blob(self.md.row(TYPESPEC, rid)[0]), 0)[0]
+        full = self.full_name(tid, rid)
+        if full in CSHARP_ALIASES:
+            return CSHARP_ALIASES[full]
+        name = _strip_arity(self.md.string(self.md.row(tid, rid)[1]))
+        if generic_args:
+            if full == "System.Nullable" and len(generic_args) == 1:
+                return f"{generic_args[0]}?"
+            return f"{name}<{', '.join(generic_args)}>"
+        if tid == TYPEDEF and self.generic_params.get((TYPEDEF, rid)):
+            params = self.generic_params[(TYPEDEF, rid)]
+            outer = self.enclosing.get(rid)
+            # Les paramètres hérités du type englobant ne sont pas répétés
+            if outer:
+                params = params[len(self.generic_params.get((TYPEDEF, outer), [])):]
+            if params:
+                return f"{name}<{', '.join(params)}>"
+        return name
+
+    def coded_type_name(self, kind, value):
+        tid, rid = self.md.decode_coded(kind, value)
+        return self.type_name(tid, rid) if tid is not None and rid else ""
+
+    # --- Signatures ---
+    def decode_type(self, sig, pos, type_params=(), method_params=()):
+        """
+        Décode un type de signature à partir de `pos` : retourne (texte C#, nouvelle position).
+        """
+        et = sig[pos]
+        pos += 1
+        if et in ELEMENT_TYPES:
+            return ELEMENT_TYPES[et], pos
+        if et in (0x1F, 0x20):  # CMOD_REQD / CMOD_OPT : ignorés
+            _, pos = _decompress_uint(sig, pos)
+            return self.decode_type(sig, pos, type_params, method_params)
+        if et == 0x45:  # PINNED
+            return self.decode_type(sig, pos, type_params, method_params)
+        if et == 0x0F:  # PTR
+            inner, pos = self.decode_type(sig, pos, type_params, method_params)
+            return f"{inner}*", pos
+        if et == 0x10:  # BYREF
+            inner, pos = self.decode_type(sig, pos, type_params, method_params)
+            return f"ref {inner}", pos
+        if et in (0x11, 0x12):  # VALUETYPE / CLASS
+            coded, pos = _decompress_uint(sig, pos)
+            return self.coded_type_name("TypeDefOrRef", coded), pos
+        if et in (0x13, 0x1E):  # VAR / MVAR
+            number, pos = _decompress_uint(sig, pos)
+            names = type_params if et == 0x13 else method_params
+            return (names[number] if number < len(names) else f"T{number}"), pos
+        if et == 0x1D:  # SZARRAY
+            inner, pos = self.decode_type(sig, pos, type_params, method_params)
+            return f"{inner}[]", pos
+        if et == 0x14:  # ARRAY
+            inner, pos = self.decode_type(sig, pos, type_params, method_params)
+            rank, pos = _decompress_uint(sig, pos)
+            n_sizes, pos = _decompress_uint(sig, pos)
+            for _ in range(n_sizes):
+                _, pos = _decompress_uint(sig, pos)
+            n_bounds, pos = _decompress_uint(sig, pos)
+            for _ in range(n_bounds):
+                _, pos = _decompress_int(sig, pos)
+            return f"{inner}[{',' * (rank - 1)}]", pos
+        if et == 0x15:  # GENERICINST
+            pos += 1  # CLASS / VALUETYPE
+            coded, pos = _decompress_uint(sig, pos)
+            count, pos = _decompress_uint(sig, pos)
+            args = []
+            for _ in range(count):
+                arg, pos = self.decode_type(sig, pos, type_params, method_params)
+                args.append(arg)
+            tid, rid = self.md.decode_coded("TypeDefOrRef", coded)
+            return self.type_name(tid, rid, args), pos
+        if et == 0x1B:  # FNPTR
+            _, pos, _ = self.decode_method_sig(sig, pos, type_params, method_params)
+            return "delegate*", pos
+        raise MetadataError(f"ELEMENT_TYPE 0x{et:02X} non géré")
+
+    def decode_method_sig(self, sig, pos=0, type_params=(), method_params=()):
+        """
+        Signature de méthode / propriété : retourne (type de retour, position, [types des paramètres]).
+        """
+        conv = sig[pos]
+        pos += 1
+        if conv & 0x10:  # GENERIC
+            _, pos = _decompress_uint(sig, pos)
+        count, pos = _decompress_uint(sig, pos)
+        ret, pos = self.decode_type(sig, pos, type_params, method_params)
+        params = []
+        for _ in range(count):
+            if sig[pos] == 0x41:  # SENTINEL (varargs)
+                pos += 1
+            ptype, pos = self.decode_type(sig, pos, type_params, method_params)
+            params.append(ptype)
+        return ret, pos, params
+
+    # --- Rendu C# ---
+    def type_kind(self, rid):
+        flags, _, _, extends = self.md.row(TYPEDEF, rid)[:4]
+        if flags & TD_INTERFACE:
+            return "interface"
+        base = ""
+        tid, brid = self.md.decode_coded("TypeDefOrRef", extends)
+        if tid in (TYPEDEF, TYPEREF) and brid:
+            base = self.full_name(tid, brid)
+        if base == "System.Enum":
+            return "enum"
+        if base == "System.ValueType" and self.full_name(TYPEDEF, rid) != "System.Enum":
+            return "struct"
+        if base == "System.MulticastDelegate":
+            return "delegate"
+        return "class"
+
+    def type_signature(self, rid):
+        """
+        Déclaration du type telle qu'écrite par le décompilateur, ex: "public sealed class Foo : Bar, IBaz".
+        """
+        md = self.md
+        flags, _, _, extends = md.row(TYPEDEF, rid)[:4]
+        kind = self.type_kind(rid)
+        parts = [TYPE_VISIBILITY[flags & 0x7]]
+        if kind == "class":
+            if flags & TD_ABSTRACT and flags & TD_SEALED:
+                parts.append("static")
+            elif flags & TD_ABSTRACT:
+                parts.append("abstract")
+            elif flags & TD_SEALED:
+                parts.append("sealed")
+        parts += [kind, self.type_name(TYPEDEF, rid)]
+        bases = []
+        if kind in ("class", "interface"):
+            tid, brid = md.decode_coded("TypeDefOrRef", extends)
+            if tid is not None and brid and (tid == TYPESPEC or self.full_name(tid, brid) != "System.Object"):
+                bases.append(self.type_name(tid, brid))
+            bases += [self.coded_type_name("TypeDefOrRef", iface) for iface in self.interfaces_of.get(rid, [])]
+        signature = " ".join(parts)
+        return f"{signature} : {', '.join(bases)}" if bases else signature
+
+    def _type_params(self, type_rid):
+        return self.generic_params.get((TYPEDEF, type_rid), [])
+
+    def _parameters(self, method_rid, param_types):
+        """
+        Liste "type nom" des paramètres (ref / out / params compris).
+        """
+        md = self.md
+        names = {}
+        flags_by_seq = {}
+        param_rid_by_seq = {}
+        for prid in md.member_range(METHODDEF, method_rid, 5, PARAM, PARAMPTR):
+            pflags, seq, name = md.row(PARAM, prid)
+            names[seq] = md.string(name)
+            flags_by_seq[seq] = pflags
+            param_rid_by_seq[seq] = prid
+        rendered = []
+        for i, ptype in enumerate(param_types, start=1):
+            if ptype.startswith("ref ") and flags_by_seq.get(i, 0) & PARAM_OUT:
+                ptype = "out " + ptype[4:]
+            if "ParamArrayAttribute" in self.attributes.get((PARAM, param_rid_by_seq.get(i)), []):
+                ptype = "params " + ptype
+            rendered.append(f"{ptype} {names.get(i, f'p{i}')}".strip())
+        return rendered
+
+    def method_signature(self, method_rid):
+        """
+        Signature C# d'une méthode, ex: "public static string GetName(int index, out bool found)".
+        """
+        md = self.md
+        _, _, flags, name_off, sig_off, _ = md.row(METHODDEF, method_rid)
+        owner = self.method_owner.get(method_rid, 1)
+        name = md.string(name_off)
+        type_params = self._type_params(owner)
+        method_params = self.generic_params.get((METHODDEF, method_rid), [])
+        ret, _, param_types = self.decode_method_sig(md.blob(sig_off), 0, type_params, method_params)
+        params = ", ".join(self._parameters(method_rid, param_types))
+
+        in_interface = md.row(TYPEDEF, owner)[0] & TD_INTERFACE
+        modifiers = []
+        if not in_interface:
+            modifiers.append(MEMBER_ACCESS.get(flags & 0x7, "private"))
+            if flags & MD_STATIC:
+                modifiers.append("static")
+            if flags & MD_PINVOKE:
+                modifiers.append("extern")
+            if flags & MD_ABSTRACT:
+                modifiers.append("abstract")
+            elif flags & MD_VIRTUAL:
+                if flags & MD_NEWSLOT:
+                    if not flags & MD_FINAL:
+                        modifiers.append("virtual")
+                else:
+                    modifiers.append("sealed override" if flags & MD_FINAL else "override")
+
+        type_short = _strip_arity(md.string(md.row(TYPEDEF, owner)[1]))
+        if name == ".cctor":
+            return f"static {type_short}()"
+        if name == ".ctor":
+            return " ".join(modifiers + [f"{type_short}({params})"])
+        if method_params:
+            name = f"{name}<{', '.join(method_params)}>"
+        return " ".join(modifiers + [ret, f"{name}({params})"])
+
+    def _accessor_modifiers(self, key, prefer):
+        """
+        Modificateurs d'une propriété / d'un événement, déduits de leurs accesseurs.
+        """
+        accessors = self.semantics.get(key, {})
+        best = None
+        for sem in prefer:
+            method = accessors.get(sem)
+            if method is None:
+                continue
+            flags = self.md.row(METHODDEF, method)[2]
+            if best is None or (flags & 0x7) > (best & 0x7):
+                best = flags
+        if best is None:
+            return []
+        owner = self.method_owner.get(accessors[next(s for s in prefer if s in accessors)], 1)
+        if self.md.row(TYPEDEF, owner)[0] & TD_INTERFACE:
+            return []
+        mods = [MEMBER_ACCESS.get(best & 0x7, "private")]
+        if best & MD_STATIC:
+            mods.append("static")
+        return mods
+
+    def property_signature(self, prop_rid, owner):
+        md = self.md
+        _, name_off, sig_off = md.row(PROPERTY, prop_rid)
+        ret, _, params = self.decode_method_sig(md.blob(sig_off), 0, self._type_params(owner))
+        mods = self._accessor_modifiers((PROPERTY, prop_rid), (SEM_GETTER, SEM_SETTER))
+        name = md.string(name_off)
+        if params:
+            name = f"this[{', '.join(params)}]"
+        return " ".join(mods + [ret, name])
+
+    def event_signature(self, event_rid):
+        md = self.md
+        _, name_off, etype = md.row(EVENT, event_rid)
+        mods = self._accessor_modifiers((EVENT, event_rid), (SEM_ADDON,))
+        return " ".join(mods + ["event", self.coded_type_name("TypeDefOrRef", etype), md.string(name_off)])
+
+    # --- Informations d'assembly ---
+    def assembly_version(self):
+        rows = self.md.rows(ASSEMBLY)
+        if not rows:
+            return ""
+        _, major, minor, build, revision = rows[0][:5]
+        return f"{major}.{minor}.{build}.{revision}"
+
+    def assembly_name(self):
+        rows = self.md.rows(ASSEMBLY)
+        return self.md.string(rows[0][7]) if rows else ""
+
+    def assembly_references(self):
+        """
+        [(nom, version), ...] des assemblies référencés.
+        """
+        out = []
+        for major, minor, build, revision, _, _, name, _, _ in self.md.rows(ASSEMBLYREF):
+            out.append((self.md.string(name), f"{major}.{minor}.{build}.{revision}"))
+        return out
+
+    # --- Extraction [PMLNetCallable] ---
+    def has_pmlnet(self, key):
+        return any(a in PMLNET_ATTRIBUTE_NAMES for a in self.attributes.get(key, []))
+
+    def pmlnet_entries(self, type_rid):
+        """
+        Entrées [PMLNetCallable] d'un type et de ses types imbriqués :
+        [(annotation, signature, numéro de ligne), ...] (pas de numéro de ligne sans source : "").
+        """
+        entries = []
+        if self.has_pmlnet((TYPEDEF, type_rid)):
+            entries.append((PMLNET_ANNOTATION, self.type_signature(type_rid), ""))
+        for method in self.methods_of.get(type_rid, []):
+            if self.has_pmlnet((METHODDEF, method)):
+                entries.append((PMLNET_ANNOTATION, self.method_signature(method), ""))
+        for prop in self.properties_of.get(type_rid, []):
+            if self.has_pmlnet((PROPERTY, prop)):
+                entries.append((PMLNET_ANNOTATION, self.property_signature(prop, type_rid), ""))
+        for event in self.events_of.get(type_rid, []):
+            if self.has_pmlnet((EVENT, event)):
+                entries.append((PMLNET_ANNOTATION, self.event_signature(event), ""))
+        for nested in self.nested_of.get(type_rid, []):
+            entries.extend(self.pmlnet_entries(nested))
+        return entries
+
+    def source_files(self):
+        """
+        Fichiers .cs que produirait la décompilation en projet (un par type de premier niveau) :
+        [(nom de fichier, namespace, rid du type), ...]
+        """
+        md = self.md
+        files = []
+        for rid, row in enumerate(md.rows(TYPEDEF), start=1):
+            name = md.string(row[1])
+            if rid in self.enclosing or name == "<Module>" or name.startswith("<"):
+                continue
+            files.append((f"{_strip_arity(name)}.cs", md.string(row[2]), rid))
+        return files
+
+
+def read_pmlnet_catalogue(dll_path):
+    """
+    Équivalent "métadonnées" de la décompilation ILSpy + lecture des .cs :
+    retourne (version, [(fichier .cs, namespace, [(annotation, signature, ligne), ...]), ...]).
+    Lève NotDotNetError pour une DLL native, MetadataError / NotPEError si elle est illisible.
+    """
+    with open_image(dll_path) as data:
+        model = AssemblyModel(MetadataReader(data))
+        parsed = []
+        for file, namespace, rid in model.source_files():
+            entries = model.pmlnet_entries(rid) or [("", "", "")]
+            parsed.append((file, namespace, entries))
+        # ILSpy génère aussi Properties/AssemblyInfo.cs (sans namespace ni attribut PMLNet)
+        parsed.append(("AssemblyInfo.cs", "", [("", "", "")]))
+        return model.assembly_version(), parsed
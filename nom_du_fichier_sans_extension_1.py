@@ -1,13 +1,19 @@
 import os
 import pandas as pd
-import fnmatch
 import tqdm
 
+from corpus_crawler import list_files
+from index_symboles import SymbolIndex
+
 # 📂 Répertoires sources
 pml_root = r"C:\Program Files (x86)\AVEVA\Everything3D2.10"
 cs_root = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\transposition_dll_2.1"
 output_path = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\export_structure_fichiers.xlsx"
 
+# 🗂️ Index des symboles C# : DLL et namespace lus dans le code (repli sur les noms de dossiers si absent)
+use_symbol_index = True
+symbol_index_db = os.path.join(cs_root, "index_symboles.sqlite")
+
 # 📄 Extensions cibles
 pml_extensions = ["*.pmlfrm", "*.pmlobj", "*.pmlfnc"]
 cs_extension = "*.cs"
@@ -17,37 +23,48 @@ results = []
 
 # 🔍 Recherche fichiers PML
 print("🔍 Recherche des fichiers PML...")
-for root, _, files in tqdm.tqdm(os.walk(pml_root), desc="Analyse PML", unit="dir"):
-    for ext in pml_extensions:
-        for file in fnmatch.filter(files, ext):
-            name_no_ext, extension = os.path.splitext(file)
-            results.append({
-                "nom du fichier sans extension": name_no_ext,
-                "nom du fichier avec extension": file,
-                "extension du fichier": extension,
-                "namespace": "",
-                "DLL": ""
-            })
+for rec in tqdm.tqdm(list_files(pml_root, pml_extensions), desc="Analyse PML", unit="fichier"):
+    file = os.path.basename(rec.path)
+    name_no_ext = os.path.splitext(file)[0]
+    results.append({
+        "nom du fichier sans extension": name_no_ext,
+        "nom du fichier avec extension": file,
+        "extension du fichier": rec.ext,
+        "namespace": "",
+        "DLL": ""
+    })
 
 # 🔍 Recherche fichiers C#
 print("\n🔍 Recherche des fichiers .cs...")
-for root, _, files in tqdm.tqdm(os.walk(cs_root), desc="Analyse C#", unit="dir"):
-    for file in fnmatch.filter(files, cs_extension):
-        name_no_ext, extension = os.path.splitext(file)
-        relative_path = os.path.relpath(root, cs_root)
-        path_parts = relative_path.split(os.sep)
+symbol_index = SymbolIndex(symbol_index_db) if use_symbol_index else None
+if symbol_index is not None:
+    scanned, removed = symbol_index.update(cs_root)
+    print(f"🗂️ Index des symboles : {scanned} fichiers (ré)analysés, {removed} retirés")
 
+for rec in tqdm.tqdm(list_files(cs_root, cs_extension), desc="Analyse C#", unit="fichier"):
+    root, file = os.path.split(rec.path)
+    name_no_ext = os.path.splitext(file)[0]
+    relative_path = os.path.relpath(root, cs_root)
+    path_parts = relative_path.split(os.sep)
+
+    location = symbol_index.file_location(rec.path) if symbol_index is not None else None
+    if location:
+        dll, namespace = location
+    else:
         # Namespace = dernier dossier, DLL = dossier parent du namespace
         namespace = path_parts[-1] if len(path_parts) >= 1 else ""
         dll = path_parts[-2] if len(path_parts) >= 2 else ""
 
-        results.append({
-            "nom du fichier sans extension": name_no_ext,
-            "extension du fichier": extension,
-            "DLL": dll,
-            "namespace": namespace,
-            "nom du fichier avec extension": file,
-        })
+    results.append({
+        "nom du fichier sans extension": name_no_ext,
+        "extension du fichier": rec.ext,
+        "DLL": dll,
+        "namespace": namespace,
+        "nom du fichier avec extension": file,
+    })
+
+if symbol_index is not None:
+    symbol_index.close()
 
 # 💾 Export Excel
 df = pd.DataFrame(results)
@@ -0,0 +1,148 @@
+import mmap
+import struct
+from collections import namedtuple
+
+# =========================
+# Lecture minimale des en-têtes PE (DOS / COFF / Optional / CLR) sans pefile
+# =========================
+# Seuls quelques centaines d'octets sont lus via mmap : pas d'analyse complète du fichier.
+
+MACHINE_TYPES = {
+    0x014C: "x86",
+    0x8664: "x64",
+    0x01C4: "ARMNT",
+    0xAA64: "ARM64",
+    0x0200: "IA64",
+    0x0000: "Any",
+}
+
+PE32_MAGIC = 0x10B
+PE32_PLUS_MAGIC = 0x20B
+
+CLR_DIRECTORY_INDEX = 14
+COMIMAGE_FLAGS_ILONLY = 0x00000001
+COMIMAGE_FLAGS_32BITREQUIRED = 0x00000002
+COMIMAGE_FLAGS_32BITPREFERRED = 0x00020000
+
+Section = namedtuple("Section", ["name", "virtual_address", "virtual_size", "raw_pointer", "raw_size"])
+
+PEInfo = namedtuple("PEInfo", [
+    "machine",        # "x86", "x64", ... (ou code hexa si inconnu)
+    "pe_format",      # "PE32" / "PE32+"
+    "is_dotnet",      # répertoire CLR (DATA_DIRECTORY[14]) présent
+    "clr_flags",      # flags de l'en-tête CLR (0 si natif)
+    "metadata_rva",   # RVA des métadonnées .NET (0 si natif)
+    "metadata_size",
+    "sections",       # [Section, ...] pour convertir RVA -> offset fichier
+])
+
+
+class NotPEError(ValueError):
+    """Fichier qui n'est pas une image PE valide."""
+
+
+def rva_to_offset(sections, rva):
+    """
+    Convertit une adresse virtuelle relative en offset dans le fichier.
+    """
+    for s in sections:
+        size = max(s.virtual_size, s.raw_size)
+        if s.virtual_address <= rva < s.virtual_address + size:
+            return rva - s.virtual_address + s.raw_pointer
+    raise NotPEError(f"RVA 0x{rva:X} hors sections")
+
+
+def parse_pe_headers(data):
+    """
+    Analyse les en-têtes d'une image PE (bytes, mmap...) et retourne un PEInfo.
+    """
+    if len(data) < 0x40 or data[:2] != b"MZ":
+        raise NotPEError("Signature MZ absente")
+    (e_lfanew,) = struct.unpack_from("<I", data, 0x3C)
+    if e_lfanew + 24 > len(data) or data[e_lfanew:e_lfanew + 4] != b"PE\0\0":
+        raise NotPEError("Signature PE absente")
+
+    coff = e_lfanew + 4
+    try:
+        machine, n_sections, _, _, _, opt_size, _ = struct.unpack_from("<HHIIIHH", data, coff)
+        opt = coff + 20
+        (magic,) = struct.unpack_from("<H", data, opt)
+        if magic == PE32_MAGIC:
+            pe_format, dirs_offset = "PE32", 96
+        elif magic == PE32_PLUS_MAGIC:
+            pe_format, dirs_offset = "PE32+", 112
+        else:
+            raise NotPEError(f"Optional header inconnu (0x{magic:X})")
+
+        (n_dirs,) = struct.unpack_from("<I", data, opt + dirs_offset - 4)
+        clr_rva = clr_size = 0
+        if n_dirs > CLR_DIRECTORY_INDEX:
+            clr_rva, clr_size = struct.unpack_from("<II", data, opt + dirs_offset + 8 * CLR_DIRECTORY_INDEX)
+    except struct.error:
+        # Fichier tronqué au milieu des en-têtes
+        raise NotPEError("En-têtes PE tronqués") from None
+
+    sections = []
+    table = opt + opt_size
+    for i in range(n_sections):
+        off = table + 40 * i
+        if off + 40 > len(data):
+            break
+        name, vsize, vaddr, raw_size, raw_ptr = struct.unpack_from("<8sIIII", data, off)
+        sections.append(Section(name.rstrip(b"\0").decode("ascii", "replace"), vaddr, vsize, raw_ptr, raw_size))
+
+    clr_flags = metadata_rva = metadata_size = 0
+    if clr_rva:
+        try:
+            cor = rva_to_offset(sections, clr_rva)
+            # IMAGE_COR20_HEADER : cb, versions, MetaData (RVA, taille), Flags
+            metadata_rva, metadata_size, clr_flags = struct.unpack_from("<III", data, cor + 8)
+        except (NotPEError, struct.error):
+            pass
+
+    return PEInfo(
+        MACHINE_TYPES.get(machine, f"0x{machine:04X}"),
+        pe_format,
+        clr_rva != 0,
+        clr_flags,
+        metadata_rva,
+        metadata_size,
+        sections,
+    )
+
+
+def open_image(path):
+    """
+    Ouvre un fichier en mmap lecture seule (context manager via `with`).
+    """
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_pe_info(path):
+    """
+    Lit les en-têtes PE d'un fichier via mmap.
+    """
+    with open_image(path) as data:
+        return parse_pe_headers(data)
+
+
+def dotnet_mode(info):
+    """
+    "IL only" pour un assembly purement managé, "Mixte" pour du C++/CLI, "" pour du natif.
+    """
+    if not info.is_dotnet:
+        return ""
+    return "IL only" if info.clr_flags & COMIMAGE_FLAGS_ILONLY else "Mixte"
+
+
+def effective_machine(info):
+    """
+    Architecture réelle : un assembly IL only marqué x86 sans 32BITREQUIRED est en fait AnyCPU,
+    de même avec 32BITREQUIRED + 32BITPREFERRED ("Prefer 32-bit", AnyCPU exécuté en 32 bits si possible).
+    """
+    flags = info.clr_flags
+    if (info.is_dotnet and info.machine == "x86" and flags & COMIMAGE_FLAGS_ILONLY
+            and (not flags & COMIMAGE_FLAGS_32BITREQUIRED or flags & COMIMAGE_FLAGS_32BITPREFERRED)):
+        return "AnyCPU"
+    return info.machine
@@ -0,0 +1,73 @@
+import os
+import re
+import mmap
+
+# =========================
+# Préfiltre au niveau des octets : écarte les fichiers qui ne contiennent aucun des termes recherchés
+# =========================
+# Chaque fichier est projeté en mémoire (mmap) et parcouru par une seule recherche insensible à la casse sur
+# tous les termes à la fois ; seuls les fichiers retenus sont ensuite décodés et découpés en lignes.
+# Le filtre ne fait que des exclusions sûres : un fichier écarté ne peut produire aucune correspondance
+# `term.lower() in line.lower()` (ni recherche insensible à la casse sur la ligne). Dans le doute (UTF-8
+# invalide, caractère dont la casse rejoint l'ASCII, terme non ASCII, erreur de lecture), le fichier est
+# conservé et traité comme avant. Les accents des commentaires n'empêchent pas d'écarter un fichier.
+
+NON_ASCII_RE = re.compile(rb"[\x80-\xff]")
+# Seuls caractères non ASCII qu'une comparaison insensible à la casse rapproche d'une lettre ASCII :
+# U+0130 "İ" (minuscule "i̇"), U+212A "K" Kelvin (minuscule "k"), et pour re.IGNORECASE U+0131 "ı" (i)
+# et U+017F "ſ" (s). Leur encodage UTF-8 échappe à la recherche ASCII des octets.
+CASE_FOLDING_RE = re.compile(rb"\xc4[\xb0\xb1]|\xc5\xbf|\xe2\x84\xaa")
+
+
+class BytesPrefilter:
+    """
+    Filtre sur une liste de termes (sous-chaînes, insensibles à la casse). Inactif (tout fichier conservé)
+    si la liste est vide ou contient un terme vide ou non ASCII.
+    """
+
+    def __init__(self, terms):
+        terms = list(terms)
+        self.enabled = bool(terms) and all(term and term.isascii() for term in terms)
+        self.regex = None
+        if self.enabled:
+            words = sorted({term.lower().encode("ascii") for term in terms}, key=len, reverse=True)
+            self.regex = re.compile(b"|".join(re.escape(word) for word in words), re.IGNORECASE)
+        self.kept = 0
+        self.skipped = 0
+
+    def may_contain(self, path):
+        """
+        Faux seulement si le fichier ne contient certainement aucun terme.
+        """
+        if not self.enabled:
+            self.kept += 1
+            return True
+        found = self._search(path)
+        if found:
+            self.kept += 1
+        else:
+            self.skipped += 1
+        return found
+
+    def _search(self, path):
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if self.regex.search(data):
+                        return True
+                    if NON_ASCII_RE.search(data) is None:
+                        return False
+                    if CASE_FOLDING_RE.search(data):
+                        return True
+                    # UTF-8 invalide : le décodage permissif (errors="ignore") supprime des octets et peut
+                    # recoller deux morceaux de texte en un terme
+                    try:
+                        data[:].decode("utf-8")
+                    except UnicodeDecodeError:
+                        return True
+                    return False
+        except (OSError, ValueError):
+            # Illisible ici : le script lit le fichier lui-même et signale l'erreur comme avant
+            return True
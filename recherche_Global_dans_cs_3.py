@@ -1,8 +1,10 @@
 import os
 import pandas as pd
-import fnmatch
 import tqdm
 
+from corpus_crawler import list_files
+from index_symboles import SymbolIndex
+
 # 📂 Définition du chemin de recherche
 cs_search_directory = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\transposition_dll_2.1"
 output_file = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\recherche_TERMS_dans_CS_sType Description.xlsx"
@@ -10,23 +12,49 @@ output_file = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE
 # 🔍 Liste des termes à rechercher
 search_terms = ["sType", "Description (Full Description)", "cattext", "dtxrtext", "Description"]
 
+# 🗂️ Index des symboles : un terme qui est un nom de classe / membre ("Foo", "GetName") ou un nom complet
+# ("Aveva.Core.Foo") est résolu par l'index, exporté dans une feuille à part ("Symboles C#") ; seuls les autres
+# termes sont cherchés dans le contenu des .cs (première feuille, mise en forme d'origine)
+use_symbol_index = True
+scan_symbol_terms = False  # True : chercher aussi les termes résolus par l'index dans le contenu des .cs
+symbol_sheet_name = "Symboles C#"
+symbol_index_db = os.path.join(cs_search_directory, "index_symboles.sqlite")
+
 # 📋 Stockage des résultats
 results = []
+symbol_results = []
 
 # 📂 Extensions de fichiers à scanner (uniquement .cs)
 file_extensions = ["*.cs"]
 
-# 📂 Fonction de recherche récursive
+# 📂 Fonction de recherche récursive (crawler parallèle commun, triés par chemin : ordre d'export reproductible)
 def scan_files(directory, file_extensions):
-    scanned_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if any(fnmatch.fnmatch(file, ext) for ext in file_extensions):
-                scanned_files.append(os.path.join(root, file))
-    return scanned_files
+    return [rec.path for rec in list_files(directory, file_extensions)]
+
+# 🗂️ Définitions : où chaque terme est déclaré (classe, méthode, propriété...)
+scan_terms = list(search_terms)
+if use_symbol_index:
+    with SymbolIndex(symbol_index_db) as symbol_index:
+        symbol_index.update(cs_search_directory)
+        for term in search_terms:
+            symbols = symbol_index.lookup(term) if "." in term else symbol_index.find(term)
+            for symbol in symbols:
+                symbol_results.append({
+                    "Source": "Symbole C#",
+                    "Chemin du fichier": os.path.relpath(symbol.path, cs_search_directory),
+                    "Nom du fichier": os.path.basename(symbol.path),
+                    "Termes détectés": term,
+                    "Nom complet": symbol.fqn,
+                    "Genre": symbol.kind,
+                    "Ligne": symbol.line,
+                    "DLL": symbol.dll
+                })
+            if symbols and not scan_symbol_terms:
+                scan_terms.remove(term)
+    print(f"🗂️ Index des symboles : {len(search_terms) - len(scan_terms)} terme(s) résolu(s) sans parcours")
 
-# 🔍 Recherche des fichiers C#
-cs_files = scan_files(cs_search_directory, file_extensions)
+# 🔍 Recherche des fichiers C# (termes non résolus par l'index)
+cs_files = scan_files(cs_search_directory, file_extensions) if scan_terms else []
 
 # 📊 Analyse des fichiers avec une barre de progression
 total_files = len(cs_files)
@@ -37,7 +65,7 @@ for file_path in tqdm.tqdm(cs_files, desc="🔎 Analyse des fichiers C#", unit="
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
             content = f.read()
-            detected_terms = [term for term in search_terms if term in content]
+            detected_terms = [term for term in scan_terms if term in content]
 
             if detected_terms:
                 relative_path = os.path.relpath(file_path, cs_search_directory)
@@ -51,9 +79,12 @@ for file_path in tqdm.tqdm(cs_files, desc="🔎 Analyse des fichiers C#", unit="
         print(f"⚠️ Erreur lors de l'analyse de {file_path} : {e}")
 
 # 📤 Exportation des résultats en Excel
-if results:
-    df = pd.DataFrame(results)
-    df.to_excel(output_file, index=False)
+if results or symbol_results:
+    with pd.ExcelWriter(output_file) as writer:
+        df = pd.DataFrame(results, columns=["Source", "Chemin du fichier", "Nom du fichier", "Termes détectés"])
+        df.to_excel(writer, index=False)
+        if symbol_results:
+            pd.DataFrame(symbol_results).to_excel(writer, sheet_name=symbol_sheet_name, index=False)
     print(f"\n✅ Analyse terminée. Résultats enregistrés dans : {output_file}")
 else:
     print("\n❌ Aucun fichier .cs ne contient les termes recherchés.")
\ No newline at end of file
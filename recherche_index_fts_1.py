@@ -0,0 +1,182 @@
+import os
+import re
+import pandas as pd
+
+from corpus_crawler import normaliser_extensions, classer_extension
+from index_fts import CodeSearchIndex
+from concat_xml import build_concatenation
+from ecrivains_flux import write_excel_stream
+
+# 📂 Base de recherche plein texte unique (PML, C# décompilé, UIC, XML), mise à jour à chaque exécution
+db_path = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\recherche_fts.sqlite"
+
+# 📂 Racines indexées par corpus (voir CORPUS_EXTENSIONS dans index_fts.py) ; liste vide -> corpus ignoré
+corpora = {
+    "pml": [
+        r"C:\Program Files (x86)\AVEVA\Everything3D2.10",
+        r"D:\E3D.2.1\MEIUI",
+        r"D:\E3D.2.1\MEILIB",
+    ],
+    "cs": [r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\transposition_dll_2.1"],
+    "uic": [r"C:\Program Files (x86)\AVEVA"],
+    "xml": [r"C:\Program Files (x86)\AVEVA", r"D:\E3D.2.1"],
+}
+update_index = True  # False : interroger la base telle quelle (pas de parcours disque)
+
+# 🔍 Termes recherchés (sous-chaîne, insensible à la casse), répartis comme dans
+# ultime_recherche_termes_pml_et_sans_extension_exacte_partiel_1.py : la liste d'origine de chaque terme
+# donne la colonne "Type de correspondance" de la mise en forme "lignes"
+exact_terms = ["container", "pmlcontrol"]
+partial_terms = []
+use_txt_term_list = False
+txt_term_file = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\liste_dll.txt"
+search_corpora = ["pml"]
+
+txt_terms = []
+if use_txt_term_list and os.path.isfile(txt_term_file):
+    with open(txt_term_file, "r", encoding="utf-8", errors="ignore") as f:
+        txt_terms = [line.strip() for line in f if line.strip()]
+
+all_terms = ([(term, "exact_terms") for term in exact_terms]
+             + [(term, "partial_terms") for term in partial_terms]
+             + [(term, "txt_terms") for term in txt_terms])
+search_terms = list(dict.fromkeys(term for term, _ in all_terms))
+
+# 📋 Mise en forme de l'export, identique au script d'origine :
+#   "lignes"      -> ultime_recherche_termes_pml_et_sans_extension_exacte_partiel_1.py (une ligne par terme trouvé)
+#   "methodes"    -> lignes_completes_mots_cles_pmlglobal_3.py (méthodes appelées sur un mot contenant le terme)
+#   "fichiers_cs" -> recherche_Global_dans_cs_3.py (un fichier par ligne, termes détectés ; sensible à la casse)
+#   "xml_concat"  -> concat_xml.py (fichiers XML contenant un terme, concaténés dans un .txt)
+export_layout = "lignes"
+output_file = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\recherche_fts_resultats.xlsx"
+
+# 📂 Extensions parcourues par le script d'origine de chaque mise en forme (le corpus "pml" indexe leur union)
+layout_extensions = {
+    "lignes": ["*.pmlfrm", "*.pmlobj", "*.pmlcmd", "*.pmlfnc", "*.pmlmac", ""],
+    "methodes": ["*.pmlfrm", "*.pmlobj", "*.pmlcmd", "*.pmlfnc", "*.mac", "*.pmlmac"],
+}
+
+
+# 🧩 Mises en forme
+def rows_lignes(hits_by_term, all_terms):
+    """
+    Une ligne par (ligne de source, terme), termes dans l'ordre de `all_terms` [(terme, liste d'origine)] ;
+    commentaires "--" écartés.
+    """
+    by_line = {}
+    for term, match_type in all_terms:
+        for hit in hits_by_term[term]:
+            if hit.text.strip().startswith("-"):
+                continue
+            by_line.setdefault((hit.path, hit.line), (hit, []))[1].append((term, match_type))
+    results = []
+    for key in sorted(by_line):
+        hit, terms = by_line[key]
+        for term, match_type in terms:
+            results.append({
+                "Chemin du fichier": hit.path,
+                "Nom du fichier": os.path.basename(hit.path),
+                "search_directory": hit.root,
+                "file_extension": hit.ext,
+                "Terme détecté": term,
+                "Type de correspondance": match_type,
+                "Ligne complète": hit.text,
+                "Numéro de ligne": hit.line
+            })
+    return results
+
+
+def rows_methodes(hits_by_term, all_terms):
+    """
+    Méthodes appelées sur tout mot contenant le terme (mot.methode), une ligne par appel.
+    """
+    search_terms = list(dict.fromkeys(term for term, _ in all_terms))
+    by_line = {}
+    for term in search_terms:
+        for hit in hits_by_term[term]:
+            by_line.setdefault((hit.path, hit.line), (hit, []))[1].append(term)
+    results = []
+    for key in sorted(by_line):
+        hit, terms = by_line[key]
+        for term in terms:
+            pattern = r'(\w*' + re.escape(term) + r'\w*)\.([a-zA-Z_]\w*)'
+            for full_var, method in re.findall(pattern, hit.text, re.IGNORECASE):
+                results.append({
+                    "Chemin du fichier": os.path.relpath(hit.path, hit.root),
+                    "Nom du fichier": os.path.basename(hit.path),
+                    "Terme détecté": term,
+                    "Ligne complète": hit.text.strip(),
+                    "Numéro de ligne": hit.line,
+                    "Méthode appelée": f".{method}"
+                })
+    return results
+
+
+def rows_fichiers_cs(hits_by_term, all_terms):
+    """
+    Un fichier par ligne avec la liste des termes présents (contrôle sensible à la casse, comme `term in content`).
+    """
+    search_terms = list(dict.fromkeys(term for term, _ in all_terms))
+    by_file = {}
+    for term in search_terms:
+        for hit in hits_by_term[term]:
+            if term in hit.text:
+                terms = by_file.setdefault(hit.path, (hit.root, []))[1]
+                if term not in terms:
+                    terms.append(term)
+    return [{
+        "Source": "C#",
+        "Chemin du fichier": os.path.relpath(path, root),
+        "Nom du fichier": os.path.basename(path),
+        "Termes détectés": ", ".join(terms)
+    } for path, (root, terms) in sorted(by_file.items())]
+
+
+layouts = {
+    "lignes": rows_lignes,
+    "methodes": rows_methodes,
+    "fichiers_cs": rows_fichiers_cs,
+}
+
+
+def keep_extensions(hits_by_term, extensions):
+    """
+    Hits des seuls fichiers dont l'extension est retenue par `extensions` (motifs corpus_crawler).
+    """
+    exts = normaliser_extensions(extensions)
+    return {term: [hit for hit in hits if classer_extension(hit.path, exts) is not None]
+            for term, hits in hits_by_term.items()}
+
+
+def main():
+    # 🗂️ Mise à jour de la base puis requêtes, restreintes aux racines configurées des corpus interrogés
+    search_roots = [root for corpus in search_corpora for root in corpora.get(corpus, [])]
+    with CodeSearchIndex(db_path) as index:
+        if update_index:
+            for corpus, (indexed, removed) in index.update({c: r for c, r in corpora.items() if r}).items():
+                print(f"🗂️ {corpus} : {indexed} fichier(s) (ré)indexé(s), {removed} retiré(s)")
+        hits_by_term = index.search_terms(search_terms, search_corpora, search_roots)
+    if export_layout in layout_extensions:
+        hits_by_term = keep_extensions(hits_by_term, layout_extensions[export_layout])
+
+    # 📤 Export
+    if export_layout == "xml_concat":
+        xml_paths = sorted({hit.path for hits in hits_by_term.values() for hit in hits},
+                           key=lambda p: (p.lower(), len(p)))
+        if xml_paths:
+            with open(output_file, "w", encoding="utf-8", newline="\n") as out:
+                out.write(build_concatenation(xml_paths))
+            print(f"\n✅ {len(xml_paths)} fichier(s) XML concaténé(s) dans : {output_file}")
+        else:
+            print("\n❌ Aucun fichier XML ne contient les termes recherchés.")
+    else:
+        results = layouts[export_layout](hits_by_term, all_terms)
+        if results:
+            write_excel_stream(pd.DataFrame(results), output_file)
+            print(f"\n✅ Résultats enregistrés dans : {output_file}")
+        else:
+            print("\n❌ Aucun terme trouvé dans la base.")
+
+
+if __name__ == "__main__":
+    main()
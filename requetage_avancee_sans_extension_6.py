@@ -1,9 +1,15 @@
 import os
 import re
-import fnmatch
 import pandas as pd
 import tqdm
 
+from corpus_crawler import list_files
+from inventaire_fichiers import FileInventory, signature
+from automate_termes import TermAutomaton
+from termes_exacts import ExactTermMatcher, type_usage
+from index_pml import PmlIndex, partial_patterns
+from prefiltre_octets import BytesPrefilter
+
 # --- Configuration ---
 search_directories = [
     r"C:\\Program Files (x86)\\AVEVA\\Everything3D2.10",
@@ -35,6 +41,17 @@ exclude_partial_exceptions = False  # Exclut les cas comme CALLABLE, CALLBACK
 # --- Activation ou non du traitement spécial des .pmlcmd ---
 use_pmlcmd_special_block_processing = False
 
+# --- Cache d'inventaire persistant : seuls les fichiers nouveaux ou modifiés sont relus ---
+use_inventory_cache = True
+inventory_db = os.path.join(os.path.dirname(output_file), "inventaire_requetage_pml.sqlite")
+
+# --- Index inversé persistant des sources PML : les requêtes n'ont plus à relire tout le corpus ---
+use_pml_index = False
+pml_index_db = os.path.join(os.path.dirname(output_file), "index_pml.sqlite")
+
+# --- Préfiltre sur les octets (parcours des fichiers) : un fichier sans aucun terme n'est ni décodé ni découpé ---
+use_bytes_prefilter = True
+
 # --- Listes internes de termes 
 exact_terms = [
     "container",
@@ -49,259 +66,344 @@ if use_txt_term_list and os.path.isfile(txt_term_file):
     with open(txt_term_file, "r", encoding="utf-8", errors="ignore") as f:
         txt_terms = [line.strip() for line in f if line.strip()]
 
-# --- Collecte des fichiers ---
-pml_files = []
-for base_dir in search_directories:
-    for root, _, files in os.walk(base_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            ext = os.path.splitext(file)[1]
-            if ext and any(fnmatch.fnmatch(file.lower(), pattern.lower()) for pattern in file_extensions if pattern):
-                pml_files.append((file_path, base_dir, ext))
-            elif not ext and "" in file_extensions:
-                pml_files.append((file_path, base_dir, ""))
-
-# --- Analyse des fichiers ---
-results = []
+# --- Termes partiels : expressions compilées une fois (terme, puis variantes !!terme / _terme selon les options) ---
+partial_regexes = []
+for term in (partial_terms if use_partial_terms else []):
+    base_pattern, *prefixed_patterns = [p for p, _ in partial_patterns(term, partial_terms_start_only,
+                                                                        use_underscore_prefix_partial)]
+    if use_exclam_prefix_partial and term.startswith("!!"):
+        prefixed_patterns.insert(0, base_pattern)
+    partial_regexes.append((term, re.compile(base_pattern, re.IGNORECASE),
+                            [re.compile(p, re.IGNORECASE) for p in prefixed_patterns]))
+# Blocs .pmlcmd : recherche sur la ligne en minuscules, sans traitement des préfixes
+partial_block_regexes = [(term, re.compile(rf"\b{term.lower()}\w*" if partial_terms_start_only else rf"{term.lower()}\w*"))
+                         for term in (partial_terms if use_partial_terms else [])]
+
+# --- Automate unique (exact_terms + txt_terms + termes partiels littéraux) : une passe par ligne ---
+# Un terme exact absent de la ligne (simple sous-chaîne) ne peut pas y être en mot entier, et toute correspondance
+# d'un terme partiel littéral le contient : les regex ne sont évaluées que pour les termes trouvés par l'automate.
+# Terme partiel non littéral (expression régulière) ou non ASCII : regex toujours évaluée. Ligne non ASCII : idem
+# (IGNORECASE fait correspondre "ı" ou "ſ" à i ou s, que leur minuscule ne contient pas).
+exact_term_count = len(exact_terms)
+txt_term_end = exact_term_count + len(txt_terms)
+partial_cores = []
+partial_term_indices = []  # indice du terme partiel dans l'automate, None = regex toujours évaluée
+for term, _, _ in partial_regexes:
+    core = term.lower()
+    if core.isascii() and re.escape(core) == core:
+        partial_term_indices.append(txt_term_end + len(partial_cores))
+        partial_cores.append(core)
+    else:
+        partial_term_indices.append(None)
+term_automaton = TermAutomaton(exact_terms + txt_terms + partial_cores)
+
+# --- Termes exacts : une seule expression (alternance + groupe nommé du préfixe d'usage) ---
+# Donne en une passe le terme, le terme entier (variantes !!terme / _terme selon les options) et le "Type usage".
+exact_matcher = ExactTermMatcher(exact_terms)
+exact_prefixes = [prefix for prefix, enabled in (("!!", use_exclam_prefix_exact), ("_", use_underscore_prefix_exact))
+                  if enabled]
+
+# --- Colonnes des lignes de résultat (ordre de l'export) ---
+ordered_columns = [
+    "Chemin du fichier",
+    "Nom du fichier",
+    "search_directory",
+    "file_extension",
+    "Terme détecté",
+    "Terme détecté entier",
+    "Type usage",
+    "Type de correspondance",
+    "Ligne complète",
+    "Numéro de ligne"
+]
 
-for file_path, base_dir, ext in tqdm.tqdm(pml_files, desc="Analyse PML", unit="fichier"):
-    try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
 
-        for line_number, line in enumerate(lines, start=1):
-            line_clean = line.strip()
-            if not line_clean or re.match(r"^[ \t]*-", line_clean):
+def partial_type_usage(term, match_word, line_lower):
+    """
+    "Type usage" d'un mot trouvé par un terme partiel ; à défaut, préfixe "!!" / "_" porté par le terme lui-même.
+    """
+    usage = type_usage(match_word.lower(), line_lower)
+    if not usage:
+        for prefix in ("!!", "_"):
+            if term.strip().startswith(prefix) and match_word.strip().startswith(prefix):
+                return prefix
+    return usage
+
+
+# --- Correspondances d'une ligne (exact_terms, partial_terms, txt_terms) ---
+def line_rows(file_path, base_dir, ext, line, line_number):
+    """
+    Lignes de résultat pour une ligne PML retenue (ni vide, ni commentaire), selon les options ci-dessus.
+    """
+    rows = []
+    line_lower = line.lower()
+    term_hits = term_automaton.search(line_lower)
+
+    # --- EXACT TERMS ---
+    # Terme seul puis variantes préfixées, terme par terme dans l'ordre de la liste
+    if use_exact_terms and any(i < exact_term_count for i in term_hits):
+        for index, term_entier, usage in exact_matcher.matches(line_lower, exact_prefixes):
+            rows.append({
+                "Chemin du fichier": file_path,
+                "Nom du fichier": os.path.basename(file_path),
+                "search_directory": base_dir,
+                "file_extension": ext,
+                "Terme détecté": exact_terms[index],
+                "Terme détecté entier": term_entier,
+                "Type usage": usage,
+                "Type de correspondance": "exact_terms",
+                "Ligne complète": line.rstrip('\n\r'),
+                "Numéro de ligne": line_number
+            })
+
+    # --- PARTIAL TERMS ---
+    if partial_regexes:
+        line_ascii = line.isascii()
+        for (term, regex_base, prefixed_regexes), gate in zip(partial_regexes, partial_term_indices):
+            if gate is not None and line_ascii and gate not in term_hits:
                 continue
-
-            line_lower = line.lower()
-
-            # --- EXACT TERMS ---
-            if use_exact_terms:
-                for term in exact_terms:
-                    if re.search(rf"(^|\W){re.escape(term.lower())}($|\W)", line_lower):
-                        results.append({
-                            "Chemin du fichier": file_path,
-                            "Nom du fichier": os.path.basename(file_path),
-                            "search_directory": base_dir,
-                            "file_extension": ext,
-                            "Terme détecté": term,
-                            "Terme détecté entier": term,
-                            "Type de correspondance": "exact_terms",
-                            "Ligne complète": line.rstrip('\n\r'),
-                            "Numéro de ligne": line_number
-                        })
-
-                    prefixes = []
-                    if use_exclam_prefix_exact:
-                        prefixes.append(f"!!{term.lower()}")
-                    if use_underscore_prefix_exact:
-                        prefixes.append(f"_{term.lower()}")
-
-                    for prefixed in prefixes:
-                        if re.search(rf"(^|\W){re.escape(prefixed)}($|\W)", line_lower):
-                            results.append({
-                                "Chemin du fichier": file_path,
-                                "Nom du fichier": os.path.basename(file_path),
-                                "search_directory": base_dir,
-                                "file_extension": ext,
-                                "Terme détecté": term,
-                                "Terme détecté entier": prefixed,
-                                "Type de correspondance": "exact_terms",
-                                "Ligne complète": line.rstrip('\n\r'),
-                                "Numéro de ligne": line_number
-                            })
-
-            # --- PARTIAL TERMS ---
-            if use_partial_terms:
-                for term in partial_terms:
-                    if term.startswith("!!") or term.startswith("_"):
-                        base_pattern = rf"{re.escape(term.lower())}\w*"
-                    else:
-                        base_pattern = rf"\b{term.lower()}\w*" if partial_terms_start_only else rf"{term.lower()}\w*"
-
-                    regex_base = re.compile(base_pattern, re.IGNORECASE)
-                    matches = regex_base.findall(line)
-                    for match_word in matches:
-                        if match_word.upper() not in exclude_words:
-                            results.append({
-                                "Chemin du fichier": file_path,
-                                "Nom du fichier": os.path.basename(file_path),
-                                "search_directory": base_dir,
-                                "file_extension": ext,
-                                "Terme détecté": term,
-                                "Terme détecté entier": match_word,
-                                "Type de correspondance": "partial_terms",
-                                "Ligne complète": line.rstrip('\n\r'),
-                                "Numéro de ligne": line_number
-                            })
-
-                    patterns = []
-                    if use_exclam_prefix_partial and term.startswith("!!"):
-                        patterns.append(rf"{re.escape(term.lower())}\w*")
-                    if use_underscore_prefix_partial:
-                        patterns.append(rf"_{term.lower()}\w*")
-
-                    for pat in patterns:
-                        regex = re.compile(pat, re.IGNORECASE)
-                        matches = regex.findall(line)
-                        for match_word in matches:
-                            if match_word.upper() not in exclude_words:
-                                results.append({
-                                    "Chemin du fichier": file_path,
-                                    "Nom du fichier": os.path.basename(file_path),
-                                    "search_directory": base_dir,
-                                    "file_extension": ext,
-                                    "Terme détecté": term,
-                                    "Terme détecté entier": match_word,
-                                    "Type de correspondance": "partial_terms",
-                                    "Ligne complète": line.rstrip('\n\r'),
-                                    "Numéro de ligne": line_number
-                                })
-
-            # --- TXT TERMS ---
-            for term in txt_terms:
-                if term.lower() in line.lower():
-                    results.append({
+            matches = regex_base.findall(line)
+            for match_word in matches:
+                if match_word.upper() not in exclude_words:
+                    rows.append({
                         "Chemin du fichier": file_path,
                         "Nom du fichier": os.path.basename(file_path),
                         "search_directory": base_dir,
                         "file_extension": ext,
                         "Terme détecté": term,
-                        "Terme détecté entier": term,
-                        "Type de correspondance": "txt_terms",
+                        "Terme détecté entier": match_word,
+                        "Type usage": partial_type_usage(term, match_word, line_lower),
+                        "Type de correspondance": "partial_terms",
                         "Ligne complète": line.rstrip('\n\r'),
                         "Numéro de ligne": line_number
                     })
 
-    except Exception as e:
-        print(f"Erreur lors de l'analyse de {file_path} : {e}")
-
-    # 2/ === Bloc de traitement des fichiers .pmlcmd ===
-    if use_pmlcmd_special_block_processing and ext.lower() == ".pmlcmd":
-        in_method = False
-        current_block = []
-        start_line_num = None
-
-        for line_number, line in enumerate(lines, start=1):
-            stripped = line.strip()
-
-            if stripped.lower().startswith("define method"):
-                in_method = True
-                current_block = [(line_number, line.rstrip('\n\r'))]
-                start_line_num = line_number
-
-            elif stripped.lower().startswith("endmethod") and in_method:
-                current_block.append((line_number, line.rstrip('\n\r')))
-
-                for lineno, content in current_block:
-                    if not content.strip():
-                        continue
-
-                    detected_term = ""
-                    detected_exact = ""
-                    match_type = ""
-
-                    lowered_line = content.lower()
+            for regex in prefixed_regexes:
+                matches = regex.findall(line)
+                for match_word in matches:
+                    if match_word.upper() not in exclude_words:
+                        rows.append({
+                            "Chemin du fichier": file_path,
+                            "Nom du fichier": os.path.basename(file_path),
+                            "search_directory": base_dir,
+                            "file_extension": ext,
+                            "Terme détecté": term,
+                            "Terme détecté entier": match_word,
+                            "Type usage": partial_type_usage(term, match_word, line_lower),
+                            "Type de correspondance": "partial_terms",
+                            "Ligne complète": line.rstrip('\n\r'),
+                            "Numéro de ligne": line_number
+                        })
 
-                    if use_exact_terms:
-                        for term in exact_terms:
-                            if re.search(rf"(^|\W){re.escape(term.lower())}($|\W)", lowered_line):
+    # --- TXT TERMS ---
+    for term in (txt_terms[i - exact_term_count] for i in term_hits if exact_term_count <= i < txt_term_end):
+        rows.append({
+            "Chemin du fichier": file_path,
+            "Nom du fichier": os.path.basename(file_path),
+            "search_directory": base_dir,
+            "file_extension": ext,
+            "Terme détecté": term,
+            "Terme détecté entier": term,
+            "Type usage": type_usage(term.lower(), line_lower),
+            "Type de correspondance": "txt_terms",
+            "Ligne complète": line.rstrip('\n\r'),
+            "Numéro de ligne": line_number
+        })
+    return rows
+
+
+# --- Bloc de traitement des fichiers .pmlcmd (define method ... endmethod) ---
+def pmlcmd_block_rows(file_path, base_dir, ext, lines):
+    """
+    Lignes de résultat des blocs "define method" d'un fichier .pmlcmd (toutes les lignes non vides du bloc).
+    """
+    rows = []
+    in_method = False
+    current_block = []
+
+    for line_number, line in enumerate(lines, start=1):
+        stripped = line.strip()
+
+        if stripped.lower().startswith("define method"):
+            in_method = True
+            current_block = [(line_number, line.rstrip('\n\r'))]
+
+        elif stripped.lower().startswith("endmethod") and in_method:
+            current_block.append((line_number, line.rstrip('\n\r')))
+
+            for lineno, content in current_block:
+                if not content.strip():
+                    continue
+
+                detected_term = ""
+                detected_exact = ""
+                match_type = ""
+
+                lowered_line = content.lower()
+                usage = None
+
+                if use_exact_terms:
+                    # Premier terme exact de la liste présent en mot entier
+                    exact_hits = exact_matcher.matches(lowered_line)
+                    if exact_hits:
+                        index, detected_exact, usage = exact_hits[0]
+                        detected_term = exact_terms[index]
+                        match_type = "exact_terms"
+
+                if not detected_term and use_partial_terms:
+                    for term, regex in partial_block_regexes:
+                        matches = regex.findall(lowered_line)
+                        for m in matches:
+                            if m.upper() not in exclude_words:
                                 detected_term = term
-                                detected_exact = term
-                                match_type = "exact_terms"
+                                detected_exact = m
+                                match_type = "partial_terms"
+                                usage = partial_type_usage(term, m, lowered_line)
                                 break
+                        if detected_term:
+                            break
+
+                rows.append({
+                    "Chemin du fichier": file_path,
+                    "Nom du fichier": os.path.basename(file_path),
+                    "search_directory": base_dir,
+                    "file_extension": ext,
+                    "Terme détecté": detected_term,
+                    "Terme détecté entier": detected_exact,
+                    "Type usage": usage if usage is not None else type_usage("", lowered_line),
+                    "Type de correspondance": match_type,
+                    "Ligne complète": content,
+                    "Numéro de ligne": lineno
+                })
+
+            in_method = False
+            current_block = []
+
+        elif in_method:
+            if stripped:
+                current_block.append((line_number, line.rstrip('\n\r')))
+    return rows
 
-                    if not detected_term and use_partial_terms:
-                        for term in partial_terms:
-                            pattern = rf"\b{term.lower()}\w*" if partial_terms_start_only else rf"{term.lower()}\w*"
-                            matches = re.findall(pattern, lowered_line)
-                            for m in matches:
-                                if m.upper() not in exclude_words:
-                                    detected_term = term
-                                    detected_exact = m
-                                    match_type = "partial_terms"
-                                    break
-                            if detected_term:
-                                break
 
-                    results.append({
-                        "Chemin du fichier": file_path,
-                        "Nom du fichier": os.path.basename(file_path),
-                        "search_directory": base_dir,
-                        "file_extension": ext,
-                        "Terme détecté": detected_term,
-                        "Terme détecté entier": detected_exact,
-                        "Type de correspondance": match_type,
-                        "Ligne complète": content,
-                        "Numéro de ligne": lineno
-                    })
-
-                in_method = False
-                current_block = []
+# --- Analyse des fichiers ---
+results = []
 
-            elif in_method:
-                if stripped:
-                    current_block.append((line_number, line.rstrip('\n\r')))
+if use_pml_index:
+    # Index inversé : seules les lignes pouvant contenir un terme sont relues, avec les mêmes règles
+    with PmlIndex(pml_index_db) as pml_index:
+        scanned, removed = pml_index.update(search_directories, file_extensions)
+        print(f"Index PML : {scanned} fichiers (ré)indexés, {removed} retirés.")
+        index_exact_terms = []
+        if use_exact_terms:
+            index_exact_terms = exact_terms + ([f"_{term}" for term in exact_terms] if use_underscore_prefix_exact else [])
+        candidate_lines = pml_index.candidates(
+            exact=index_exact_terms,
+            partial=partial_terms if use_partial_terms else [],
+            substrings=txt_terms,
+            roots=search_directories,
+            extensions=file_extensions,
+            start_only=partial_terms_start_only,
+            underscore_prefix=use_underscore_prefix_partial,
+            exclude=exclude_words,
+        )
+        pmlcmd_files = pml_index.files(".pmlcmd", search_directories) if use_pmlcmd_special_block_processing else []
+
+    rows_by_file = {}
+    for candidate in tqdm.tqdm(candidate_lines, desc="Requête index PML", unit="ligne"):
+        rows_by_file.setdefault(candidate.path, []).extend(
+            line_rows(candidate.path, candidate.root, candidate.ext, candidate.text, candidate.line))
+    block_rows_by_file = {}
+    for file_path, base_dir, ext in pmlcmd_files:
+        try:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                block_rows_by_file[file_path] = pmlcmd_block_rows(file_path, base_dir, ext, f.readlines())
+        except OSError as e:
+            print(f"Erreur lors de l'analyse de {file_path} : {e}")
+    # Même regroupement que le parcours des fichiers : lignes du fichier, puis blocs .pmlcmd
+    for file_path in sorted(set(rows_by_file) | set(block_rows_by_file)):
+        results.extend(rows_by_file.get(file_path, []))
+        results.extend(block_rows_by_file.get(file_path, []))
 
-# --- Étape finale : Ajout de la colonne "Type usage" et export Excel ---
+else:
+    # --- Collecte des fichiers (crawler parallèle commun, triés par chemin : ordre d'export reproductible) ---
+    pml_files = list_files(search_directories, file_extensions)
+
+    # Les résultats en cache dépendent de toute la configuration de la requête
+    query_signature = signature(
+        exact_terms, partial_terms, txt_terms, exclude_words,
+        use_exact_terms, use_partial_terms,
+        use_exclam_prefix_exact, use_underscore_prefix_exact,
+        use_exclam_prefix_partial, use_underscore_prefix_partial,
+        partial_terms_start_only, use_pmlcmd_special_block_processing,
+        ordered_columns,
+    )
+    inventory = FileInventory(inventory_db) if use_inventory_cache else None
+
+    # Toute correspondance (exacte, préfixée, partielle, txt) contient le terme lui-même : un terme partiel
+    # utilisé comme expression régulière (non littéral) rend le préfiltre impossible
+    prefilter = None
+    if use_bytes_prefilter and all(re.escape(term) == term for term in (partial_terms if use_partial_terms else [])):
+        prefilter = BytesPrefilter((exact_terms if use_exact_terms else [])
+                                   + (partial_terms if use_partial_terms else [])
+                                   + txt_terms)
+
+    for rec in tqdm.tqdm(pml_files, desc="Analyse PML", unit="fichier"):
+        file_path, base_dir, ext = rec.path, rec.root, rec.ext
+
+        # Fichier inchangé depuis le dernier passage : on réutilise ses lignes de résultat
+        if inventory is not None:
+            cached_rows = inventory.lookup(rec, query_signature)
+            if cached_rows is not None:
+                results.extend(cached_rows)
+                continue
+        file_start = len(results)
+        file_ok = True
+
+        # Aucun terme dans le fichier (hors blocs .pmlcmd, retenus en entier) : aucune ligne de résultat
+        block_file = use_pmlcmd_special_block_processing and ext.lower() == ".pmlcmd"
+        if prefilter is not None and not block_file and not prefilter.may_contain(file_path):
+            if inventory is not None:
+                inventory.store(rec, query_signature, [])
+            continue
+
+        try:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                lines = f.readlines()
+
+            for line_number, line in enumerate(lines, start=1):
+                line_clean = line.strip()
+                if not line_clean or re.match(r"^[ \t]*-", line_clean):
+                    continue
+                results.extend(line_rows(file_path, base_dir, ext, line, line_number))
+
+        except Exception as e:
+            print(f"Erreur lors de l'analyse de {file_path} : {e}")
+            file_ok = False
+
+        # 2/ === Bloc de traitement des fichiers .pmlcmd ===
+        if block_file:
+            results.extend(pmlcmd_block_rows(file_path, base_dir, ext, lines))
+
+        if inventory is not None and file_ok:
+            inventory.store(rec, query_signature, results[file_start:])
+
+    if prefilter is not None:
+        print(f"Préfiltre : {prefilter.skipped} fichiers écartés sans décodage, {prefilter.kept} analysés.")
+    if inventory is not None:
+        inventory.prune(rec.path for rec in pml_files)
+        print(f"Cache inventaire : {inventory.hits} fichiers réutilisés, {inventory.misses} relus.")
+        inventory.close()
+
+# --- Étape finale : export Excel ("Type usage" déjà renseigné pendant l'analyse) ---
 if results:
     import pandas as pd
     import re
 
     df = pd.DataFrame(results)
 
-    def detect_type_usage(row):
-        term_entier = str(row["Terme détecté entier"]).lower()
-        line = str(row["Ligne complète"]).lower()
-
-        patterns = {
-            "$*": rf"(?<!\w)\$\*{re.escape(term_entier)}(?!\w)",
-            "$!!": rf"(?<!\w)\$!!{re.escape(term_entier)}(?!\w)",
-            "!!": rf"(?<!\w)!!{re.escape(term_entier)}(?!\w)",
-            "!": rf"(?<!\w)!{re.escape(term_entier)}(?!\w)",
-            "_": rf"(?<!\w)_{re.escape(term_entier)}(?!\w)",
-            ".": rf"(?<!\w)\.{re.escape(term_entier)}(?!\w)",  # ✅ AJOUT CORRECTEMENT PRIS EN COMPTE
-        }
-
-        for prefix, pattern in patterns.items():
-            if re.search(pattern, line):
-                return prefix
-        return ""
-
-    df["Type usage"] = df.apply(detect_type_usage, axis=1)
-
     # Réorganisation des colonnes
-    ordered_columns = [
-        "Chemin du fichier",
-        "Nom du fichier",
-        "search_directory",
-        "file_extension",
-        "Terme détecté",
-        "Terme détecté entier",
-        "Type usage",
-        "Type de correspondance",
-        "Ligne complète",
-        "Numéro de ligne"
-    ]
     df = df[ordered_columns]
 
-    # Correction spécifique pour partial_terms : réécriture explicite du préfixe détecté dans "Terme détecté entier"
-    def correct_type_usage_for_partial(row):
-        if row["Type de correspondance"] != "partial_terms" or row["Type usage"]:
-            return row["Type usage"]  # ne modifie rien si pas partial_terms ou déjà rempli
-
-        term_detecte = row["Terme détecté"].strip()
-        terme_entier = row["Terme détecté entier"].strip()
-
-        if term_detecte.startswith("!!") and terme_entier.startswith("!!"):
-            return "!!"
-        elif term_detecte.startswith("_") and terme_entier.startswith("_"):
-            return "_"
-        return ""  # pas de correction possible
-
-    df["Type usage"] = df.apply(correct_type_usage_for_partial, axis=1)
-
     # Suppression des doublons pour les lignes "exact_terms" avec Type usage vide
     mask_exact_terms = (df["Type de correspondance"] == "exact_terms") & (df["Type usage"] == "")
     
@@ -1,11 +1,12 @@
 import os
 import re
-import subprocess
 import pandas as pd
 from tqdm import tqdm
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 
+from ilspy_pool import plan_output_dirs, build_jobs, decompile_all
+
 # === CONFIGURATION ===
 ilspy_path = r"C:\Users\Nicolas JF Martin\.dotnet\tools\ilspycmd.exe"
 dll_roots = [
@@ -15,6 +16,12 @@ dll_roots = [
 ]
 decompile_root = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\transposition_dll_all_2"
 global_excel_path = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\code_unique_dll_static_ILSpy.xlsx"
+# Décompilations ILSpy simultanées, délai maximal par DLL (base + par Mo), reprises, journal JSONL
+ilspy_workers = 4
+ilspy_timeout = 300
+ilspy_timeout_per_mb = 60
+ilspy_retries = 1
+ilspy_log_path = os.path.join(decompile_root, "log_decompilation.jsonl")
 
 os.makedirs(decompile_root, exist_ok=True)
 
@@ -26,16 +33,23 @@ for root in dll_roots:
             if filename.lower().endswith(".dll"):
                 dll_paths.append(os.path.join(dirpath, filename))
 
+# === DÉCOMPILATION EN PARALLÈLE ===
+# Un dossier distinct par DLL, même si deux DLL portent le même nom
+output_dirs = plan_output_dirs(dll_paths, decompile_root)
+decompile_status = {}
+for result in tqdm(decompile_all(ilspy_path, build_jobs(output_dirs), workers=ilspy_workers,
+                                 timeout=ilspy_timeout, timeout_per_mb=ilspy_timeout_per_mb,
+                                 retries=ilspy_retries, log_path=ilspy_log_path),
+                   total=len(output_dirs), desc="Décompilation ILSpy"):
+    decompile_status[result.dll_path] = result.status
+
 all_rows = []
 for dll_path in tqdm(dll_paths, desc="Analyse des DLL"):
     dll_name = os.path.basename(dll_path)
     dll_short_name = os.path.splitext(dll_name)[0]
-    dll_output_dir = os.path.join(decompile_root, dll_short_name)
-    os.makedirs(dll_output_dir, exist_ok=True)
+    dll_output_dir = output_dirs[dll_path]
 
-    cmd = [ilspy_path, dll_path, "-p", "-o", dll_output_dir]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
+    if decompile_status.get(dll_path) != "ok":
         print(f"❌ Échec décompilation {dll_name}")
         continue
 
@@ -1,10 +1,18 @@
 import os
 import re
-import subprocess
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
+
+from corpus_crawler import list_files
+from depot_contenu import ContentStore
+from metadata_dotnet import read_pmlnet_catalogue, NotDotNetError, PMLNET_ANNOTATION
+from ilspy_pool import plan_output_dirs, build_jobs, decompile_all, ilspy_version, DecompileCache
+from inventaire_fichiers import signature
+from journal_reprise import JobJournal
+from ecrivains_flux import write_excel_stream
+from codes_uniques import CodeDictionary, encode_column
+from lexer_csharp import scan_csharp, find_attributes
 
 # === CONFIGURATION ===
 ilspy_path = r"C:\Users\Nicolas JF Martin\.dotnet\tools\ilspycmd.exe"
@@ -15,30 +23,55 @@ dll_roots = [
 ]
 decompile_root = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\DLL decompilation\transposition_dll_all"
 global_excel_path = r"D:\BUREAU-BUREAU-BUREAU-BUREAU-BUREAU\FORMATION E3D ADMIN\ETUDE AVEVA UIC ETC\code_unique_dll_static_ILSpy.xlsx"
+# Manifeste des DLL par contenu (hash) : une DLL présente sous plusieurs dossiers n'est analysée qu'une fois
+content_store_directory = os.path.join(decompile_root, "_depot_dll")
+# Lecture directe des métadonnées .NET (tables ECMA-335) au lieu de décompiler chaque DLL (beaucoup plus rapide).
+# Le tableau diffère alors de celui d'ILSpy : "Numéro de ligne" vide (pas de source), "Fichier .cs" déduit
+# du type (<Type>.cs), entrées dans l'ordre des métadonnées et non du source. Désactivé par défaut :
+# le tableau global reste celui de la décompilation. ILSpy reste utilisé en repli si les métadonnées sont illisibles.
+use_metadata_reader = False
+# Forcer la décompilation complète (sources .cs dans decompile_root, numéros de ligne)
+decompile_full_source = False
+# Décompilations ILSpy simultanées, délai maximal par DLL (base + par Mo), reprises, journal JSONL
+ilspy_workers = 4
+ilspy_timeout = 300
+ilspy_timeout_per_mb = 60
+ilspy_retries = 1
+ilspy_log_path = os.path.join(decompile_root, "log_decompilation.jsonl")
+# Cache des décompilations (hash du contenu + version d'ilspycmd) : seules les DLL modifiées sont redécompilées
+use_decompile_cache = True
+decompile_cache_db = os.path.join(decompile_root, "cache_decompilation.sqlite")
+# Journal de reprise : chaque DLL terminée y est inscrite avec ses lignes extraites ;
+# une exécution interrompue reprend là où elle s'est arrêtée (False = tout recommencer)
+resume_from_journal = True
+journal_path = os.path.join(decompile_root, "journal_tableau_8.jsonl")
+# Dictionnaire des codes uniques (DLL / NS / CS / CALL) : un code attribué n'est jamais renuméroté
+# d'une exécution à l'autre (False = numérotation dans l'ordre d'apparition, comme pd.factorize)
+use_code_dictionary = True
+code_dictionary_db = os.path.join(decompile_root, "codes_uniques.sqlite")
 
 os.makedirs(decompile_root, exist_ok=True)
 
 # === COLLECTE DES DLL ===
-dll_paths = []
-for root in dll_roots:
-    for dirpath, _, filenames in os.walk(root):
-        for filename in filenames:
-            if filename.lower().endswith(".dll"):
-                dll_paths.append(os.path.join(dirpath, filename))
+dll_records = list_files(dll_roots, ["*.dll"])
+dll_paths = [rec.path for rec in dll_records]
 
-all_rows = []
-for dll_path in tqdm(dll_paths, desc="Analyse des DLL"):
-    dll_name = os.path.basename(dll_path)
-    dll_short_name = os.path.splitext(dll_name)[0]
-    dll_output_dir = os.path.join(decompile_root, dll_short_name)
-    os.makedirs(dll_output_dir, exist_ok=True)
+# === DÉDOUBLONNAGE PAR CONTENU ===
+with ContentStore(content_store_directory) as content_store:
+    for rec in tqdm(dll_records, desc="Empreinte des DLL"):
+        content_store.add(rec, materialize=False)
+    content_store.prune(dll_paths)
+    dll_groups = content_store.groups(dll_paths)  # { hash : [chemins identiques] }
+print(f"{len(dll_paths)} DLL trouvées, {len(dll_groups)} contenus uniques.")
+dll_groups_by_path = {g[0]: g for g in dll_groups.values()}
+dll_hash_by_path = {g[0]: digest for digest, g in dll_groups.items()}
 
-    cmd = [ilspy_path, dll_path, "-p", "-o", dll_output_dir]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"❌ Échec décompilation {dll_name}")
-        continue
 
+def parse_decompiled(dll_output_dir):
+    """
+    Voie ILSpy : lecture des .cs d'un projet décompilé.
+    Retourne (version, [(fichier .cs, namespace, [(annotation, signature, ligne), ...]), ...]).
+    """
     version = ""
     for root_dir, _, files in os.walk(dll_output_dir):
         for file in files:
@@ -54,95 +87,173 @@ for dll_path in tqdm(dll_paths, desc="Analyse des DLL"):
         if version:
             break
 
-    per_dll_rows = []
+    parsed_files = []  # [(fichier .cs, namespace, [(annotation, signature, ligne), ...]), ...]
     for root_dir, _, files in os.walk(dll_output_dir):
         for file in files:
             if file.endswith(".cs"):
-                namespace = ""
-                pmlnet_entries = []
                 try:
                     with open(os.path.join(root_dir, file), "r", encoding="utf-8", errors="ignore") as f:
-                        lines = f.readlines()
-
-                    for line in lines:
-                        if line.strip().startswith("namespace"):
-                            match = re.search(r'namespace\s+([\w\.]+)', line)
-                            if match:
-                                namespace = match.group(1)
-                            break
-
-                    i = 0
-                    while i < len(lines):
-                        line = lines[i]
-                        if '[PMLNetCallable]' in line:
-                            signature_lines = []
-                            original_line_num = i + 1
-                            i += 1
-                            while i < len(lines):
-                                current_line = lines[i].strip()
-                                if current_line == '':
-                                    i += 1
-                                    continue
-                                signature_lines.append(current_line)
-                                if '(' in ''.join(signature_lines) and ')' in ''.join(signature_lines):
-                                    break
-                                elif '(' not in ''.join(signature_lines):
-                                    break
-                                i += 1
-                            signature = ' '.join(signature_lines)
-                            pmlnet_entries.append(('[PMLNetCallable]', signature, original_line_num))
-                        i += 1
+                        members = scan_csharp(f.read())
+
+                    # Une seule lecture et une seule passe : namespace du premier type déclaré,
+                    # [PMLNetCallable] empilés / groupés et signatures multi-lignes résolus par le lexer
+                    namespace = next((m.namespace for m in members if m.namespace), "")
+                    pmlnet_entries = [(PMLNET_ANNOTATION, use.signature, use.line)
+                                      for use in find_attributes(members, "PMLNetCallable")]
 
                     if not pmlnet_entries:
                         pmlnet_entries.append(("", "", ""))
 
-                    for annotation, full_signature, line_number in pmlnet_entries:
-                        concat = f"{dll_short_name}/{namespace}/{file}"
-                        concat2 = f"{concat}/{full_signature}"
-                        row = [
-                            dll_path,
-                            version,
-                            dll_short_name,
-                            annotation,
-                            full_signature,
-                            line_number,
-                            file,
-                            namespace,
-                            concat,
-                            concat2
-                        ]
-                        per_dll_rows.append(row)
-                        all_rows.append(row)
+                    parsed_files.append((file, namespace, pmlnet_entries))
 
                 except:
                     continue
 
+    return version, parsed_files
+
+
+# Version de l'extraction (lecture des métadonnées, lexer C#, format des signatures) : à incrémenter dès que
+# les lignes produites changent, pour que le journal de reprise n'en réutilise pas d'anciennes
+# 2 : signatures des [PMLNetCallable] reconstruites par find_attributes (lexer C#)
+# 3 : ==, !=, <=, >= et => lus comme un seul token (surcharges d'opérateurs, valeurs par défaut)
+EXTRACTOR_VERSION = 3
+
+ROW_COLUMNS = [
+    "Chemin complet DLL", "Version Assembly", "Nom DLL", "[PMLNetCallable]", "PMLNetCallable", "Numéro de ligne",
+    "Fichier .cs", "Namespace", "Concatener", "Concatener 2"]
+
+
+def dll_rows(dll_path, version, parsed_files):
+    """
+    Lignes du tableau pour un contenu de DLL, redistribuées vers toutes ses copies.
+    """
+    rows = []
+    for copy_path in dll_groups_by_path[dll_path]:
+        copy_short_name = os.path.splitext(os.path.basename(copy_path))[0]
+        for file, namespace, pmlnet_entries in parsed_files:
+            for annotation, full_signature, line_number in pmlnet_entries:
+                concat = f"{copy_short_name}/{namespace}/{file}"
+                concat2 = f"{concat}/{full_signature}"
+                rows.append([
+                    copy_path,
+                    version,
+                    copy_short_name,
+                    annotation,
+                    full_signature,
+                    line_number,
+                    file,
+                    namespace,
+                    concat,
+                    concat2
+                ])
+    return rows
+
+
+def complete_dll(dll_path, analysis):
+    """
+    Fin du traitement d'une DLL : Excel par DLL, puis inscription au journal de reprise.
+    """
+    version, parsed_files = analysis
+    analyses[dll_path] = analysis
+    per_dll_rows = dll_rows(dll_path, version, parsed_files)
     if per_dll_rows:
-        per_dll_df = pd.DataFrame(per_dll_rows, columns=[
-            "Chemin complet DLL", "Version Assembly", "Nom DLL", "[PMLNetCallable]", "PMLNetCallable", "Numéro de ligne",
-            "Fichier .cs", "Namespace", "Concatener", "Concatener 2"])
-        dll_excel_path = os.path.join(dll_output_dir, f"{dll_short_name}.xlsx")
-        per_dll_df.to_excel(dll_excel_path, index=False)
+        dll_output_dir = output_dirs[dll_path]
+        os.makedirs(dll_output_dir, exist_ok=True)
+        dll_short_name = os.path.splitext(os.path.basename(dll_path))[0]
+        per_dll_df = pd.DataFrame(per_dll_rows, columns=ROW_COLUMNS)
+        per_dll_df.to_excel(os.path.join(dll_output_dir, f"{dll_short_name}.xlsx"), index=False)
+    journal.record(dll_hash_by_path[dll_path], [version, parsed_files])
+
+
+# === ANALYSE : MÉTADONNÉES, PUIS ILSPY EN PARALLÈLE POUR LE RESTE ===
+# Un représentant par contenu : analysé une seule fois
+representatives = [g[0] for g in sorted(dll_groups.values(), key=lambda g: g[0].lower())]
+output_dirs = plan_output_dirs(representatives, decompile_root)
+analyses = {}  # { chemin DLL : (version, parsed_files) }
+
+# Reprise : les DLL déjà terminées lors d'une exécution interrompue sont relues depuis le journal
+journal = JobJournal(journal_path,
+                     signature("tableau_8", EXTRACTOR_VERSION, use_metadata_reader, decompile_full_source),
+                     resume=resume_from_journal)
+for dll_path in representatives:
+    if dll_hash_by_path[dll_path] in journal:
+        analyses[dll_path] = journal.get(dll_hash_by_path[dll_path])
+if journal.restored:
+    print(f"Reprise : {len(analyses)} DLL déjà traitées relues depuis {journal_path}")
+
+to_decompile = []
+for dll_path in tqdm([p for p in representatives if p not in analyses], desc="Lecture des métadonnées"):
+    dll_name = os.path.basename(dll_path)
+    if use_metadata_reader and not decompile_full_source:
+        try:
+            complete_dll(dll_path, read_pmlnet_catalogue(dll_path))
+            continue
+        except NotDotNetError:
+            print(f"⏭️ DLL native ignorée {dll_name}")
+            continue
+        except Exception as e:
+            print(f"⚠️ Métadonnées illisibles {dll_name} ({e}) : repli sur ILSpy")
+    to_decompile.append(dll_path)
+
+if to_decompile:
+    decompile_cache = DecompileCache(decompile_cache_db, ilspy_version(ilspy_path)) if use_decompile_cache else None
+    try:
+        if decompile_cache is not None:
+            # Sorties déjà présentes pour ce contenu et cette version d'ILSpy : relues sans décompiler
+            pending = []
+            for dll_path in to_decompile:
+                cached_dir = decompile_cache.get(dll_hash_by_path[dll_path])
+                if cached_dir:
+                    complete_dll(dll_path, parse_decompiled(cached_dir))
+                else:
+                    pending.append(dll_path)
+                    # Dossier sur le point d'être remplacé : plus aucune entrée du cache ne doit y renvoyer
+                    decompile_cache.forget(output_dirs[dll_path])
+            print(f"Cache de décompilation : {len(to_decompile) - len(pending)} réutilisées, {len(pending)} à décompiler.")
+            to_decompile = pending
+
+        jobs = build_jobs({p: output_dirs[p] for p in to_decompile})
+        for result in tqdm(decompile_all(ilspy_path, jobs, workers=ilspy_workers, timeout=ilspy_timeout,
+                                         timeout_per_mb=ilspy_timeout_per_mb, retries=ilspy_retries,
+                                         log_path=ilspy_log_path, clean_output=True),
+                           total=len(jobs), desc="Décompilation ILSpy"):
+            if result.status != "ok":
+                print(f"❌ Échec décompilation {os.path.basename(result.dll_path)} ({result.status})")
+                continue
+            if decompile_cache is not None:
+                decompile_cache.put(dll_hash_by_path[result.dll_path], result.output_dir)
+            complete_dll(result.dll_path, parse_decompiled(result.output_dir))
+    finally:
+        if decompile_cache is not None:
+            decompile_cache.close()
+journal.close()
+
+# Tableau global reconstruit depuis les résultats (journal compris), dans l'ordre des DLL
+all_rows = []
+for dll_path in representatives:
+    if dll_path in analyses:
+        version, parsed_files = analyses[dll_path]
+        all_rows.extend(dll_rows(dll_path, version, parsed_files))
 
 # === GLOBAL DATAFRAME ===
-df = pd.DataFrame(all_rows, columns=[
-    "Chemin complet DLL", "Version Assembly", "Nom DLL", "[PMLNetCallable]", "PMLNetCallable", "Numéro de ligne",
-    "Fichier .cs", "Namespace", "Concatener", "Concatener 2"])
+df = pd.DataFrame(all_rows, columns=ROW_COLUMNS)
 
-# CODES UNIQUES
+# CODES UNIQUES (formatés une fois par valeur distincte)
+code_dictionary = CodeDictionary(code_dictionary_db) if use_code_dictionary else None
 for i, (col, prefix, digits) in enumerate([
     ("Nom DLL", "DLL", 5),
     ("Namespace", "NS", 4),
     ("Fichier .cs", "CS", 4),
     ("PMLNetCallable", "CALL", 4)
 ]):
-    code_col = f"Code unique - Niveau {i+1}"
-    df[code_col] = pd.factorize(df[col])[0] + 1
-    df[code_col] = df[code_col].apply(lambda x: f"{prefix}{x:0{digits}d}")
+    df[f"Code unique - Niveau {i+1}"] = encode_column(df[col], prefix, digits, code_dictionary, level=col)
+if code_dictionary is not None:
+    code_dictionary.close()
 
 # IDENTIFIANTS INTÉGRAUX
-df["Code unique intégral"] = df["Code unique - Niveau 1"] + "-" + df["Code unique - Niveau 2"] + "-" + df["Code unique - Niveau 3"]
-df["Code unique intégral 2"] = df["Code unique intégral"] + "-" + df["Code unique - Niveau 4"]
+df["Code unique intégral"] = df["Code unique - Niveau 1"].str.cat(
+    [df["Code unique - Niveau 2"], df["Code unique - Niveau 3"]], sep="-")
+df["Code unique intégral 2"] = df["Code unique intégral"].str.cat(df["Code unique - Niveau 4"], sep="-")
 
 # === ANALYSE C# TYPE ET NOM ===
 CSHARP_FAMILIES = {
@@ -151,70 +262,89 @@ CSHARP_FAMILIES = {
     'float': 'Property', 'bool': 'Property', 'Hashtable': 'Property', 'DbElement': 'Property', 'BasicPoint': 'Property'
 }
 
+# Motifs compilés une seule fois (et non à chaque ligne du tableau)
+ACCESS_PREFIX = r'\b(public|private|internal|protected)(\s+(unsafe|sealed|static|new))*'
+FAMILY_PATTERNS = [(re.compile(rf'{ACCESS_PREFIX}\s+{keyword}\b'), family) for keyword, family in CSHARP_FAMILIES.items()]
+MODIFIER_ONLY_RE = re.compile(r'\b(public|private|internal|protected)\b')
+SEALED_CLASS_RE = re.compile(r'\b(public|private|internal|protected)\s+(unsafe\s+)?sealed\s+class\b')
+METHOD_RE = re.compile(rf'{ACCESS_PREFIX}\s+\w+\s+\w+\s*\(')
+ARROW_PROPERTY_RE = re.compile(rf'{ACCESS_PREFIX}\s+\w+\s+\w+\s*=>')
+PLAIN_PROPERTY_RE = re.compile(rf'{ACCESS_PREFIX}\s+\w+\s+\w+$')
+AVEVA_METHOD_RE = re.compile(r'\b(public|private|internal|protected)(\s+unsafe)?\s+\w+\s*\(')
+
+# Nom de l'élément : premier groupe de la première correspondance
+NAME_PATTERNS = {
+    "Class": re.compile(r'class\s+(\w+)'),
+    "Interface": re.compile(r'interface\s+(\w+)'),
+    "Struct": re.compile(r'struct\s+(\w+)'),
+    "Enum": re.compile(r'enum\s+(\w+)'),
+    "Delegate": re.compile(r'delegate\s+\w+\s+(\w+)'),
+    "Event": re.compile(r'event\s+\S+\s+(\w+)'),
+    "Constructor": re.compile(r'new\s+(\w+)'),
+    "Method": re.compile(r'\b\w+\s+(\w+)\s*\('),
+}
+AVEVA_METHOD_NAME_RE = re.compile(r'\b(public|private|internal|protected)\s+(\w+)\s*\(')
+PROPERTY_NAME_RE = re.compile(r'\b\w+\s+(\w+)')
+
 def detect_family(line):
     line = line.strip()
 
     # Étape 0 : ligne vide ou seulement modificateur
-    if re.fullmatch(r'\b(public|private|internal|protected)\b', line):
+    if MODIFIER_ONLY_RE.fullmatch(line):
         return "INCOMPLETE"
 
-    # Étape 1 : détection standard avec types connus
-    for keyword, family in CSHARP_FAMILIES.items():
-        if re.search(rf'\b(public|private|internal|protected)(\s+(unsafe|sealed|static|new))*\s+{keyword}\b', line):
+    # Étape 1 : détection standard avec types connus (dans l'ordre de CSHARP_FAMILIES)
+    for pattern, family in FAMILY_PATTERNS:
+        if pattern.search(line):
             return family
 
     # Étape 2 : classe scellée ou unsafe
-    if re.search(r'\b(public|private|internal|protected)\s+(unsafe\s+)?sealed\s+class\b', line):
+    if SEALED_CLASS_RE.search(line):
         return "Class"
 
     # Étape 3 : méthode avec parenthèses classiques
-    if re.search(r'\b(public|private|internal|protected)(\s+(unsafe|sealed|static|new))*\s+\w+\s+\w+\s*\(', line):
+    if METHOD_RE.search(line):
         return "Method"
 
     # Étape 4 : propriété avec `=>` (expression-bodied)
-    if re.search(r'\b(public|private|internal|protected)(\s+(unsafe|sealed|static|new))*\s+\w+\s+\w+\s*=>', line):
+    if ARROW_PROPERTY_RE.search(line):
         return "Property"
 
     # Étape 5 : propriété simple sans corps
-    if re.search(r'\b(public|private|internal|protected)(\s+(unsafe|sealed|static|new))*\s+\w+\s+\w+$', line):
+    if PLAIN_PROPERTY_RE.search(line):
         return "Property"
 
     # Étape 6 : fallback AVEVA (nom seul suivi de parenthèse)
-    if re.search(r'\b(public|private|internal|protected)(\s+unsafe)?\s+\w+\s*\(', line):
+    if AVEVA_METHOD_RE.search(line):
         return "Method AVEVA"
 
     return "UNKNOWN"
 
 def extract_name(line, family):
-    try:
-        if family == "Class":
-            return re.findall(r'class\s+(\w+)', line)[0]
-        elif family == "Interface":
-            return re.findall(r'interface\s+(\w+)', line)[0]
-        elif family == "Struct":
-            return re.findall(r'struct\s+(\w+)', line)[0]
-        elif family == "Enum":
-            return re.findall(r'enum\s+(\w+)', line)[0]
-        elif family == "Delegate":
-            return re.findall(r'delegate\s+\w+\s+(\w+)', line)[0]
-        elif family == "Event":
-            return re.findall(r'event\s+\S+\s+(\w+)', line)[0]
-        elif family == "Constructor":
-            return re.findall(r'new\s+(\w+)', line)[0]
-        elif family == "Method":
-            return re.findall(r'\b\w+\s+(\w+)\s*\(', line)[0]
-        elif family == "Method AVEVA":
-            return re.findall(r'\b(public|private|internal|protected)\s+(\w+)\s*\(', line)[0][1]
-        elif family == "Property":
-            match = re.findall(r'\b\w+\s+(\w+)', line)
-            return match[-1] if match else ""
-    except:
-        return ""
+    if family in NAME_PATTERNS:
+        match = NAME_PATTERNS[family].search(line)
+        return match.group(1) if match else ""
+    elif family == "Method AVEVA":
+        match = AVEVA_METHOD_NAME_RE.search(line)
+        return match.group(2) if match else ""
+    elif family == "Property":
+        match = PROPERTY_NAME_RE.findall(line)
+        return match[-1] if match else ""
     return ""
 
+def classify_signatures(signatures):
+    """
+    (Famille C#, Nom élément) pour une colonne de signatures : chaque signature distincte n'est classée qu'une fois,
+    puis le résultat est redistribué à toutes les lignes par les codes de pd.factorize.
+    """
+    codes, uniques = pd.factorize(signatures.fillna(""))
+    families = [detect_family(line) for line in uniques]
+    names = [extract_name(line, family) for line, family in zip(uniques, families)]
+    return (np.asarray(families, dtype=object)[codes],
+            np.asarray(names, dtype=object)[codes])
+
 # Application sur la colonne contenant les définitions C#
-df["Famille C#"] = df["PMLNetCallable"].fillna("").apply(detect_family)
-df["Nom élément"] = df.apply(lambda row: extract_name(row["PMLNetCallable"], row["Famille C#"]), axis=1)
+df["Famille C#"], df["Nom élément"] = classify_signatures(df["PMLNetCallable"])
 
 # RÉORGANISATION ET EXPORT
 final_cols = [
@@ -224,15 +354,9 @@ final_cols = [
     "Code unique intégral", "Code unique intégral 2"
 ]
 df = df[final_cols]
-df.to_excel(global_excel_path, index=False)
-
-# AUTO FORMAT
-wb = load_workbook(global_excel_path)
-ws = wb.active
-ws.auto_filter.ref = ws.dimensions
-for col in ws.columns:
-    max_len = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-    col_letter = get_column_letter(col[0].column)
-    ws.column_dimensions[col_letter].width = max_len + 2
-wb.save(global_excel_path)
-print(f"\n✅ Fichier global enrichi généré avec succès : {global_excel_path}")
\ No newline at end of file
+# Écriture en flux avec largeurs de colonnes et filtre automatique (sans relire le classeur)
+write_excel_stream(df, global_excel_path)
+print(f"\n✅ Fichier global enrichi généré avec succès : {global_excel_path}")
+
+# Lot complet : le journal de reprise n'a plus d'utilité (une prochaine exécution relit les DLL à jour)
+journal.discard()
\ No newline at end of file
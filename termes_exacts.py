@@ -0,0 +1,110 @@
+import re
+
+# =========================
+# Termes exacts PML (mot entier) et préfixe d'usage ($*, $!!, !!, !, _, .) en une seule expression régulière
+# =========================
+# Tous les termes sont compilés dans une alternance unique, précédée d'un groupe nommé "sigil" (préfixe d'usage)
+# et d'un groupe "prefix" (variantes !!terme / _terme). Une seule passe par ligne donne, pour chaque terme,
+# ses correspondances en mot entier, ses variantes préfixées et la colonne "Type usage".
+# Sémantique identique à re.search(rf"(^|\W){terme}($|\W)", ligne) et aux six recherches de préfixe d'usage.
+
+# Préfixes d'usage par ordre de priorité : le premier présent sur la ligne donne le "Type usage"
+USAGE_SIGILS = ["$*", "$!!", "!!", "!", "_", "."]
+USAGE_PRIORITY = {sigil: rank for rank, sigil in enumerate(USAGE_SIGILS)}
+SIGIL_PATTERN = "|".join(re.escape(sigil) for sigil in USAGE_SIGILS)
+
+WORD_CHAR_RE = re.compile(r"\w")
+SIGIL_START_RE = re.compile(r"[$*!_.]")
+
+
+def _bounded(context, prefix):
+    """
+    Vrai si `prefix` termine le contexte gauche d'une occurrence et est précédé d'un non-mot (ou du début de ligne).
+    Le contexte est le plus long préfixe valide trouvé devant l'occurrence : son début est déjà une frontière de mot.
+    """
+    if not context.endswith(prefix):
+        return False
+    return len(prefix) == len(context) or not WORD_CHAR_RE.match(context[-len(prefix) - 1])
+
+
+def type_usage(word, line_lower):
+    """
+    Préfixe d'usage d'un mot sur une ligne (tous deux en minuscules) : premier de USAGE_SIGILS trouvé juste devant
+    le mot entier, "" sinon. Une recherche au lieu de six ; la lecture anticipée ne consomme pas le mot.
+    """
+    pattern = re.compile(rf"(?<!\w)(?P<sigil>{SIGIL_PATTERN})(?={re.escape(word)}(?!\w))")
+    ranks = [USAGE_PRIORITY[m.group("sigil")] for m in pattern.finditer(line_lower)]
+    return USAGE_SIGILS[min(ranks)] if ranks else ""
+
+
+class ExactTermMatcher:
+    """
+    Termes en mot entier, insensibles à la casse. Les doublons sont conservés : chaque position de la liste
+    d'origine est rapportée (mêmes lignes de résultat qu'une boucle sur la liste).
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.indices = {}  # mot en minuscules -> positions dans la liste
+        for index, term in enumerate(self.terms):
+            self.indices.setdefault(term.lower(), []).append(index)
+        # Alternance du plus long au plus court : à une position donnée, le plus long terme en mot entier l'emporte,
+        # les termes plus courts commençant au même endroit sont vérifiés ensuite
+        words = sorted(self.indices, key=len, reverse=True)
+        self.shorter = {word: [other for other in words if len(other) < len(word) and word.startswith(other)]
+                        for word in words}
+        # Un terme commençant par un caractère de préfixe ($ * ! _ .), ex. !!CD ou _CD, pourrait être découpé en
+        # préfixe + reste du terme : chacun a sa propre expression, les autres partagent l'alternance
+        plain = [word for word in words if not word or not SIGIL_START_RE.match(word)]
+        self.regexes = [self._compile(plain)] if plain else []
+        self.regexes += [self._compile([word]) for word in words if word and SIGIL_START_RE.match(word)]
+
+    @staticmethod
+    def _compile(words):
+        # Le mot est dans une lecture anticipée : seuls les préfixes sont consommés, les occurrences qui se
+        # chevauchent restent toutes visibles
+        alternation = "|".join(re.escape(word) for word in words)
+        return re.compile(rf"(?<!\w)(?P<sigil>{SIGIL_PATTERN})?(?P<prefix>!!|_)?(?=(?P<word>{alternation})(?!\w))")
+
+    def __len__(self):
+        return len(self.terms)
+
+    def contexts(self, line_lower):
+        """
+        { mot : contextes gauches } des termes présents sur une ligne en minuscules. Le contexte d'une occurrence
+        est le préfixe (sigil + !!/_) qui la précède immédiatement, "" s'il n'y en a pas.
+        """
+        found = {}
+        for regex in self.regexes:
+            for m in regex.finditer(line_lower):
+                context = (m.group("sigil") or "") + (m.group("prefix") or "")
+                start, word = m.start("word"), m.group("word")
+                for other in [word] + self.shorter[word]:
+                    if other is word or not WORD_CHAR_RE.match(line_lower, start + len(other)):
+                        found.setdefault(other, set()).add(context)
+        return found
+
+    @staticmethod
+    def usage(contexts, prefix=""):
+        """
+        "Type usage" du mot `prefix` + terme : premier préfixe d'usage présent devant l'une de ses occurrences.
+        """
+        for sigil in USAGE_SIGILS:
+            if any(_bounded(context, sigil + prefix) for context in contexts):
+                return sigil
+        return ""
+
+    def matches(self, line_lower, prefixes=()):
+        """
+        Correspondances d'une ligne en minuscules, dans l'ordre de la liste : (indice, terme entier, type usage).
+        Pour chaque terme : le terme seul, puis ses variantes `prefixes` ("!!", "_") présentes en mot entier.
+        """
+        found = self.contexts(line_lower)
+        rows = []
+        for index in sorted(i for word in found for i in self.indices[word]):
+            term = self.terms[index]
+            contexts = found[term.lower()]
+            for prefix in ("",) + tuple(prefixes):
+                if any(_bounded(context, prefix) for context in contexts):
+                    rows.append((index, prefix + term.lower() if prefix else term, self.usage(contexts, prefix)))
+        return rows
@@ -0,0 +1,47 @@
+using System;
+using System.Collections.Generic;
+using Aveva.Core.PMLNet;
+
+namespace Aveva.Demo
+{
+	[PMLNetCallable]
+	public class Grid : IDisposable
+	{
+		[PMLNetCallable]
+		public class Cell
+		{
+			[PMLNetCallable]
+			public void Clear()
+			{
+			}
+		}
+
+		[PMLNetCallable]
+		public double Width { get; set; }
+
+		[PMLNetCallable]
+		public event EventHandler Changed;
+
+		[PMLNetCallable]
+		public Grid()
+		{
+		}
+
+		[PMLNetCallable]
+		public static string Describe(int index, out bool found, params string[] extra)
+		{
+			found = index > 0;
+			return "";
+		}
+
+		[PMLNetCallable]
+		public virtual List<string> Names(Dictionary<string, int> map, ref long[] counts)
+		{
+			return null;
+		}
+
+		public void Dispose()
+		{
+		}
+	}
+}
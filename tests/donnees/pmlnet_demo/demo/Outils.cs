@@ -0,0 +1,10 @@
+namespace Aveva.Demo.Outils
+{
+	public static class Outils
+	{
+		public static int Somme(int a, int b)
+		{
+			return a + b;
+		}
+	}
+}
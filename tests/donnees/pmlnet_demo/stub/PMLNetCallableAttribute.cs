@@ -0,0 +1,9 @@
+using System;
+
+namespace Aveva.Core.PMLNet
+{
+	[AttributeUsage(AttributeTargets.All)]
+	public sealed class PMLNetCallableAttribute : Attribute
+	{
+	}
+}
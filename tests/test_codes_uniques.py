@@ -0,0 +1,41 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from codes_uniques import CodeDictionary, encode_column  # noqa: E402
+
+
+def test_assign(tmp_path):
+    with CodeDictionary(str(tmp_path / "codes.sqlite")) as dictionary:
+        assert dictionary.assign("DLL", ["Aveva.Core", "Aveva.Pml", "Aveva.Core"]) == [1, 2, 1]
+        # Niveaux indépendants
+        assert dictionary.assign("Namespace", ["Aveva.Core"]) == [1]
+        assert dictionary.assign("DLL", ["Aveva.Draw", "Aveva.Pml"]) == [3, 2]
+
+
+def test_codes_stables_entre_executions(tmp_path):
+    db_path = str(tmp_path / "codes.sqlite")
+    first = pd.Series(["Aveva.Pml", "Aveva.Core", None, "Aveva.Pml"])
+    with CodeDictionary(db_path) as dictionary:
+        assert encode_column(first, "DLL", 5, dictionary).tolist() == [
+            "DLL00001", "DLL00002", "DLL00000", "DLL00001"]
+    # Nouvelle exécution : nouvelle DLL en tête, ordre différent -> les codes existants ne bougent pas
+    second = pd.Series(["Aveva.Draw", "Aveva.Core", "Aveva.Pml"], index=[10, 11, 12])
+    with CodeDictionary(db_path) as dictionary:
+        codes = encode_column(second, "DLL", 5, dictionary)
+    assert codes.tolist() == ["DLL00003", "DLL00002", "DLL00001"]
+    assert codes.index.tolist() == [10, 11, 12]
+
+
+def test_niveau_par_defaut_et_explicite(tmp_path):
+    with CodeDictionary(str(tmp_path / "codes.sqlite")) as dictionary:
+        encode_column(pd.Series(["a", "b"]), "NS", 4, dictionary)
+        assert encode_column(pd.Series(["b"]), "NS", 4, dictionary).tolist() == ["NS0002"]
+        # Même préfixe, autre niveau : numérotation séparée
+        assert encode_column(pd.Series(["b"]), "NS", 4, dictionary, level="Namespace").tolist() == ["NS0001"]
+
+
+def test_sans_dictionnaire():
+    codes = encode_column(pd.Series(["x", None, "y", "x"]), "F", 3)
+    assert codes.tolist() == ["F001", "F000", "F002", "F001"]
+    assert encode_column(pd.Series([], dtype=object), "F", 3).tolist() == []
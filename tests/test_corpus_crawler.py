@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from corpus_crawler import (crawl, list_files, plan_roots, records_under, canonical_path, is_under,
+                            normaliser_extensions, classer_extension)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    # racine/
+    #   a.pmlfrm, b.PMLOBJ, sans_extension, notes.txt
+    #   sous/c.pmlfrm
+    #   sous/profond/d.pmlfrm
+    root = tmp_path / "racine"
+    (root / "sous" / "profond").mkdir(parents=True)
+    for name in ("a.pmlfrm", "b.PMLOBJ", "sans_extension", "notes.txt", os.path.join("sous", "c.pmlfrm"),
+                 os.path.join("sous", "profond", "d.pmlfrm")):
+        (root / name).write_text(name, encoding="utf-8")
+    return root
+
+
+def names(records):
+    return sorted(os.path.relpath(r.path, r.root) for r in records)
+
+
+def test_normaliser_extensions():
+    assert normaliser_extensions(["*.PMLFRM", ".cs", "dll", "", "*"]) == {".pmlfrm", ".cs", ".dll", "", "*"}
+    assert normaliser_extensions("*.xml") == {".xml"}
+    assert normaliser_extensions(None) is None
+
+
+def test_classer_extension():
+    exts = normaliser_extensions(["*.pmlobj", ""])
+    assert classer_extension("b.PMLOBJ", exts) == ".PMLOBJ"
+    assert classer_extension("sans_extension", exts) == ""
+    assert classer_extension("notes.txt", exts) is None
+    assert classer_extension("notes.txt", {"*"}) == ".txt"
+    assert classer_extension("sans_extension", {"*"}) is None
+
+
+def test_crawl_extensions(tree):
+    records = list_files(str(tree), ["*.pmlfrm", "*.pmlobj", ""])
+    assert names(records) == sorted(["a.pmlfrm", "b.PMLOBJ", "sans_extension", os.path.join("sous", "c.pmlfrm"),
+                                     os.path.join("sous", "profond", "d.pmlfrm")])
+    assert [r.path for r in records] == sorted(r.path for r in records)
+    rec = next(r for r in records if r.path.endswith("b.PMLOBJ"))
+    assert (rec.root, rec.ext, rec.size) == (str(tree), ".PMLOBJ", len("b.PMLOBJ"))
+
+
+def test_plan_roots_imbriquees_et_doublons(tree):
+    sous = str(tree / "sous")
+    plans = plan_roots([sous, str(tree), str(tree) + os.sep, os.path.join(str(tree), "sous", "..", "sous")])
+    assert [p.parent for p in plans] == [str(tree), None, str(tree), str(tree)]
+    assert plans[0].key == canonical_path(sous)
+    assert is_under(plans[0].key, plans[1].key)
+    assert not is_under(canonical_path(str(tree) + "2"), plans[1].key)
+
+
+def test_crawl_racines_imbriquees_lues_une_fois(tree):
+    records = list(crawl([str(tree / "sous"), str(tree), str(tree)], ["*.pmlfrm"], workers=4))
+    # Chaque fichier une seule fois, rattaché à la racine englobante
+    assert len(records) == len({r.path for r in records}) == 3
+    assert {r.root for r in records} == {str(tree)}
+    plan = plan_roots([str(tree), str(tree / "sous")])[1]
+    assert names(records_under(records, plan)) == [os.path.join("sous", "c.pmlfrm"),
+                                                   os.path.join("sous", "profond", "d.pmlfrm")]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="liens symboliques indisponibles")
+def test_boucle_de_liens(tree):
+    try:
+        os.symlink(str(tree), str(tree / "sous" / "boucle"), target_is_directory=True)
+        os.symlink(str(tree / "sous" / "profond"), str(tree / "raccourci"), target_is_directory=True)
+    except OSError:
+        pytest.skip("création de liens symboliques refusée")
+    # Liens suivis : la boucle est détectée, chaque répertoire physique lu une fois
+    followed = list_files(str(tree), ["*.pmlfrm"], follow_links=True)
+    assert len(followed) == 3
+    assert len({os.path.realpath(r.path) for r in followed}) == 3
+    # Liens non suivis (par défaut) : seuls les répertoires réels
+    assert names(list_files(str(tree), ["*.pmlfrm"])) == sorted(
+        ["a.pmlfrm", os.path.join("sous", "c.pmlfrm"), os.path.join("sous", "profond", "d.pmlfrm")])
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="liens symboliques indisponibles")
+def test_racine_atteinte_par_lien(tree, tmp_path):
+    link = tmp_path / "lien"
+    try:
+        os.symlink(str(tree), str(link), target_is_directory=True)
+    except OSError:
+        pytest.skip("création de liens symboliques refusée")
+    plans = plan_roots([str(tree), str(link)])
+    assert plans[1].parent == str(tree)
+    assert len(list_files([str(tree), str(link)], ["*.pmlfrm"])) == 3
+
+
+def test_visited_partage(tree):
+    visited = set()
+    first = list(crawl(str(tree), ["*.pmlfrm"], visited=visited))
+    assert len(first) == 3
+    # Deuxième appel avec les mêmes répertoires déjà lus : rien à relire
+    assert list(crawl(str(tree / "sous"), ["*.pmlfrm"], visited=visited)) == []
+
+
+def test_racine_absente(tmp_path):
+    assert list_files(str(tmp_path / "absent")) == []
+
+
+def test_arret_anticipe(tree):
+    gen = crawl(str(tree), None, workers=2)
+    assert next(gen) is not None
+    gen.close()
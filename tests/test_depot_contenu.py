@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from corpus_crawler import list_files
+from depot_contenu import ContentStore
+from inventaire_fichiers import hash_fichier
+
+
+@pytest.fixture
+def sources(tmp_path):
+    # Deux copies de la même DLL (casse d'extension différente), une DLL distincte
+    root = tmp_path / "sources"
+    (root / "E3D" / "bin").mkdir(parents=True)
+    (root / "E3D" / "plugins").mkdir()
+    (root / "E3D" / "bin" / "Aveva.Core.dll").write_bytes(b"MZ core")
+    (root / "E3D" / "plugins" / "Aveva.Core.DLL").write_bytes(b"MZ core")
+    (root / "E3D" / "bin" / "Aveva.Pml.dll").write_bytes(b"MZ pml")
+    return root
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ContentStore(str(tmp_path / "depot")) as content_store:
+        yield content_store
+
+
+def test_add_et_blobs(store, sources):
+    records = list_files(str(sources), ["*.dll"])
+    digests = [store.add(rec) for rec in records]
+    assert digests == [hash_fichier(rec.path) for rec in records]
+    # Une seule copie par contenu, extension en minuscules
+    blobs = sorted(os.path.relpath(os.path.join(d, f), store.blob_root)
+                   for d, _, files in os.walk(store.blob_root) for f in files)
+    assert blobs == sorted(os.path.relpath(store.blob_path(d, ".dll"), store.blob_root) for d in set(digests))
+    with open(store.blob_path(digests[0], ".dll"), "rb") as f:
+        assert f.read() == b"MZ core"
+
+
+def test_add_sans_materialisation(store, sources):
+    rec = list_files(str(sources), ["*.dll"])[0]
+    digest = store.add(rec, materialize=False)
+    assert digest == hash_fichier(rec.path)
+    assert not os.path.exists(store.blob_path(digest, ".dll"))
+
+
+def test_add_fichier_illisible(store, sources):
+    rec = list_files(str(sources), ["*.dll"])[0]
+    os.remove(rec.path)
+    assert store.add(rec) is None
+    assert store.groups() == {}
+
+
+def test_liens_physiques(tmp_path, sources):
+    with ContentStore(str(tmp_path / "depot"), use_hardlinks=True) as content_store:
+        rec = list_files(str(sources), ["*.dll"])[0]
+        blob = content_store.blob_path(content_store.add(rec), rec.ext)
+        assert os.path.exists(blob)
+        if hasattr(os, "link"):
+            assert os.path.samefile(blob, rec.path)
+
+
+def test_groups(store, sources):
+    records = list_files(str(sources), ["*.dll"])
+    for rec in records:
+        store.add(rec)
+    core = hash_fichier(str(sources / "E3D" / "bin" / "Aveva.Core.dll"))
+    groups = store.groups()
+    assert len(groups) == 2
+    assert groups[core] == [str(sources / "E3D" / "bin" / "Aveva.Core.dll"),
+                            str(sources / "E3D" / "plugins" / "Aveva.Core.DLL")]
+    assert store.duplication_ratio() == 1.5
+    only = [str(sources / "E3D" / "bin" / "Aveva.Core.dll")]
+    assert store.groups(only) == {core: only}
+    assert store.duplication_ratio([]) == 1.0
+
+
+def test_prune(store, sources):
+    records = list_files(str(sources), ["*.dll"])
+    for rec in records:
+        store.add(rec)
+    kept = [rec.path for rec in records if "plugins" not in rec.path]
+    assert store.prune(kept) == 1
+    assert sorted(p for paths in store.groups().values() for p in paths) == sorted(kept)
+    assert store.duplication_ratio() == 1.0
+
+
+def test_persistance(tmp_path, sources):
+    records = list_files(str(sources), ["*.dll"])
+    with ContentStore(str(tmp_path / "depot")) as content_store:
+        for rec in records:
+            content_store.add(rec)
+        first = content_store.groups()
+    with ContentStore(str(tmp_path / "depot")) as content_store:
+        assert content_store.groups() == first
+        # Fichier inchangé (taille + mtime) : hash repris de l'inventaire, blob déjà présent
+        assert content_store.add(records[0]) == hash_fichier(records[0].path)
@@ -0,0 +1,69 @@
+import csv
+import json
+
+import pytest
+
+from ecrivains_flux import JsonlWriter, JsonArrayWriter, CsvStreamWriter, RowSink
+
+ROWS = [
+    {"Fichier_Source": "Grid.cs", "Methode": "Describe", "Paramètres": "int index, out bool found",
+     "PMLNetCallable": "[PMLNetCallable]"},
+    {"Fichier_Source": "Élément.cs", "Methode": "", "Propriete": "public double Width",
+     "Valeurs": [1, 2.5, None, True], "Imbriqué": {"clé": "\"guillemets\"\n\ttab"}},
+    {},
+]
+
+
+@pytest.mark.parametrize("rows", [ROWS, ROWS[:1], [{}], [[]]])
+def test_json_array_identique_a_json_dump(tmp_path, rows):
+    expected_path = tmp_path / "attendu.json"
+    with open(expected_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=4, ensure_ascii=False)
+    path = tmp_path / "flux.json"
+    with JsonArrayWriter(str(path), flush_every=1) as writer:
+        for row in rows:
+            writer.write(row)
+    assert path.read_bytes() == expected_path.read_bytes()
+
+
+def test_aucun_fichier_sans_ligne(tmp_path):
+    for writer in (JsonlWriter(str(tmp_path / "a.jsonl")), JsonArrayWriter(str(tmp_path / "a.json")),
+                   CsvStreamWriter(str(tmp_path / "a.csv"))):
+        writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_jsonl(tmp_path):
+    path = tmp_path / "sortie" / "flux.jsonl"
+    with JsonlWriter(str(path)) as writer:
+        for row in ROWS:
+            writer.write(row)
+    assert [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()] == ROWS
+
+
+def test_csv_entete_de_la_premiere_ligne(tmp_path):
+    # En-tête historique : clés de la première ligne ; clé inconnue ignorée, clé absente -> vide
+    path = tmp_path / "flux.csv"
+    with CsvStreamWriter(str(path)) as writer:
+        writer.write({"Classe": "Grid", "Propriete": "public double Width"})
+        writer.write({"Classe": "Grid", "Methode": "Describe", "Paramètres": "int index"})
+    with open(path, encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [["Classe", "Propriete"], ["Grid", "public double Width"], ["Grid", ""]]
+
+
+def test_csv_colonnes_fixes(tmp_path):
+    path = tmp_path / "flux.csv"
+    with CsvStreamWriter(str(path), ["Classe", "Methode", "Paramètres"]) as writer:
+        writer.write({"Classe": "Grid", "Propriete": "public double Width"})
+        writer.write({"Classe": "Grid", "Methode": "Describe", "Paramètres": "int index"})
+    with open(path, encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [["Classe", "Methode", "Paramètres"], ["Grid", "", ""],
+                                       ["Grid", "Describe", "int index"]]
+
+
+def test_row_sink(tmp_path):
+    with RowSink(JsonArrayWriter(str(tmp_path / "a.json")), None, CsvStreamWriter(str(tmp_path / "a.csv"))) as sink:
+        for row in ROWS[:2]:
+            sink.write(row)
+    assert sink.count == 2
+    assert json.loads((tmp_path / "a.json").read_text(encoding="utf-8")) == ROWS[:2]
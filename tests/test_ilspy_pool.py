@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+
+import pytest
+
+from ilspy_pool import plan_output_dirs, build_jobs, decompile_all, summarize
+
+# ilspycmd remplacé par un script Python dont le comportement dépend du nom de la DLL :
+#   ok*       -> écrit un .cs dans le dossier de sortie, code retour 0
+#   lent*     -> dépasse le délai
+#   instable* -> échoue à la première tentative, réussit à la suivante (fichier témoin)
+#   casse*    -> échoue toujours
+STUB_SOURCE = """\
+import os
+import sys
+import time
+
+dll_path, output_dir = sys.argv[1], sys.argv[4]
+name = os.path.basename(dll_path)
+if name.startswith("lent"):
+    time.sleep(30)
+if name.startswith("casse"):
+    sys.stderr.write("assembly illisible")
+    sys.exit(2)
+if name.startswith("instable"):
+    marker = dll_path + ".essai"
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        sys.stderr.write("premier essai")
+        sys.exit(1)
+with open(os.path.join(output_dir, "Program.cs"), "w") as f:
+    f.write("namespace Stub { public class Program { } }")
+"""
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="script de substitution lancé via shebang")
+
+
+@pytest.fixture
+def stub_ilspy(tmp_path):
+    path = tmp_path / "ilspycmd"
+    path.write_text(f"#!{sys.executable}\n{STUB_SOURCE}", encoding="utf-8")
+    path.chmod(0o755)
+    return str(path)
+
+
+def make_dlls(directory, names):
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name in names:
+        path = directory / name
+        path.write_bytes(b"MZ")
+        paths.append(str(path))
+    return paths
+
+
+def run(stub_ilspy, tmp_path, names, **kwargs):
+    dll_paths = make_dlls(tmp_path / "dll", names)
+    jobs = build_jobs(plan_output_dirs(dll_paths, str(tmp_path / "out")))
+    results = list(decompile_all(stub_ilspy, jobs, workers=2, timeout=1, timeout_per_mb=0, **kwargs))
+    return {os.path.basename(r.dll_path): r for r in results}
+
+
+def test_ok(stub_ilspy, tmp_path):
+    results = run(stub_ilspy, tmp_path, ["ok_a.dll", "ok_b.dll"], retries=0)
+    assert summarize(results.values()) == {"ok": 2}
+    for result in results.values():
+        assert result.attempts == 1
+        assert os.listdir(result.output_dir) == ["Program.cs"]
+
+
+def test_timeout(stub_ilspy, tmp_path):
+    results = run(stub_ilspy, tmp_path, ["lent.dll", "ok.dll"], retries=1)
+    assert results["lent.dll"].status == "timeout"
+    assert results["lent.dll"].returncode is None
+    assert results["lent.dll"].attempts == 2
+    assert results["ok.dll"].status == "ok"
+
+
+def test_retry(stub_ilspy, tmp_path):
+    results = run(stub_ilspy, tmp_path, ["instable.dll", "casse.dll"], retries=1)
+    assert results["instable.dll"].status == "ok"
+    assert results["instable.dll"].attempts == 2
+    assert results["casse.dll"].status == "echec"
+    assert results["casse.dll"].returncode == 2
+    assert results["casse.dll"].attempts == 2
+    assert results["casse.dll"].message == "assembly illisible"
+
+
+def test_sans_reprise(stub_ilspy, tmp_path):
+    results = run(stub_ilspy, tmp_path, ["instable.dll"], retries=0)
+    assert results["instable.dll"].status == "echec"
+    assert results["instable.dll"].attempts == 1
+
+
+def test_journal(stub_ilspy, tmp_path):
+    log_path = tmp_path / "log.jsonl"
+    run(stub_ilspy, tmp_path, ["ok.dll", "casse.dll"], retries=0, log_path=str(log_path))
+    entries = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted((e["dll"], e["status"]) for e in entries) == [("casse.dll", "echec"), ("ok.dll", "ok")]
+
+
+def test_clean_output(stub_ilspy, tmp_path):
+    dll_paths = make_dlls(tmp_path / "dll", ["ok.dll", "casse.dll"])
+    output_dirs = plan_output_dirs(dll_paths, str(tmp_path / "out"))
+    for output_dir in output_dirs.values():
+        os.makedirs(output_dir)
+        open(os.path.join(output_dir, "Ancien.cs"), "w").close()
+    results = {os.path.basename(r.dll_path): r for r in decompile_all(
+        stub_ilspy, build_jobs(output_dirs), timeout=1, timeout_per_mb=0, retries=0, clean_output=True)}
+    # Succès : sortie remplacée ; échec : sortie précédente intacte, aucun dossier temporaire restant
+    assert os.listdir(results["ok.dll"].output_dir) == ["Program.cs"]
+    assert os.listdir(results["casse.dll"].output_dir) == ["Ancien.cs"]
+    assert sorted(os.listdir(tmp_path / "out")) == ["casse", "ok"]
+
+
+def test_executable_absent(tmp_path):
+    dll_paths = make_dlls(tmp_path / "dll", ["ok.dll"])
+    jobs = build_jobs(plan_output_dirs(dll_paths, str(tmp_path / "out")))
+    results = list(decompile_all(str(tmp_path / "absent"), jobs, timeout=1, timeout_per_mb=0))
+    assert results[0].status == "erreur"
+    assert results[0].attempts == 1
+
+
+def test_plan_output_dirs_homonymes():
+    root = "sortie"
+    dll_paths = [os.path.join("b", "Aveva.Core.dll"), os.path.join("a", "Aveva.Core.dll"),
+                 os.path.join("c", "aveva.core.DLL"), os.path.join("a", "Autre.dll")]
+    planned = plan_output_dirs(dll_paths, root)
+    assert planned[os.path.join("a", "Aveva.Core.dll")] == os.path.join(root, "Aveva.Core")
+    assert planned[os.path.join("a", "Autre.dll")] == os.path.join(root, "Autre")
+    # Homonymes (casse comprise) : dossiers distincts, suffixés par un hash court et stables d'un appel à l'autre
+    dirs = list(planned.values())
+    assert len({d.lower() for d in dirs}) == len(dirs)
+    for path in (os.path.join("b", "Aveva.Core.dll"), os.path.join("c", "aveva.core.DLL")):
+        assert os.path.basename(planned[path]).lower().startswith("aveva.core~")
+    assert plan_output_dirs(reversed(dll_paths), root) == planned
+
+
+def test_build_jobs_plus_gros_en_premier(tmp_path):
+    small, big = make_dlls(tmp_path, ["petit.dll", "gros.dll"])
+    with open(big, "wb") as f:
+        f.write(b"\0" * 4096)
+    jobs = build_jobs({small: "s", big: "g", str(tmp_path / "absent.dll"): "x"})
+    assert [os.path.basename(j.dll_path) for j in jobs] == ["gros.dll", "petit.dll", "absent.dll"]
+    assert jobs[-1].size == 0
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+
+import pytest
+
+from index_fts import CodeSearchIndex, Hit, INDEX_VERSION, read_lines
+
+PML_SOURCE = """\
+-- Élément de formulaire
+!!ÉLÉMENT.show()
+!a = object CONTAINER()
+!b = !a.container.add(1)
+
+!c = 'élément'
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    pml = tmp_path / "pml"
+    (pml / "sous").mkdir(parents=True)
+    (pml / "a.pmlfrm").write_text(PML_SOURCE, encoding="utf-8")
+    (pml / "sous" / "b").write_text("!x = ab\r\n!y = AB\r\n", encoding="utf-8")
+    (pml / "ignore.txt").write_text("container\n", encoding="utf-8")
+    cs = tmp_path / "cs"
+    cs.mkdir()
+    (cs / "C.cs").write_text("public class Container { }\n", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def index(tmp_path, corpus):
+    with CodeSearchIndex(str(tmp_path / "fts.sqlite")) as fts:
+        fts.update({"pml": [str(corpus / "pml")], "cs": [str(corpus / "cs")]})
+        yield fts
+
+
+def lines_of(hits):
+    return [(os.path.basename(hit.path), hit.line) for hit in hits]
+
+
+def test_read_lines(tmp_path):
+    path = tmp_path / "f"
+    path.write_bytes(b"a\r\nb\rc\n\nd")
+    assert read_lines(str(path), "pml") == ["a", "b", "c", "", "d"]
+
+
+def test_recherche_insensible_a_la_casse(index):
+    assert lines_of(index.search("container")) == [("C.cs", 1), ("a.pmlfrm", 3), ("a.pmlfrm", 4)]
+    assert lines_of(index.search("Container", corpora=["pml"])) == [("a.pmlfrm", 3), ("a.pmlfrm", 4)]
+
+
+@pytest.mark.parametrize("term", ["élément", "ÉLÉMENT", "Élément", "lém", "é", "É"])
+def test_termes_non_ascii(index, term):
+    # Même règle que `term.lower() in line.lower()` : "É" et "é" se correspondent, terme court compris
+    assert lines_of(index.search(term, corpora=["pml"])) == [("a.pmlfrm", 1), ("a.pmlfrm", 2), ("a.pmlfrm", 6)]
+
+
+def test_termes_courts(index):
+    assert lines_of(index.search("ab")) == [("b", 1), ("b", 2)]
+    assert lines_of(index.search("%")) == []
+    assert lines_of(index.search("_")) == []
+
+
+def test_hits(index, corpus):
+    hit = index.search("ab")[0]
+    assert hit == Hit(str(corpus / "pml" / "sous" / "b"), str(corpus / "pml"), "", "pml", 1, "!x = ab")
+
+
+def test_restriction_racines(index, corpus):
+    assert index.search("container", roots=[str(corpus / "cs")]) == index.search("container", corpora=["cs"])
+    assert index.search("container", roots=["ailleurs"]) == []
+
+
+def test_mise_a_jour_incrementale(index, corpus):
+    assert index.update({"pml": [str(corpus / "pml")]}) == {"pml": (0, 0)}
+    path = corpus / "pml" / "a.pmlfrm"
+    path.write_text("!d = container\n", encoding="utf-8")
+    os.utime(path, (1, 1))
+    (corpus / "pml" / "sous" / "b").unlink()
+    assert index.update({"pml": [str(corpus / "pml")]}) == {"pml": (1, 1)}
+    assert [(hit.line, hit.text) for hit in index.search("container", corpora=["pml"])] == [(1, "!d = container")]
+    assert index.search("ab") == []
+
+
+def test_base_ancienne_version_reconstruite(tmp_path):
+    db_path = str(tmp_path / "fts.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE VIRTUAL TABLE lines USING fts5(text, tokenize = "trigram")')
+    conn.commit()
+    conn.close()
+    with CodeSearchIndex(db_path) as fts:
+        columns = [row[1] for row in fts.conn.execute("PRAGMA table_info(lines)")]
+        assert columns == ["text", "text_lower"]
+        assert fts.conn.execute("PRAGMA user_version").fetchone()[0] == INDEX_VERSION
+
+
+# --- Logique du script recherche_index_fts_1.py (mises en forme de l'export) ---
+
+def hit(path, line, text, root="racine", ext=".pmlfrm"):
+    return Hit(path, root, ext, "pml", line, text)
+
+
+@pytest.fixture
+def script():
+    pytest.importorskip("pandas")
+    import recherche_index_fts_1
+    return recherche_index_fts_1
+
+
+def test_rows_lignes(script):
+    hits_by_term = {
+        "container": [hit("b.pmlfrm", 2, "!a = container"), hit("a.pmlfrm", 5, "-- container"),
+                      hit("a.pmlfrm", 3, "!c.container.show()")],
+        "show": [hit("a.pmlfrm", 3, "!c.container.show()")],
+    }
+    rows = script.rows_lignes(hits_by_term, [("container", "exact_terms"), ("show", "txt_terms")])
+    assert [(r["Nom du fichier"], r["Numéro de ligne"], r["Terme détecté"], r["Type de correspondance"])
+            for r in rows] == [("a.pmlfrm", 3, "container", "exact_terms"), ("a.pmlfrm", 3, "show", "txt_terms"),
+                               ("b.pmlfrm", 2, "container", "exact_terms")]
+
+
+def test_rows_methodes(script):
+    hits_by_term = {"cont": [hit(os.path.join("racine", "a.pmlfrm"), 1, " !!Container.show() !myCONT.add(1)")]}
+    rows = script.rows_methodes(hits_by_term, [("cont", "exact_terms"), ("cont", "txt_terms")])
+    assert [(r["Chemin du fichier"], r["Méthode appelée"], r["Ligne complète"]) for r in rows] == [
+        ("a.pmlfrm", ".show", "!!Container.show() !myCONT.add(1)"), ("a.pmlfrm", ".add", "!!Container.show() !myCONT.add(1)")]
+
+
+def test_rows_fichiers_cs(script):
+    hits_by_term = {
+        "Container": [hit(os.path.join("racine", "C.cs"), 1, "class Container"),
+                      hit(os.path.join("racine", "D.cs"), 4, "container")],
+        "Grid": [hit(os.path.join("racine", "C.cs"), 2, "Grid g;")],
+    }
+    rows = script.rows_fichiers_cs(hits_by_term, [("Container", "exact_terms"), ("Grid", "exact_terms")])
+    assert rows == [{"Source": "C#", "Chemin du fichier": "C.cs", "Nom du fichier": "C.cs",
+                     "Termes détectés": "Container, Grid"}]
+
+
+def test_keep_extensions(script):
+    hits_by_term = {"x": [hit("a.pmlfrm", 1, "x"), hit("b.mac", 1, "x", ext=".mac"), hit("c", 1, "x", ext="")]}
+    kept = script.keep_extensions(hits_by_term, script.layout_extensions["lignes"])
+    assert [h.path for h in kept["x"]] == ["a.pmlfrm", "c"]
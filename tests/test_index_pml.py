@@ -0,0 +1,89 @@
+import re
+import sqlite3
+
+import pytest
+
+from index_pml import PmlIndex, INDEX_VERSION, partial_patterns, tokenize_line
+
+SOURCE = """\
+-- commentaire : !!callback
+!!callback.show()
+y = callable + CALLBACK
+z = $!!CALLABLE
+w = x_callable _callback __callable
+v = calLBACKs !!calls !!!callout
+u = _!!callback
+t = cal + 1
+
+s = !container.add(.container)
+r = caſt _caſting İtem ıtems
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    root = tmp_path / "pml"
+    root.mkdir()
+    (root / "a.pmlfrm").write_text(SOURCE, encoding="utf-8")
+    (root / "b.txt").write_text("callable\n", encoding="utf-8")
+    with PmlIndex(str(tmp_path / "index.sqlite")) as pml_index:
+        pml_index.update([str(root)], ["*.pmlfrm"])
+        yield pml_index, str(root)
+
+
+def expected_lines(terms, start_only, underscore_prefix, exclude):
+    # Règles du script de recherche : motifs de partial_patterns, mots exclus comparés en majuscules
+    lines = set()
+    for number, line in enumerate(SOURCE.splitlines(), start=1):
+        if not line.strip() or line.strip().startswith("-"):
+            continue
+        for term in terms:
+            for pattern, _ in partial_patterns(term, start_only, underscore_prefix):
+                if any(m.upper() not in exclude for m in re.findall(pattern, line, re.IGNORECASE)):
+                    lines.add(number)
+    return lines
+
+
+def test_tokenize_line():
+    assert list(tokenize_line("$!!a.b !!!c _d $*e")) == [("a", "$!!"), ("b", "."), ("c", "!!"), ("_d", "_"),
+                                                         ("e", "$*")]
+
+
+@pytest.mark.parametrize("start_only", [False, True])
+@pytest.mark.parametrize("underscore_prefix", [False, True])
+@pytest.mark.parametrize("exclude", [(), ("CALLABLE", "CALLBACK")])
+@pytest.mark.parametrize("terms", [["call"], ["!!CALL"], ["_call"], ["cal+"], ["!!"], ["_!!c"], ["lback"], ["cast"], ["item"]])
+def test_candidates_partiels_exacts(index, terms, start_only, underscore_prefix, exclude):
+    pml_index, root = index
+    found = pml_index.candidates(partial=terms, roots=[root], start_only=start_only,
+                                 underscore_prefix=underscore_prefix, exclude=exclude)
+    expected = expected_lines(terms, start_only, underscore_prefix, exclude)
+    # Exactes, sauf la ligne à mots non ASCII (casse de re.IGNORECASE), toujours candidate
+    assert expected <= {c.line for c in found} <= expected | {11}
+
+
+def test_candidates_exacts_et_sous_chaines(index):
+    pml_index, root = index
+    assert [c.line for c in pml_index.candidates(exact=["container"], roots=[root])] == [10]
+    assert [c.line for c in pml_index.candidates(exact=["+"], roots=[root])] == [3, 8]
+    assert [c.line for c in pml_index.candidates(substrings=["("], roots=[root])] == [2, 10]
+    assert [c.line for c in pml_index.candidates(exact=["CALLBACK"], roots=[root])] == [2, 3, 7]
+
+
+def test_restriction_racines_extensions(index):
+    pml_index, root = index
+    assert pml_index.candidates(exact=["callable"], roots=["ailleurs"]) == []
+    assert [c.ext for c in pml_index.candidates(exact=["callable"], roots=[root], extensions=["*.pmlfrm"])] == [
+        ".pmlfrm", ".pmlfrm"]
+
+
+def test_base_ancienne_version_reconstruite(tmp_path):
+    db_path = str(tmp_path / "index.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE postings (token TEXT, file_id INTEGER, line INTEGER, col INTEGER, sigil TEXT)")
+    conn.commit()
+    conn.close()
+    with PmlIndex(db_path) as pml_index:
+        columns = [row[1] for row in pml_index.conn.execute("PRAGMA table_info(postings)")]
+        assert columns == ["token", "file_id", "line", "sigil"]
+        assert pml_index.conn.execute("PRAGMA user_version").fetchone()[0] == INDEX_VERSION
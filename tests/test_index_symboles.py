@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from index_symboles import SymbolIndex
+
+GRID_SOURCE = """\
+namespace Aveva.Demo
+{
+    [PMLNetCallable]
+    public class Grid
+    {
+        [PMLNetCallable]
+        public void Clear() { }
+        public void Clear(int row) { }
+        public double Width { get; set; }
+
+        public class Cell
+        {
+            public string Text;
+        }
+    }
+}
+"""
+
+OUTILS_SOURCE = """\
+namespace Aveva.Outils
+{
+    internal static class Grid
+    {
+        public static int Somme(int a, int b) => a + b;
+    }
+}
+"""
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "decompilation"
+    (root / "Aveva.Demo" / "Aveva.Demo").mkdir(parents=True)
+    (root / "Aveva.Demo" / "Aveva.Demo" / "Grid.cs").write_text(GRID_SOURCE, encoding="utf-8")
+    (root / "Aveva.Outils~1a2b3c4d").mkdir()
+    (root / "Aveva.Outils~1a2b3c4d" / "Grid.cs").write_text(OUTILS_SOURCE, encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def index(tmp_path, tree):
+    with SymbolIndex(str(tmp_path / "symboles.sqlite")) as symbol_index:
+        assert symbol_index.update(str(tree)) == (2, 0)
+        yield symbol_index
+
+
+def test_lookup(index, tree):
+    symbols = index.lookup("aveva.demo.GRID.clear")
+    assert [(s.fqn, s.kind, s.line, s.pmlnet) for s in symbols] == [
+        ("Aveva.Demo.Grid.Clear", "method", 6, True), ("Aveva.Demo.Grid.Clear", "method", 8, False)]
+    assert symbols[0].dll == "Aveva.Demo"
+    assert symbols[0].path == str(tree / "Aveva.Demo" / "Aveva.Demo" / "Grid.cs")
+    assert [(s.kind, s.type_name) for s in index.lookup("Aveva.Demo.Grid.Cell.Text")] == [("field", "Grid.Cell")]
+    assert index.lookup("Aveva.Demo.Absent") == []
+
+
+def test_find(index):
+    assert sorted((s.fqn, s.dll) for s in index.find("grid")) == [
+        ("Aveva.Demo.Grid", "Aveva.Demo"), ("Aveva.Outils.Grid", "Aveva.Outils")]
+    assert [s.access for s in index.find("Grid", dll="aveva.outils")] == ["internal"]
+    assert [s.kind for s in index.find("Width", kind=("property", "field"))] == ["property"]
+    assert index.find("Width", kind="method") == []
+
+
+def test_in_file_et_location(index, tree):
+    path = str(tree / "Aveva.Outils~1a2b3c4d" / "Grid.cs")
+    assert [s.name for s in index.in_file(path)] == ["Grid", "Somme"]
+    assert index.file_location(path) == ("Aveva.Outils", "Aveva.Outils")
+    assert index.file_location(str(tree / "absent.cs")) is None
+
+
+def test_pmlnet_callables(index):
+    assert [s.fqn for s in index.pmlnet_callables()] == ["Aveva.Demo.Grid", "Aveva.Demo.Grid.Clear"]
+
+
+def test_mise_a_jour_incrementale(index, tree):
+    assert index.update(str(tree)) == (0, 0)
+    path = tree / "Aveva.Demo" / "Aveva.Demo" / "Grid.cs"
+    path.write_text(GRID_SOURCE.replace("Width", "Height"), encoding="utf-8")
+    os.utime(path, (1, 1))
+    (tree / "Aveva.Outils~1a2b3c4d" / "Grid.cs").unlink()
+    assert index.update(str(tree)) == (1, 1)
+    assert index.find("Width") == []
+    assert [s.fqn for s in index.find("Height")] == ["Aveva.Demo.Grid.Height"]
+    assert [s.fqn for s in index.find("Grid")] == ["Aveva.Demo.Grid"]
+
+
+def test_base_persistante(tmp_path, tree):
+    db_path = str(tmp_path / "symboles.sqlite")
+    with SymbolIndex(db_path) as symbol_index:
+        symbol_index.update(str(tree))
+    with SymbolIndex(db_path) as symbol_index:
+        assert [s.line for s in symbol_index.lookup("Aveva.Outils.Grid.Somme")] == [5]
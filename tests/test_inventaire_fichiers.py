@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from corpus_crawler import stat_record
+from inventaire_fichiers import FileInventory, signature, hash_fichier
+
+STAGE = signature(["container"], True)
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    with FileInventory(str(tmp_path / "cache" / "inventaire.sqlite")) as inv:
+        yield inv
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return stat_record(str(path))
+
+
+def test_signature():
+    assert signature(["a", "b"], True) == signature(["a", "b"], True)
+    assert signature(["a", "b"], True) != signature(["b", "a"], True)
+    assert signature({"x": 1, "y": 2}) == signature({"y": 2, "x": 1})
+
+
+def test_lookup_store(inventory, tmp_path):
+    rec = write(tmp_path / "a.pmlfrm", "!a = container\n", 1000)
+    assert inventory.lookup(rec, STAGE) is None
+    inventory.store(rec, STAGE, [{"Ligne": 1, "Terme": "container"}])
+    assert inventory.lookup(rec, STAGE) == [{"Ligne": 1, "Terme": "container"}]
+    assert inventory.lookup(rec, signature(["autre"], True)) is None
+    assert (inventory.hits, inventory.misses) == (1, 2)
+
+
+def test_mtime_modifie_contenu_identique(inventory, tmp_path):
+    # Date changée (copie, checkout...) mais même contenu : le hash confirme, le résultat reste valide
+    path = tmp_path / "a.pmlfrm"
+    inventory.store(write(path, "!a = container\n", 1000), STAGE, [])
+    rec = write(path, "!a = container\n", 2000)
+    assert inventory.lookup(rec, STAGE) == []
+
+
+@pytest.mark.parametrize("new_text, new_mtime", [
+    ("!a = CONTAINER\n", 2000),          # même taille, date différente
+    ("!a = container()\n", 1000),        # même date, taille différente
+    ("!b = other\n", 3000),
+])
+def test_fichier_modifie_invalide(inventory, tmp_path, new_text, new_mtime):
+    path = tmp_path / "a.pmlfrm"
+    inventory.store(write(path, "!a = container\n", 1000), STAGE, [{"Ligne": 1}])
+    rec = write(path, new_text, new_mtime)
+    assert inventory.lookup(rec, STAGE) is None
+    # Le hash stocké suit le nouveau contenu
+    assert inventory.current_hash(rec) == hash_fichier(str(path))
+
+
+def test_taille_et_date_inchangees_font_foi(inventory, tmp_path):
+    # Contenu réécrit à taille et date identiques : pas de relecture, le résultat en cache est réutilisé
+    path = tmp_path / "a.pmlfrm"
+    inventory.store(write(path, "!a = container\n", 1000), STAGE, [{"Ligne": 1}])
+    rec = write(path, "!a = CONTAINER\n", 1000)
+    assert inventory.lookup(rec, STAGE) == [{"Ligne": 1}]
+
+
+def test_fichier_illisible(inventory, tmp_path):
+    rec = write(tmp_path / "a.pmlfrm", "x", 1000)
+    os.remove(rec.path)
+    assert inventory.lookup(rec, STAGE) is None
+    inventory.store(rec, STAGE, ["ignoré"])
+    assert inventory.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+
+
+def test_prune(inventory, tmp_path):
+    kept = write(tmp_path / "a.pmlfrm", "a", 1000)
+    gone = write(tmp_path / "b.pmlfrm", "b", 1000)
+    for rec in (kept, gone):
+        inventory.store(rec, STAGE, [rec.path])
+    assert inventory.prune([kept.path]) == 1
+    assert inventory.lookup(kept, STAGE) == [kept.path]
+    assert inventory.conn.execute("SELECT path FROM results").fetchall() == [(kept.path,)]
+
+
+def test_persistance_et_threads(tmp_path):
+    db_path = str(tmp_path / "inventaire.sqlite")
+    records = [write(tmp_path / f"f{i}.pmlfrm", f"ligne {i}\n", 1000 + i) for i in range(40)]
+    with FileInventory(db_path) as inv:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda rec: inv.store(rec, STAGE, [rec.path]), records))
+    with FileInventory(db_path) as inv:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            found = list(pool.map(lambda rec: inv.lookup(rec, STAGE), records))
+        assert found == [[rec.path] for rec in records]
+        assert (inv.hits, inv.misses) == (40, 0)
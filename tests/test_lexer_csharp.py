@@ -0,0 +1,50 @@
+from lexer_csharp import scan_csharp, find_attributes
+
+OPERATORS_SOURCE = """
+namespace Aveva.Test
+{
+    public class Point : IEquatable<Point>
+    {
+        public static bool operator ==(Point a, Point b) => Equals(a, b);
+        public static bool operator !=(Point a, Point b) { return !Equals(a, b); }
+        public static bool operator <=(Point a, Point b) => true;
+        public static bool operator >=(Point a, Point b) => true;
+        public static bool operator <(Point a, Point b) => false;
+        public static Point operator +(Point a, Point b) => a;
+        public static implicit operator double(Point p) => 0.0;
+        public double X => 1.0;
+        public double Y { get; set; } = 2.0;
+        public double Z = 3.0;
+        [PMLNetCallable]
+        public bool Near(Point other, bool strict = x >= 2) => true;
+    }
+}
+"""
+
+
+def test_operator_overloads():
+    members = {m.name: m for m in scan_csharp(OPERATORS_SOURCE)}
+    for symbol in ("==", "!=", "<=", ">=", "<", "+"):
+        member = members[f"operator {symbol}"]
+        assert member.kind == "method"
+        assert member.params.endswith("Point b")
+    assert members["operator =="].type == "bool"
+    assert members["operator =="].signature == "public static bool operator == (Point a, Point b)"
+    assert members["implicit operator double"].type == "double"
+    # Aucun opérateur pris pour un champ nommé "operator"
+    assert "operator" not in members
+
+
+def test_initializers_and_arrows():
+    members = {m.name: m for m in scan_csharp(OPERATORS_SOURCE)}
+    assert members["X"].kind == "property"
+    assert members["Y"].kind == "property"
+    assert members["Z"].kind == "field"
+    assert members["Z"].signature == "public double Z"
+
+
+def test_pmlnet_callable_default_comparison():
+    uses = find_attributes(scan_csharp(OPERATORS_SOURCE), "PMLNetCallable")
+    assert [(u.attribute, u.signature, u.type_name) for u in uses] == [
+        ("[PMLNetCallable]", "public bool Near(Point other, bool strict = x >= 2)", "Point")]
+    assert uses[0].line == 16
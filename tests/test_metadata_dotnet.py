@@ -0,0 +1,123 @@
+import os
+import struct
+
+import pytest
+
+from pe_lecteur import open_image
+from lexer_csharp import scan_csharp, find_attributes
+from metadata_dotnet import (MetadataReader, AssemblyModel, MetadataError, NotDotNetError, read_pmlnet_catalogue,
+                             _stream_headers, _decompress_int, PMLNET_ANNOTATION,
+                             TYPEDEF, METHODDEF, PROPERTY, EVENT, CUSTOMATTRIBUTE, PARAM)
+
+# Assembly de test : tests/donnees/pmlnet_demo/PmlNetDemo.dll, compilé (dotnet build -c Release, net8.0) depuis
+# demo/*.cs ; l'attribut [PMLNetCallable] vient d'un assembly séparé (stub/), référencé comme dans AVEVA
+DEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "donnees", "pmlnet_demo")
+DEMO_DLL = os.path.join(DEMO_DIR, "PmlNetDemo.dll")
+DEMO_SOURCES = os.path.join(DEMO_DIR, "demo")
+
+
+@pytest.fixture(scope="module")
+def model():
+    with open(DEMO_DLL, "rb") as f:
+        data = f.read()
+    return AssemblyModel(MetadataReader(data))
+
+
+def test_stream_headers(model):
+    assert set(model.md.streams) == {"#~", "#Strings", "#US", "#GUID", "#Blob"}
+
+
+def test_stream_headers_racine_non_alignee(model):
+    # Même racine de métadonnées décalée de 2 octets : les noms de flux restent lus correctement
+    md = model.md
+    size = max(offset + length for offset, length in md.streams.values()) - md.root
+    shifted = b"\0\0" + bytes(md.data[md.root:md.root + size])
+    streams = _stream_headers(shifted, 2)
+    assert {name: (offset - 2, length) for name, (offset, length) in streams.items()} == {
+        name: (offset - md.root, length) for name, (offset, length) in md.streams.items()}
+
+
+def test_signature_absente():
+    with pytest.raises(MetadataError):
+        _stream_headers(b"\0" * 64, 0)
+
+
+def test_typedef(model):
+    md = model.md
+    names = [(md.string(row[2]), md.string(row[1])) for row in md.rows(TYPEDEF)]
+    assert names == [("", "<Module>"), ("Aveva.Demo", "Grid"), ("Aveva.Demo.Outils", "Outils"), ("", "Cell")]
+    assert model.type_signature(2) == "public class Grid : IDisposable"
+    assert model.type_signature(3) == "public static class Outils"
+    assert model.enclosing == {4: 2}
+
+
+def test_methoddef(model):
+    md = model.md
+    names = [md.string(row[3]) for row in md.rows(METHODDEF)]
+    assert names[:8] == ["get_Width", "set_Width", "add_Changed", "remove_Changed", ".ctor", "Describe", "Names",
+                         "Dispose"]
+    signatures = {md.string(md.row(METHODDEF, rid)[3]): model.method_signature(rid)
+                  for rid in model.methods_of[2]}
+    assert signatures["Describe"] == "public static string Describe(int index, out bool found, params string[] extra)"
+    assert signatures["Names"] == "public virtual List<string> Names(Dictionary<string, int> map, ref long[] counts)"
+    assert signatures[".ctor"] == "public Grid()"
+    assert signatures["Dispose"] == "public void Dispose()"
+
+
+def test_property_event(model):
+    md = model.md
+    assert [md.string(row[1]) for row in md.rows(PROPERTY)] == ["Width"]
+    assert [md.string(row[1]) for row in md.rows(EVENT)] == ["Changed"]
+    assert model.property_signature(model.properties_of[2][0], 2) == "public double Width"
+    assert model.event_signature(model.events_of[2][0]) == "public event EventHandler Changed"
+
+
+def test_custom_attributes(model):
+    pmlnet = sorted(key for key, names in model.attributes.items() if "PMLNetCallableAttribute" in names)
+    # Grid, Cell ; .ctor, Describe, Names, Clear ; Width ; Changed
+    assert pmlnet == sorted([(TYPEDEF, 2), (TYPEDEF, 4), (METHODDEF, 5), (METHODDEF, 6), (METHODDEF, 7),
+                             (METHODDEF, 10), (PROPERTY, 1), (EVENT, 1)])
+    assert "ParamArrayAttribute" in model.attributes[(PARAM, 6)]
+    assert len(model.md.rows(CUSTOMATTRIBUTE)) == sum(len(names) for names in model.attributes.values())
+
+
+def test_catalogue_identique_aux_sources():
+    """
+    Lignes de la voie "métadonnées" comparées à celles de la voie ILSpy (lexer sur les .cs) :
+    mêmes fichiers, namespaces et signatures ; ni numéro de ligne, ni ordre du source côté métadonnées.
+    """
+    version, parsed = read_pmlnet_catalogue(DEMO_DLL)
+    assert version == "2.1.0.7"
+    assert parsed[-1] == ("AssemblyInfo.cs", "", [("", "", "")])
+    from_metadata = {file: (namespace, sorted(entries)) for file, namespace, entries in parsed[:-1]}
+
+    from_sources = {}
+    for file in sorted(os.listdir(DEMO_SOURCES)):
+        if not file.endswith(".cs"):
+            continue
+        with open(os.path.join(DEMO_SOURCES, file), encoding="utf-8") as f:
+            members = scan_csharp(f.read())
+        namespace = next((m.namespace for m in members if m.namespace), "")
+        entries = [(PMLNET_ANNOTATION, use.signature, "") for use in find_attributes(members, "PMLNetCallable")]
+        from_sources[file] = (namespace, sorted(entries or [("", "", "")]))
+    assert from_metadata == from_sources
+
+
+def test_dll_native(tmp_path):
+    with open_image(DEMO_DLL) as data:
+        image = bytearray(data)
+    # Répertoire CLR (entrée 14 du répertoire de données) effacé : image PE sans métadonnées
+    pe = struct.unpack_from("<I", image, 0x3C)[0]
+    magic = struct.unpack_from("<H", image, pe + 24)[0]
+    directories = pe + 24 + (96 if magic == 0x10B else 112)
+    struct.pack_into("<II", image, directories + 14 * 8, 0, 0)
+    native = tmp_path / "native.dll"
+    native.write_bytes(bytes(image))
+    with pytest.raises(NotDotNetError):
+        read_pmlnet_catalogue(str(native))
+
+
+@pytest.mark.parametrize("encoded, value", [(b"\x06", 3), (b"\x7B", -3), (b"\x80\x80", 64), (b"\x01", -64),
+                                            (b"\xC0\x00\x40\x00", 8192), (b"\x7F", -1)])
+def test_decompress_int(encoded, value):
+    assert _decompress_int(encoded, 0) == (value, len(encoded))
@@ -0,0 +1,101 @@
+import os
+import struct
+
+import pytest
+
+from pe_lecteur import (parse_pe_headers, read_pe_info, rva_to_offset, dotnet_mode, effective_machine, NotPEError,
+                        COMIMAGE_FLAGS_ILONLY, COMIMAGE_FLAGS_32BITREQUIRED, COMIMAGE_FLAGS_32BITPREFERRED)
+
+DEMO_DLL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "donnees", "pmlnet_demo", "PmlNetDemo.dll")
+
+E_LFANEW = 0x80
+TEXT_RVA = 0x2000
+TEXT_RAW = 0x200
+
+
+def build_pe(machine=0x014C, pe32_plus=False, clr_flags=None, n_dirs=16):
+    """
+    Image PE minimale : en-têtes DOS/COFF/Optional, une section .text contenant l'en-tête CLR si `clr_flags`.
+    """
+    magic, dirs_offset = (0x20B, 112) if pe32_plus else (0x10B, 96)
+    opt_size = dirs_offset + 8 * n_dirs
+    data = bytearray(TEXT_RAW + 0x200)
+    data[:2] = b"MZ"
+    struct.pack_into("<I", data, 0x3C, E_LFANEW)
+    data[E_LFANEW:E_LFANEW + 4] = b"PE\0\0"
+    coff = E_LFANEW + 4
+    struct.pack_into("<HHIIIHH", data, coff, machine, 1, 0, 0, 0, opt_size, 0x2102)
+    opt = coff + 20
+    struct.pack_into("<H", data, opt, magic)
+    struct.pack_into("<I", data, opt + dirs_offset - 4, n_dirs)
+    if clr_flags is not None:
+        struct.pack_into("<II", data, opt + dirs_offset + 8 * 14, TEXT_RVA, 72)
+        # IMAGE_COR20_HEADER : cb, version 2.5, métadonnées (RVA, taille), flags
+        struct.pack_into("<IHHIII", data, TEXT_RAW, 72, 2, 5, TEXT_RVA + 0x48, 0x100, clr_flags)
+    struct.pack_into("<8sIIII", data, opt + opt_size, b".text", 0x200, TEXT_RVA, 0x200, TEXT_RAW)
+    return bytes(data)
+
+
+@pytest.mark.parametrize("machine, pe32_plus, clr_flags, expected", [
+    # Natif
+    (0x014C, False, None, ("x86", "PE32", False, "", "x86")),
+    (0x8664, True, None, ("x64", "PE32+", False, "", "x64")),
+    # IL only : x86 sans 32BITREQUIRED = AnyCPU (y compris "Prefer 32-bit")
+    (0x014C, False, COMIMAGE_FLAGS_ILONLY, ("x86", "PE32", True, "IL only", "AnyCPU")),
+    (0x014C, False, COMIMAGE_FLAGS_ILONLY | COMIMAGE_FLAGS_32BITREQUIRED | COMIMAGE_FLAGS_32BITPREFERRED,
+     ("x86", "PE32", True, "IL only", "AnyCPU")),
+    (0x014C, False, COMIMAGE_FLAGS_ILONLY | COMIMAGE_FLAGS_32BITREQUIRED, ("x86", "PE32", True, "IL only", "x86")),
+    (0x8664, True, COMIMAGE_FLAGS_ILONLY, ("x64", "PE32+", True, "IL only", "x64")),
+    # Mixte (C++/CLI) : l'architecture déclarée fait foi
+    (0x014C, False, 0, ("x86", "PE32", True, "Mixte", "x86")),
+    (0x8664, True, COMIMAGE_FLAGS_32BITREQUIRED, ("x64", "PE32+", True, "Mixte", "x64")),
+    (0xAA64, True, COMIMAGE_FLAGS_ILONLY, ("ARM64", "PE32+", True, "IL only", "ARM64")),
+])
+def test_formats(machine, pe32_plus, clr_flags, expected):
+    info = parse_pe_headers(build_pe(machine, pe32_plus, clr_flags))
+    assert (info.machine, info.pe_format, info.is_dotnet, dotnet_mode(info), effective_machine(info)) == expected
+    assert info.clr_flags == (clr_flags or 0)
+    assert (info.metadata_rva, info.metadata_size) == ((TEXT_RVA + 0x48, 0x100) if clr_flags is not None else (0, 0))
+
+
+def test_sections():
+    info = parse_pe_headers(build_pe(pe32_plus=True, clr_flags=COMIMAGE_FLAGS_ILONLY))
+    assert [(s.name, s.virtual_address, s.raw_pointer) for s in info.sections] == [(".text", TEXT_RVA, TEXT_RAW)]
+    assert rva_to_offset(info.sections, TEXT_RVA + 0x48) == TEXT_RAW + 0x48
+    with pytest.raises(NotPEError):
+        rva_to_offset(info.sections, 0x10)
+
+
+def test_machine_inconnue():
+    assert parse_pe_headers(build_pe(machine=0x1234)).machine == "0x1234"
+
+
+def test_repertoire_clr_absent():
+    # Moins de 15 répertoires de données : pas de CLR lu, même si l'en-tête existe dans la section
+    info = parse_pe_headers(build_pe(clr_flags=COMIMAGE_FLAGS_ILONLY, n_dirs=14))
+    assert (info.is_dotnet, dotnet_mode(info)) == (False, "")
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"ZM" + bytes(0x100),
+    build_pe()[:E_LFANEW] + b"NE\0\0" + bytes(0x100),
+    build_pe()[:E_LFANEW + 24],
+])
+def test_pas_une_image_pe(data):
+    with pytest.raises(NotPEError):
+        parse_pe_headers(data)
+
+
+def test_optional_header_inconnu():
+    data = bytearray(build_pe())
+    struct.pack_into("<H", data, E_LFANEW + 24, 0x107)
+    with pytest.raises(NotPEError):
+        parse_pe_headers(bytes(data))
+
+
+def test_assembly_de_demo():
+    info = read_pe_info(DEMO_DLL)
+    assert (info.machine, info.pe_format, dotnet_mode(info), effective_machine(info)) == (
+        "x86", "PE32", "IL only", "AnyCPU")
+    assert info.metadata_rva and info.metadata_size
@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+from prefiltre_octets import BytesPrefilter
+
+TERMS = ["PmlNetControl", "container", "kind", "item", "cast"]
+
+
+def decoded_matches(data, terms):
+    # Lecture du script de recherche : décodage permissif, puis sous-chaîne en minuscules ou regex IGNORECASE
+    text = data.decode("utf-8", errors="ignore")
+    return any(term.lower() in text.lower() or re.search(re.escape(term), text, re.IGNORECASE) for term in terms)
+
+
+def may_contain(tmp_path, data, terms=TERMS):
+    path = tmp_path / "f.pmlfrm"
+    path.write_bytes(data)
+    return BytesPrefilter(terms).may_contain(str(path))
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", False),
+    (b"!!form.show()\n", False),
+    (b"!c = object PMLNETCONTROL()\n", True),
+    ("-- Méthode appelée à l'ouverture du formulaire\n!a = 'é'\n".encode("utf-8"), False),
+    ("-- Méthode du CONTAINER\n".encode("utf-8"), True),
+    ("\ufeffdefine method .init()\n".encode("utf-8"), False),  # BOM
+    # Octets invalides supprimés par errors="ignore" : les deux morceaux forment un terme
+    (b"!x = con\xfftainer\n", True),
+    ("\u212aind".encode("utf-8"), True),     # K Kelvin -> "k"
+    ("\u0130tem".encode("utf-8"), True),     # İ -> "i̇"
+    ("\u0131tem".encode("utf-8"), True),     # ı, "i" pour re.IGNORECASE
+    ("ca\u017ft".encode("utf-8"), True),     # ſ, "s" pour re.IGNORECASE
+    ("\u0130\u0131\u017f\u212a".encode("utf-8"), True),
+    (b"caf\xc3\xa9 \xe2\x82\xac \xf0\x9f\x98\x80\n", False),
+    (b"\xe9t\xe9\n", True),                     # Latin-1 : UTF-8 invalide, conservé
+])
+def test_may_contain(tmp_path, data, expected):
+    assert may_contain(tmp_path, data) == expected
+    # Exclusion sûre : un fichier écarté ne contient aucun terme après décodage
+    if decoded_matches(data, TERMS):
+        assert expected
+
+
+def test_termes_non_ascii_ou_vides(tmp_path):
+    assert may_contain(tmp_path, b"rien\n", ["élément"])
+    assert may_contain(tmp_path, b"rien\n", ["container", ""])
+    assert may_contain(tmp_path, b"rien\n", [])
+
+
+def test_fichier_illisible(tmp_path):
+    prefilter = BytesPrefilter(TERMS)
+    assert prefilter.may_contain(str(tmp_path / "absent.pmlfrm"))
+    assert (prefilter.kept, prefilter.skipped) == (1, 0)
+
+
+def test_compteurs(tmp_path):
+    prefilter = BytesPrefilter(TERMS)
+    for name, data in (("a", b"container\n"), ("b", "commentaire accentué\n".encode("utf-8")), ("c", b"")):
+        (tmp_path / name).write_bytes(data)
+        prefilter.may_contain(str(tmp_path / name))
+    assert (prefilter.kept, prefilter.skipped) == (1, 2)
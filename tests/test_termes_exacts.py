@@ -0,0 +1,90 @@
+import random
+import re
+
+import pytest
+
+from termes_exacts import ExactTermMatcher, type_usage, USAGE_SIGILS
+
+TERMS = ["CD", "cd", "cde", "!!CD", "_CD", "c", "a.b", "x-y", "$cd", ".cd", "Élément", "cd("]
+
+# Fragments assemblés en lignes aléatoires : préfixes d'usage, termes, séparateurs, caractères de mot
+FRAGMENTS = ["cd", "CD", "cde", "c", "d", "e", "!!", "!", "$!!", "$*", "$", "_", ".", " ", "(", ")", "=", "a.b",
+             "x-y", "x", "y", "-", "1", "élément", "ÉLÉMENT", "é"]
+
+PREFIX_SETS = [(), ("!!",), ("_",), ("!!", "_")]
+
+
+def reference_matches(terms, line_lower, prefixes=()):
+    """
+    Ancienne boucle de requetage_avancee_sans_extension_6.py : une recherche par terme puis par variante préfixée,
+    "Type usage" calculé ensuite par six recherches (detect_type_usage).
+    """
+    rows = []
+    for index, term in enumerate(terms):
+        candidates = [term] + [prefix + term.lower() for prefix in prefixes]
+        for term_entier in candidates:
+            if re.search(rf"(^|\W){re.escape(term_entier.lower())}($|\W)", line_lower):
+                rows.append((index, term_entier, reference_usage(term_entier, line_lower)))
+    return rows
+
+
+def reference_usage(term_entier, line_lower):
+    patterns = {
+        "$*": rf"(?<!\w)\$\*{re.escape(term_entier.lower())}(?!\w)",
+        "$!!": rf"(?<!\w)\$!!{re.escape(term_entier.lower())}(?!\w)",
+        "!!": rf"(?<!\w)!!{re.escape(term_entier.lower())}(?!\w)",
+        "!": rf"(?<!\w)!{re.escape(term_entier.lower())}(?!\w)",
+        "_": rf"(?<!\w)_{re.escape(term_entier.lower())}(?!\w)",
+        ".": rf"(?<!\w)\.{re.escape(term_entier.lower())}(?!\w)",
+    }
+    for prefix, pattern in patterns.items():
+        if re.search(pattern, line_lower):
+            return prefix
+    return ""
+
+
+def random_lines(count, seed=24):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 12))).lower() for _ in range(count)]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return ExactTermMatcher(TERMS)
+
+
+@pytest.mark.parametrize("line", [
+    "!a = !!cd.add(cde)",
+    "$!!cd $*cd !cd _cd .cd",
+    "_!!cd !!_cd",
+    "$!!!!cd",
+    "acd cd1 cd_x",
+    "cd(1) cd ( cd(",
+    "!x = a.b + x-y - ab",
+    "!!élément.show() éléments",
+    "",
+])
+@pytest.mark.parametrize("prefixes", PREFIX_SETS)
+def test_lignes_choisies(matcher, line, prefixes):
+    assert matcher.matches(line, prefixes) == reference_matches(TERMS, line, prefixes)
+
+
+@pytest.mark.parametrize("prefixes", PREFIX_SETS)
+def test_lignes_aleatoires(matcher, prefixes):
+    for line in random_lines(3000):
+        assert matcher.matches(line, prefixes) == reference_matches(TERMS, line, prefixes), line
+
+
+def test_doublons_et_ordre():
+    terms = ["cde", "CD", "cd", "CD"]
+    # Chaque position de la liste est rapportée, dans l'ordre de la liste, avec la casse d'origine
+    assert ExactTermMatcher(terms).matches("!cd cde") == [(0, "cde", ""), (1, "CD", "!"), (2, "cd", "!"), (3, "CD", "!")]
+    assert len(ExactTermMatcher(terms)) == 4
+    assert ExactTermMatcher([]).matches("cd") == []
+
+
+def test_type_usage():
+    assert USAGE_SIGILS == ["$*", "$!!", "!!", "!", "_", "."]
+    for line in random_lines(2000, seed=7):
+        for word in ("cd", "cde", "!!cd", "a.b", "élément", ""):
+            assert type_usage(word, line) == reference_usage(word, line), (word, line)
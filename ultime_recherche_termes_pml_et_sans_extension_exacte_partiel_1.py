@@ -1,9 +1,12 @@
 import os
 import re
-import fnmatch
 import pandas as pd
 import tqdm
 
+from corpus_crawler import list_files
+from automate_termes import TermAutomaton
+from prefiltre_octets import BytesPrefilter
+
 # --- Configuration ---
 search_directories = [
     r"C:\\Program Files (x86)\\AVEVA\\Everything3D2.10",
@@ -26,28 +29,31 @@ exact_terms = [
 
 partial_terms = ["dll", "browser"]
 
+# --- Préfiltre sur les octets : les fichiers sans aucun terme ne sont ni décodés ni découpés en lignes ---
+use_bytes_prefilter = True
+
 # --- Lecture des termes depuis un fichier texte ---
 txt_terms = []
 if use_txt_term_list and os.path.isfile(txt_term_file):
     with open(txt_term_file, "r", encoding="utf-8", errors="ignore") as f:
         txt_terms = [line.strip() for line in f if line.strip()]
 
-# --- Collecte des fichiers ---
-pml_files = []
-for base_dir in search_directories:
-    for root, _, files in os.walk(base_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            ext = os.path.splitext(file)[1]
-            if ext and any(fnmatch.fnmatch(file.lower(), pattern.lower()) for pattern in file_extensions if pattern):
-                pml_files.append((file_path, base_dir, ext))
-            elif not ext and "" in file_extensions:
-                pml_files.append((file_path, base_dir, ""))
+# --- Automate unique sur tous les termes (exacts, partiels, fichier texte) : une passe par ligne ---
+all_terms = ([(term, "exact_terms") for term in exact_terms]
+             + [(term, "partial_terms") for term in partial_terms]
+             + [(term, "txt_terms") for term in txt_terms])
+term_automaton = TermAutomaton(term for term, _ in all_terms)
+prefilter = BytesPrefilter(term for term, _ in all_terms) if use_bytes_prefilter else None
+
+# --- Collecte des fichiers (crawler parallèle commun, triés par chemin : ordre d'export reproductible) ---
+pml_files = [(rec.path, rec.root, rec.ext) for rec in list_files(search_directories, file_extensions)]
 
 # --- Analyse des fichiers ---
 results = []
 
 for file_path, base_dir, ext in tqdm.tqdm(pml_files, desc="Analyse PML", unit="fichier"):
+    if prefilter is not None and not prefilter.may_contain(file_path):
+        continue
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
             lines = f.readlines()
@@ -57,51 +63,27 @@ for file_path, base_dir, ext in tqdm.tqdm(pml_files, desc="Analyse PML", unit="f
             if not line_clean or re.match(r"^[ \t]*-", line_clean):
                 continue
 
-            # Recherche exacte (insensible à la casse)
-            for term in exact_terms:
-                if term.lower() in line.lower():
-                    results.append({
-                        "Chemin du fichier": file_path,
-                        "Nom du fichier": os.path.basename(file_path),
-                        "search_directory": base_dir,
-                        "file_extension": ext,
-                        "Terme détecté": term,
-                        "Type de correspondance": "exact_terms",
-                        "Ligne complète": line.rstrip('\n\r'),
-                        "Numéro de ligne": line_number
-                    })
-
-            # Recherche partielle
-            for term in partial_terms:
-                if term.lower() in line.lower():
-                    results.append({
-                        "Chemin du fichier": file_path,
-                        "Nom du fichier": os.path.basename(file_path),
-                        "search_directory": base_dir,
-                        "file_extension": ext,
-                        "Terme détecté": term,
-                        "Type de correspondance": "partial_terms",
-                        "Ligne complète": line.rstrip('\n\r'),
-                        "Numéro de ligne": line_number
-                    })
-
-            # Recherche à partir du fichier texte
-            for term in txt_terms:
-                if term.lower() in line.lower():
-                    results.append({
-                        "Chemin du fichier": file_path,
-                        "Nom du fichier": os.path.basename(file_path),
-                        "search_directory": base_dir,
-                        "file_extension": ext,
-                        "Terme détecté": term,
-                        "Type de correspondance": "txt_terms",
-                        "Ligne complète": line.rstrip('\n\r'),
-                        "Numéro de ligne": line_number
-                    })
+            # Tous les termes présents dans la ligne (insensible à la casse), dans l'ordre :
+            # exact_terms, puis partial_terms, puis txt_terms
+            for index in term_automaton.search(line.lower()):
+                term, match_type = all_terms[index]
+                results.append({
+                    "Chemin du fichier": file_path,
+                    "Nom du fichier": os.path.basename(file_path),
+                    "search_directory": base_dir,
+                    "file_extension": ext,
+                    "Terme détecté": term,
+                    "Type de correspondance": match_type,
+                    "Ligne complète": line.rstrip('\n\r'),
+                    "Numéro de ligne": line_number
+                })
 
     except Exception as e:
         print(f"Erreur lors de l'analyse de {file_path} : {e}")
 
+if prefilter is not None:
+    print(f"Préfiltre : {prefilter.skipped} fichiers écartés sans décodage, {prefilter.kept} analysés.")
+
 # --- Export ---
 if results:
     df = pd.DataFrame(results)